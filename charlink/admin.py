@@ -0,0 +1,53 @@
+import datetime
+
+from django.contrib import admin
+from django.utils import timezone
+
+from .app_settings import CHARLINK_ADD_CHARACTER_STATS_DAYS
+from .models import AddCharacterStats
+from .stats import get_add_character_summary
+
+
+@admin.register(AddCharacterStats)
+class AddCharacterStatsAdmin(admin.ModelAdmin):
+    list_display = ('import_id', 'date', 'bucket_label', 'successes', 'failures', 'duration_mean')
+    list_filter = ('date', 'import_id')
+    ordering = ('-date', 'import_id', 'bucket')
+    change_list_template = 'admin/charlink/addcharacterstats/change_list.html'
+
+    @admin.display(description='duration', ordering='bucket')
+    def bucket_label(self, obj):
+        return AddCharacterStats.get_bucket_label(obj.bucket)
+
+    @admin.display(description='mean duration (ms)')
+    def duration_mean(self, obj):
+        calls = obj.successes + obj.failures
+        return round(obj.duration_total * 1000 / calls, 1) if calls else None
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        since = timezone.now().date() - datetime.timedelta(days=CHARLINK_ADD_CHARACTER_STATS_DAYS)
+
+        extra_context = {
+            'summary_since': since,
+            'summary_buckets': [
+                AddCharacterStats.get_bucket_label(bucket)
+                for bucket in range(len(AddCharacterStats.BUCKET_BOUNDS) + 1)
+            ],
+            'summary': [
+                {
+                    'import_id': import_id,
+                    **import_summary,
+                    'duration_mean_ms': import_summary['duration_mean'] * 1000,
+                }
+                for import_id, import_summary in get_add_character_summary(since).items()
+            ],
+            **(extra_context or {}),
+        }
+
+        return super().changelist_view(request, extra_context=extra_context)
@@ -1,3 +1,5 @@
+import time
+import traceback
 from importlib import import_module
 
 from django.conf import settings
@@ -8,7 +10,17 @@ from allianceauth.services.hooks import get_extension_logger
 from allianceauth.authentication.models import CharacterOwnership
 from allianceauth.hooks import get_hooks
 
-from .utils import LoginImport, AppImport
+from ..tracing import span
+from .utils import (
+    LoginImport,
+    AppImport,
+    LoadDiagnostics,
+    LOAD_SOURCE_HOOK,
+    LOAD_SOURCE_DEFAULT,
+    LOAD_STATUS_LOADED,
+    LOAD_STATUS_FAILED,
+    LOAD_STATUS_DUPLICATED,
+)
 
 logger = get_extension_logger(__name__)
 
@@ -16,49 +28,107 @@ _supported_apps = {}
 
 _duplicated_apps = set()
 
+_load_diagnostics = []
+
 _imported = False
 
 
+def _error_summary(e: Exception) -> str:
+    summary = traceback.format_exception_only(type(e), e)[-1].strip()
+
+    # bare asserts have no message, the failing line tells what is wrong
+    frames = traceback.extract_tb(e.__traceback__)
+    if frames:
+        frame = frames[-1]
+        summary += f" ({frame.filename}:{frame.lineno}: {frame.line})"
+
+    return summary
+
+
 def import_apps():
     global _imported
     if not _imported:
-        # hooks
-        charlink_hooks = get_hooks('charlink')
-
-        for hook_f in charlink_hooks:
-            hook_mod = hook_f()
-            try:
-                assert isinstance(hook_mod, str)
-                app_import: AppImport = import_module(hook_mod).app_import
-                assert type(app_import) == AppImport
-                app_import.validate_import()
-            except AssertionError:
-                logger.debug(f"Loading of {hook_mod} link via hook: failed to validate")
-            except ModuleNotFoundError:
-                logger.debug(f"Loading of {hook_mod} link via hook: failed to import")
-            except:
-                logger.debug(f"Loading of {hook_mod} link via hook: failed")
-            else:
-                if app_import.app_label in _supported_apps:
-                    _supported_apps.pop(app_import.app_label)
-                    _duplicated_apps.add(app_import.app_label)
-
-                if app_import.app_label in _duplicated_apps:
-                    logger.debug(f"Loading of {hook_mod} link via hook: failed, duplicate {app_import.app_label}")
-                else:
-                    _supported_apps[app_import.app_label] = app_import
-                    logger.debug(f"Loading of {hook_mod} link via hook: success")
+        with span('charlink.import_apps'):
+            # hooks
+            charlink_hooks = get_hooks('charlink')
+
+            for hook_f in charlink_hooks:
+                hook_mod = hook_f()
+                diagnostics = LoadDiagnostics(str(hook_mod), LOAD_SOURCE_HOOK, LOAD_STATUS_FAILED)
+                _load_diagnostics.append(diagnostics)
 
-        # defaults
-        for app in settings.INSTALLED_APPS:
-            if app != 'allianceauth' and app not in _supported_apps:
                 try:
-                    module = import_module(f'charlink.imports.{app}')
-                except ModuleNotFoundError:
-                    logger.debug(f"Loading of {app} link: failed")
+                    assert isinstance(hook_mod, str)
+
+                    start = time.perf_counter()
+                    try:
+                        app_import: AppImport = import_module(hook_mod).app_import
+                    finally:
+                        diagnostics.import_time = time.perf_counter() - start
+
+                    assert type(app_import) == AppImport
+
+                    start = time.perf_counter()
+                    try:
+                        app_import.validate_import()
+                    finally:
+                        diagnostics.validate_time = time.perf_counter() - start
+                except AssertionError as e:
+                    diagnostics.error = _error_summary(e)
+                    logger.debug(f"Loading of {hook_mod} link via hook: failed to validate")
+                except ModuleNotFoundError as e:
+                    diagnostics.error = _error_summary(e)
+                    logger.debug(f"Loading of {hook_mod} link via hook: failed to import")
+                except Exception as e:
+                    diagnostics.error = _error_summary(e)
+                    logger.warning(f"Loading of {hook_mod} link via hook: failed, {diagnostics.error}")
                 else:
-                    _supported_apps[app] = module.app_import
-                    logger.debug(f"Loading of {app} link: success")
+                    diagnostics.app_label = app_import.app_label
+
+                    if app_import.app_label in _supported_apps:
+                        _supported_apps.pop(app_import.app_label)
+                        _duplicated_apps.add(app_import.app_label)
+
+                    if app_import.app_label in _duplicated_apps:
+                        for other in _load_diagnostics:
+                            if other.app_label == app_import.app_label:
+                                other.status = LOAD_STATUS_DUPLICATED
+
+                        logger.debug(f"Loading of {hook_mod} link via hook: failed, duplicate {app_import.app_label}")
+                    else:
+                        diagnostics.status = LOAD_STATUS_LOADED
+                        _supported_apps[app_import.app_label] = app_import
+                        logger.debug(f"Loading of {hook_mod} link via hook: success")
+
+            # defaults
+            for app in settings.INSTALLED_APPS:
+                if app != 'allianceauth' and app not in _supported_apps:
+                    module_name = f'charlink.imports.{app}'
+
+                    start = time.perf_counter()
+                    try:
+                        module = import_module(module_name)
+                    except ModuleNotFoundError as e:
+                        # apps without a default import are expected, only record the imports that broke
+                        if not module_name.startswith(e.name or ''):
+                            _load_diagnostics.append(LoadDiagnostics(
+                                module_name,
+                                LOAD_SOURCE_DEFAULT,
+                                LOAD_STATUS_FAILED,
+                                import_time=time.perf_counter() - start,
+                                error=_error_summary(e),
+                            ))
+                        logger.debug(f"Loading of {app} link: failed")
+                    else:
+                        _load_diagnostics.append(LoadDiagnostics(
+                            module_name,
+                            LOAD_SOURCE_DEFAULT,
+                            LOAD_STATUS_LOADED,
+                            app_label=app,
+                            import_time=time.perf_counter() - start,
+                        ))
+                        _supported_apps[app] = module.app_import
+                        logger.debug(f"Loading of {app} link: success")
 
         _imported = True
 
@@ -70,3 +140,13 @@ def get_duplicated_apps():
         import_apps()
 
     return _duplicated_apps
+
+
+def get_load_diagnostics():
+    """
+    Returns the LoadDiagnostics of every hook and of the default imports found, in loading order.
+    """
+    if not _imported:
+        import_apps()
+
+    return _load_diagnostics
@@ -1,16 +1,177 @@
 import re
-from dataclasses import dataclass
-from typing import Callable, List
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Callable, List, Optional, Set, Type, Union
 
-from django.db.models import Exists, QuerySet
+from django.apps import apps
+from django.core.exceptions import FieldDoesNotExist, ObjectDoesNotExist
+from django.db.models import Exists, Model, OuterRef, Q, QuerySet
 from django import forms
-from django.contrib.auth.models import User
+from django.contrib.auth.models import User, Permission
 from django.conf import settings
 from django.http import HttpRequest
 
 from allianceauth.eveonline.models import EveCharacter
 from esi.models import Token
 
+from ..tracing import span
+
+
+PERMISSIONS_ALL = 'all'
+PERMISSIONS_ANY = 'any'
+
+LOAD_SOURCE_HOOK = 'hook'
+LOAD_SOURCE_DEFAULT = 'default'
+
+LOAD_STATUS_LOADED = 'loaded'
+LOAD_STATUS_FAILED = 'failed'
+LOAD_STATUS_DUPLICATED = 'duplicated'
+
+
+def user_has_permissions(user: User, permissions: List[str], mode: str = PERMISSIONS_ALL) -> bool:
+    """
+    Checks the permissions against the user's permission set, fetched once per user object and shared between the imports.
+    """
+    if user.is_active and user.is_superuser:
+        return True
+
+    user_perms = user.get_all_permissions()
+
+    if mode == PERMISSIONS_ANY:
+        return any(perm in user_perms for perm in permissions)
+
+    return all(perm in user_perms for perm in permissions)
+
+
+def _permission_q(permission: str) -> Q:
+    app_label, codename = permission.split('.')
+    perms = Permission.objects.filter(content_type__app_label=app_label, codename=codename)
+
+    return (
+        Exists(perms.filter(user=OuterRef('pk'))) |
+        Exists(perms.filter(group__user=OuterRef('pk'))) |
+        Exists(perms.filter(state__userprofile__user=OuterRef('pk')))
+    )
+
+
+def users_with_permissions(permissions: List[str], mode: str = PERMISSIONS_ALL) -> QuerySet[User]:
+    """
+    Returns the users with the permissions, given directly, by group or by state, and the superusers, with a single query.
+    """
+    query = _permission_q(permissions[0])
+    for permission in permissions[1:]:
+        if mode == PERMISSIONS_ANY:
+            query |= _permission_q(permission)
+        else:
+            query &= _permission_q(permission)
+
+    return User.objects.filter(Q(is_superuser=True) | query)
+
+
+def get_annotation_models(annotation: Exists) -> Set[Type[Model]]:
+    """
+    Returns the models whose tables are queried by the annotation.
+    """
+    tables = {join.table_name for join in annotation.query.alias_map.values()}
+
+    return {
+        model
+        for model in apps.get_models(include_auto_created=True)
+        if model._meta.db_table in tables
+    }
+
+
+@dataclass
+class LinkSpec:
+    """
+    Declarative description of the rows that back a link, compiled into the link checks of a `LoginImport`.
+
+    Args:
+        `model`: The model whose rows mark a character as added.
+        `character_lookup`: The lookup from `model` to the character, e.g. `eve_character` or `token__character_id`.
+        `character_field`: The EveCharacter field `character_lookup` points to. Defaults to `pk`.
+        `filters`: Optional Q object with extra filters on `model`.
+        `tracked_fields`: When used as a dependency, the fields of `model` whose updates change the link.
+            None (default) means every save of a row, an empty list means only the creations and deletions of rows,
+            e.g. ESI tokens, which are refreshed all the time without changing the character.
+            Updates are detected from `update_fields` or from the values loaded from the database.
+    """
+    model: Type[Model]
+    character_lookup: str
+    character_field: str = 'pk'
+    filters: Optional[Q] = None
+    tracked_fields: Optional[List[str]] = None
+
+    def get_queryset(self) -> QuerySet:
+        queryset = self.model._default_manager.all()
+        if self.filters is not None:
+            queryset = queryset.filter(self.filters)
+
+        return queryset
+
+    def is_character_added(self, character: EveCharacter) -> bool:
+        return (
+            self.get_queryset()
+            .filter(**{self.character_lookup: getattr(character, self.character_field)})
+            .exists()
+        )
+
+    def get_annotation(self) -> Exists:
+        return Exists(
+            self.get_queryset()
+            .filter(**{self.character_lookup: OuterRef(self.character_field)})
+        )
+
+    def get_linked_q(self) -> Q:
+        """
+        Q object on EveCharacter matching the linked characters with a single semi-join.
+        """
+        return Q(**{f'{self.character_field}__in': self.get_queryset().values(self.character_lookup)})
+
+    def filter_linked(self, characters: QuerySet[EveCharacter]) -> QuerySet[EveCharacter]:
+        """
+        Filters the linked characters with a single semi-join.
+        """
+        return characters.filter(self.get_linked_q())
+
+    def get_character_values(self, instance: Model) -> Optional[Set]:
+        """
+        Returns the `character_field` values of the EveCharacters affected by a change of `instance`, None if they can't be resolved.
+
+        Only follows the lookup, use `resolve_character_ids` to get the EveCharacter pks.
+        """
+        *path, last = self.character_lookup.split('__')
+
+        try:
+            obj = instance
+            for part in path:
+                obj = getattr(obj, part)
+                if obj is None:
+                    return set()
+
+            value = getattr(obj, obj._meta.get_field(last).attname)
+        except (AttributeError, FieldDoesNotExist, ObjectDoesNotExist):
+            return None
+
+        if value is None:
+            return set()
+
+        return {value}
+
+
+def resolve_character_ids(character_field: str, values: Set) -> Set[int]:
+    """
+    Returns the pks of the EveCharacters whose `character_field` is in `values`, with at most one query.
+    """
+    if character_field == 'pk' or not values:
+        return set(values)
+
+    return set(
+        EveCharacter.objects
+        .filter(**{f'{character_field}__in': values})
+        .values_list('pk', flat=True)
+    )
+
 
 @dataclass
 class LoginImport:
@@ -26,24 +187,90 @@ class LoginImport:
         `field_label`: The label for the field in the form.
         `add_character`: A function that adds the character to the app. It must be a callable that takes a `esi.models.Token` as an argument and performs all the operations needed for adding a character to the application.
         `scopes`: A list of scopes required for the import.
-        `check_permissions`: A function that checks if the user has permissions to use the import. It must be a callable that takes a `User` as an argument and returns a boolean.
+        `check_permissions`: A function that checks if the user has permissions to use the import. It must be a callable that takes a `User` as an argument and returns a boolean. Can be omitted if `required_permissions` is set.
         `is_character_added`: A function that checks if the character is already added to the app. It must be a callable that takes an EveCharacter as an argument and returns a boolean.
         `is_character_added_annotation`: A django Exists object that checks if the character is already added to the app.
-        `get_users_with_perms`: A function that returns a QuerySet of users with permissions to use the import. It must be a callable that takes no arguments and returns a QuerySet of Users.
+        `get_users_with_perms`: A function that returns a QuerySet of users with permissions to use the import. It must be a callable that takes no arguments and returns a QuerySet of Users. Can be omitted if `required_permissions` is set.
+        `required_permissions`: Optional list of permissions in the `app_label.codename` format needed to use the import. When set, `check_permissions` and `get_users_with_perms` are derived from it unless explicitly given.
+        `required_permissions_mode`: `PERMISSIONS_ALL` (default) if the user needs all the `required_permissions`, `PERMISSIONS_ANY` if one of them is enough.
+        `link_spec`: Optional `LinkSpec`. When set, `is_character_added` and `is_character_added_annotation` are derived from it unless explicitly given.
+        `dependencies`: Optional list of the models whose changes affect the link status. A `LinkSpec` can be used instead of a model to tell how to find the affected characters. Defaults to `link_spec`, or to the models queried by `is_character_added_annotation`.
     """
     app_label: str
     unique_id: str
     field_label: str
     add_character: Callable[[HttpRequest, Token], None]
     scopes: List[str]
-    check_permissions: Callable[[User], bool]
-    is_character_added: Callable[[EveCharacter], bool]
-    is_character_added_annotation: Exists
-    get_users_with_perms: Callable[[], QuerySet[User]]
+    check_permissions: Optional[Callable[[User], bool]] = None
+    is_character_added: Optional[Callable[[EveCharacter], bool]] = None
+    is_character_added_annotation: Optional[Exists] = None
+    get_users_with_perms: Optional[Callable[[], QuerySet[User]]] = None
+    required_permissions: Optional[List[str]] = None
+    required_permissions_mode: str = PERMISSIONS_ALL
+    link_spec: Optional[LinkSpec] = None
+    dependencies: Optional[List[Union[Type[Model], LinkSpec]]] = None
+    _annotation_from_link_spec: bool = field(default=False, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.link_spec is not None:
+            if self.is_character_added is None:
+                self.is_character_added = self.link_spec.is_character_added
+
+            if self.is_character_added_annotation is None:
+                self.is_character_added_annotation = self.link_spec.get_annotation()
+                self._annotation_from_link_spec = True
+
+        if self.required_permissions:
+            if self.check_permissions is None:
+                self.check_permissions = partial(
+                    user_has_permissions,
+                    permissions=self.required_permissions,
+                    mode=self.required_permissions_mode,
+                )
+
+            if self.get_users_with_perms is None:
+                self.get_users_with_perms = partial(
+                    users_with_permissions,
+                    self.required_permissions,
+                    self.required_permissions_mode,
+                )
 
     def get_query_id(self):
         return f"{self.app_label}_{self.unique_id}"
 
+    def has_permissions(self, user: User) -> bool:
+        """
+        Calls `check_permissions` inside a tracing span.
+        """
+        with span('charlink.check_permissions', login_import=self):
+            return self.check_permissions(user)
+
+    def get_dependencies(self) -> List[Union[Type[Model], LinkSpec]]:
+        if self.dependencies is not None:
+            return self.dependencies
+
+        if self.link_spec is not None:
+            return [self.link_spec]
+
+        return list(get_annotation_models(self.is_character_added_annotation))
+
+    def get_linked_q(self) -> Q:
+        """
+        Q object on EveCharacter matching the characters added to the app, for the bulk queries.
+
+        Uses the semi-join of `link_spec` when the annotation is derived from it, `is_character_added_annotation` otherwise.
+        """
+        if self._annotation_from_link_spec:
+            return self.link_spec.get_linked_q()
+
+        return Q(self.is_character_added_annotation)
+
+    def filter_linked(self, characters: QuerySet[EveCharacter]) -> QuerySet[EveCharacter]:
+        """
+        Filters the characters added to the app.
+        """
+        return characters.filter(self.get_linked_q())
+
     def __hash__(self) -> int:
         return hash(self.get_query_id())
 
@@ -67,6 +294,23 @@ class LoginImport:
         assert callable(self.is_character_added)
         assert isinstance(self.is_character_added_annotation, Exists)
         assert callable(self.get_users_with_perms)
+        assert self.link_spec is None or isinstance(self.link_spec, LinkSpec)
+        if self.dependencies is not None:
+            assert isinstance(self.dependencies, list)
+            for dependency in self.dependencies:
+                assert isinstance(dependency, LinkSpec) or (isinstance(dependency, type) and issubclass(dependency, Model))
+                if isinstance(dependency, LinkSpec) and dependency.tracked_fields is not None:
+                    assert isinstance(dependency.tracked_fields, list)
+                    field_names = {name for field in dependency.model._meta.concrete_fields for name in (field.name, field.attname)}
+                    for field_name in dependency.tracked_fields:
+                        assert field_name in field_names
+        assert self.required_permissions_mode in (PERMISSIONS_ALL, PERMISSIONS_ANY)
+        if self.required_permissions is not None:
+            assert isinstance(self.required_permissions, list)
+            assert len(self.required_permissions) > 0
+            for perm in self.required_permissions:
+                assert isinstance(perm, str)
+                assert re.match(r'^\w+\.\w+$', perm) is not None
 
 
 @dataclass
@@ -90,7 +334,7 @@ class AppImport:
                 label=import_.field_label
             )
             for import_ in self.imports
-            if import_.check_permissions(user)
+            if import_.has_permissions(user)
         }
 
     def get_imports_with_perms(self, user: User):
@@ -99,12 +343,12 @@ class AppImport:
             [
                 import_
                 for import_ in self.imports
-                if import_.check_permissions(user)
+                if import_.has_permissions(user)
             ]
         )
 
     def has_any_perms(self, user: User):
-        return any(import_.check_permissions(user) for import_ in self.imports)
+        return any(import_.has_permissions(user) for import_ in self.imports)
 
     def get(self, unique_id: str) -> LoginImport:
         for import_ in self.imports:
@@ -131,3 +375,27 @@ class AppImport:
 
         for count in ids.values():
             assert count == 1
+
+
+@dataclass
+class LoadDiagnostics:
+    """
+    Outcome of loading an import module, recorded by `import_apps`.
+
+    Args:
+        `module`: The module the import was loaded from.
+        `source`: `LOAD_SOURCE_HOOK` for modules registered with the charlink hook, `LOAD_SOURCE_DEFAULT` for the ones shipped with CharLink.
+        `status`: One of `LOAD_STATUS_LOADED`, `LOAD_STATUS_FAILED` or `LOAD_STATUS_DUPLICATED`.
+        `app_label`: The app label of the loaded `AppImport`, None if the module failed to load.
+        `import_time`: Seconds spent importing the module.
+        `validate_time`: Seconds spent validating the `AppImport`.
+        `error`: Summary of the exception that made the loading fail.
+    """
+
+    module: str
+    source: str
+    status: str
+    app_label: Optional[str] = None
+    import_time: float = 0.0
+    validate_time: float = 0.0
+    error: Optional[str] = None
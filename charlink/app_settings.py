@@ -1,3 +1,42 @@
 from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
 
 CHARLINK_IGNORE_APPS = set(getattr(settings, 'CHARLINK_IGNORE_APPS', []))
+
+CHARLINK_EXPORT_CHUNK_SIZE = getattr(settings, 'CHARLINK_EXPORT_CHUNK_SIZE', 2000)
+
+CHARLINK_COVERAGE_CACHE_TTL = getattr(settings, 'CHARLINK_COVERAGE_CACHE_TTL', 300)
+
+CHARLINK_READ_DATABASE = getattr(settings, 'CHARLINK_READ_DATABASE', None) or DEFAULT_DB_ALIAS
+
+CHARLINK_ASYNC_AUDIT_VIEWS = getattr(settings, 'CHARLINK_ASYNC_AUDIT_VIEWS', False)
+
+CHARLINK_NAVBAR_CACHE_TTL = getattr(settings, 'CHARLINK_NAVBAR_CACHE_TTL', 3600)
+
+CHARLINK_LINK_STATE_DIRTY_TTL = getattr(settings, 'CHARLINK_LINK_STATE_DIRTY_TTL', 7 * 24 * 60 * 60)
+
+CHARLINK_ADD_CHARACTER_STATS_DAYS = getattr(settings, 'CHARLINK_ADD_CHARACTER_STATS_DAYS', 30)
+
+CHARLINK_PROFILE_SAMPLE_RATE = getattr(settings, 'CHARLINK_PROFILE_SAMPLE_RATE', 0)
+
+CHARLINK_PROFILE_DIR = getattr(settings, 'CHARLINK_PROFILE_DIR', None)
+
+CHARLINK_PROFILE_MAX_FILES = getattr(settings, 'CHARLINK_PROFILE_MAX_FILES', 200)
+
+CHARLINK_PROFILE_MAX_BYTES = getattr(settings, 'CHARLINK_PROFILE_MAX_BYTES', 100 * 1024 * 1024)
+
+CHARLINK_LINK_MATRIX_MAX_BATCH = getattr(settings, 'CHARLINK_LINK_MATRIX_MAX_BATCH', 1000)
+
+CHARLINK_ADMIN_NOTIFICATIONS_WINDOW = getattr(settings, 'CHARLINK_ADMIN_NOTIFICATIONS_WINDOW', 300)
+
+CHARLINK_DISPATCH_WINDOW = getattr(settings, 'CHARLINK_DISPATCH_WINDOW', 300)
+
+# {app label: {'rate': tasks per minute, 'burst': tasks sent right away after an idle period, defaults to rate, 'priority': optional Celery priority}}
+CHARLINK_TASK_RATE_LIMITS = getattr(settings, 'CHARLINK_TASK_RATE_LIMITS', {})
+
+CHARLINK_MISSING_LINKS_PAGE_SIZE = getattr(settings, 'CHARLINK_MISSING_LINKS_PAGE_SIZE', 100)
+
+# seconds after which a pending link update is considered failed, e.g. when its task was lost
+CHARLINK_LINK_UPDATE_TIMEOUT = getattr(settings, 'CHARLINK_LINK_UPDATE_TIMEOUT', 30 * 60)
+
+CHARLINK_LINK_UPDATE_DAYS = getattr(settings, 'CHARLINK_LINK_UPDATE_DAYS', 7)
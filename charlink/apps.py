@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class CharlinkConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'charlink'
+
+    def ready(self):
+        from . import signals, bitmaps  # noqa: F401
+
+        signals.connect_receivers()
@@ -0,0 +1,196 @@
+import operator
+import zlib
+from functools import reduce
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.dispatch import receiver
+
+from allianceauth.eveonline.models import EveCharacter
+
+from .app_imports.utils import LoginImport
+from .link_state import get_import_version
+from .signals import link_state_changed
+
+MISSING_LINK_MODES = {
+    'any': "Characters missing any of the apps",
+    'all': "Characters missing all the apps",
+    'user': "Users with no character linked to any of the apps",
+}
+
+
+def _bitmap_key(query_id: str) -> str:
+    return f'charlink:bitmap:{query_id}'
+
+
+def pks_to_bitmap(pks: Iterable[int]) -> int:
+    """
+    Returns the bitmap of the EveCharacter pks, bit n is set if pk n is in the list.
+    """
+    pks = list(pks)
+    if not pks:
+        return 0
+
+    # set in a byte array, shifting the int for each pk would copy it every time
+    data = bytearray(max(pks) // 8 + 1)
+    for pk in pks:
+        data[pk >> 3] |= 1 << (pk & 7)
+
+    return int.from_bytes(data, 'little')
+
+
+def bitmap_to_pks(bitmap: int) -> List[int]:
+    """
+    Returns the EveCharacter pks of the set bits, in ascending order.
+    """
+    return [
+        index * 8 + bit
+        for index, byte in enumerate(_to_bytes(bitmap))
+        if byte
+        for bit in range(8)
+        if byte >> bit & 1
+    ]
+
+
+def bitmap_count(bitmap: int) -> int:
+    return bin(bitmap).count('1')
+
+
+def _to_bytes(bitmap: int) -> bytes:
+    return bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')
+
+
+def _dump(version: int, bitmap: int) -> tuple:
+    return version, zlib.compress(_to_bytes(bitmap))
+
+
+def _load(data: bytes) -> int:
+    return int.from_bytes(zlib.decompress(data), 'little')
+
+
+def _get_linked_pks(login_import: LoginImport, pks: Optional[Iterable[int]] = None):
+    # always the default database: bitmaps are stored under versions bumped after the primary commits,
+    # a lagging replica would store a stale bitmap as current until the next change of the import
+    characters = EveCharacter.objects.using(DEFAULT_DB_ALIAS)
+    if pks is not None:
+        characters = characters.filter(pk__in=list(pks))
+
+    return (
+        login_import.filter_linked(characters)
+        .values_list('pk', flat=True)
+        .iterator()
+    )
+
+
+def get_import_bitmap(login_import: LoginImport) -> int:
+    """
+    Returns the bitmap of the characters linked to the import, see `pks_to_bitmap`.
+
+    Bitmaps are kept in the cache and updated from `link_state_changed`, so set operations across imports don't need any query.
+    A bitmap is rebuilt with one query on the default database when missing or not matching the current import version.
+    """
+    query_id = login_import.get_query_id()
+    # read before querying, changes committed in the meantime are applied by the signal receiver
+    version = get_import_version(login_import)
+
+    cached = cache.get(_bitmap_key(query_id))
+    if cached is not None and cached[0] == version:
+        return _load(cached[1])
+
+    bitmap = pks_to_bitmap(_get_linked_pks(login_import))
+    cache.set(_bitmap_key(query_id), _dump(version, bitmap), None)
+
+    return bitmap
+
+
+@receiver(link_state_changed)
+def update_import_bitmap(sender, login_import: LoginImport, character_ids, version: int, **kwargs):
+    """
+    Updates the bits of the changed characters in the cached bitmap of the import, if any.
+
+    Only a bitmap of the previous version is updated, the others are dropped and rebuilt when next read.
+    Runs after the change is committed and reads the default database, so the change is always visible.
+    """
+    key = _bitmap_key(login_import.get_query_id())
+
+    cached = cache.get(key)
+    if cached is None:
+        return
+
+    if character_ids is None or cached[0] != version - 1:
+        cache.delete(key)
+        return
+
+    character_ids = set(character_ids)
+    changed = pks_to_bitmap(character_ids)
+    linked = pks_to_bitmap(_get_linked_pks(login_import, character_ids))
+
+    bitmap = (_load(cached[1]) & ~changed) | linked
+    cache.set(key, _dump(version, bitmap), None)
+
+
+def _allowed_bitmaps(characters: Sequence[Tuple[int, Optional[int]]], count: int, allowed_users: Optional[List[Set[int]]]) -> List[int]:
+    if allowed_users is None:
+        return [pks_to_bitmap(pk for pk, _ in characters)] * count
+
+    return [pks_to_bitmap(pk for pk, user_id in characters if user_id in users) for users in allowed_users]
+
+
+def filter_missing_links(
+    characters: Sequence[Tuple[int, Optional[int]]],
+    bitmaps: List[int],
+    mode: str,
+    allowed_users: Optional[List[Set[int]]] = None,
+    owned_characters: Optional[Sequence[Tuple[int, Optional[int]]]] = None,
+) -> List[int]:
+    """
+    Returns the pks of the characters matching a missing links filter, in the order of `characters`.
+
+    The filter is evaluated with bitwise operations on the import bitmaps, without any query.
+
+    Args:
+        `characters`: (EveCharacter pk, owner user id) of the characters to filter.
+        `bitmaps`: The bitmaps of the imports to check, see `get_import_bitmap`.
+        `mode`: One of MISSING_LINK_MODES. `any` keeps the characters not linked to at least one of the imports,
+            `all` the characters linked to none of them and `user` the characters of the users with no character linked to any of them.
+        `allowed_users`: Optional ids of the users who can use each import, in the order of `bitmaps`.
+            Like the app audit pages, characters are checked only against the imports their owner can use,
+            characters whose owner can use none of them are never returned. None means no restriction.
+        `owned_characters`: (EveCharacter pk, owner user id) of every character of the owners in `characters`.
+            In `user` mode, the links of these characters tell which users have a linked character. Defaults to `characters`.
+
+    Raises:
+        ValueError: if the mode is unknown or no bitmap is given.
+    """
+    if mode not in MISSING_LINK_MODES:
+        raise ValueError(f"Unknown missing links mode {mode}")
+
+    if not bitmaps:
+        raise ValueError("At least one import bitmap is required")
+
+    allowed = _allowed_bitmaps(characters, len(bitmaps), allowed_users)
+    universe = reduce(operator.or_, allowed)
+
+    if mode == 'any':
+        missing = set(bitmap_to_pks(reduce(operator.or_, (allowed_bitmap & ~bitmap for allowed_bitmap, bitmap in zip(allowed, bitmaps)))))
+        return [pk for pk, _ in characters if pk in missing]
+
+    if mode == 'all':
+        linked = reduce(operator.or_, (allowed_bitmap & bitmap for allowed_bitmap, bitmap in zip(allowed, bitmaps)))
+        missing = set(bitmap_to_pks(universe & ~linked))
+        return [pk for pk, _ in characters if pk in missing]
+
+    if owned_characters is None:
+        owned_characters = characters
+
+    owned_allowed = _allowed_bitmaps(owned_characters, len(bitmaps), allowed_users)
+    linked = set(bitmap_to_pks(reduce(operator.or_, (allowed_bitmap & bitmap for allowed_bitmap, bitmap in zip(owned_allowed, bitmaps)))))
+    linked_users = {user_id for pk, user_id in owned_characters if pk in linked and user_id is not None}
+    candidates = set(bitmap_to_pks(universe))
+
+    return [
+        pk
+        for pk, user_id in characters
+        if pk in candidates and (user_id not in linked_users if user_id is not None else pk not in linked)
+    ]
@@ -0,0 +1,205 @@
+import datetime
+import hashlib
+import json
+from typing import Dict, Iterable, List, Optional
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Case, Count, F, Q, QuerySet, When
+
+from allianceauth.eveonline.models import EveCharacter
+
+from .app_settings import CHARLINK_COVERAGE_CACHE_TTL
+from .app_imports.utils import LoginImport
+from .models import CoverageSnapshot
+from .utils import get_user_available_apps, get_visible_corps
+from .exports import get_export_characters, import_users_filter
+
+
+def _percentage(linked: int, total: int) -> float:
+    return round(linked * 100 / total, 1) if total else 0.0
+
+
+def get_link_coverage(characters: QuerySet[EveCharacter], imports: List[LoginImport], group_by: str = 'corporation_id') -> Dict[int, Dict[str, dict]]:
+    """
+    Computes the link coverage of the characters for each import, grouped by the `group_by` field.
+
+    Like the app audit pages, only the characters whose owner can use the import are counted for it.
+    All the counts are computed with a single GROUP BY query.
+
+    Returns:
+        A dict {group value: {import query id: counts}}, where counts is a dict with
+        `characters_linked`, `characters_total`, `users_linked` and `users_total` keys.
+    """
+    aggregates = {}
+
+    for index, import_ in enumerate(imports):
+        allowed = import_users_filter(import_)
+        linked = Q(allowed) & import_.get_linked_q()
+
+        aggregates[f'characters_total_{index}'] = Count('pk', filter=allowed)
+        aggregates[f'users_total_{index}'] = Count('character_ownership__user', filter=allowed, distinct=True)
+        aggregates[f'characters_linked_{index}'] = Count('pk', filter=linked)
+        aggregates[f'users_linked_{index}'] = Count('character_ownership__user', filter=linked, distinct=True)
+
+    rows = (
+        characters
+        .order_by()
+        .values(group_by)
+        .annotate(**aggregates)
+    )
+
+    return {
+        row[group_by]: {
+            import_.get_query_id(): {
+                'characters_linked': row[f'characters_linked_{index}'],
+                'characters_total': row[f'characters_total_{index}'],
+                'users_linked': row[f'users_linked_{index}'],
+                'users_total': row[f'users_total_{index}'],
+            }
+            for index, import_ in enumerate(imports)
+        }
+        for row in rows
+    }
+
+
+def get_coverage_characters(corp_ids: Iterable[int], using: Optional[str] = None) -> QuerySet[EveCharacter]:
+    """
+    Returns the characters counted in the coverage of the corporations, with the same visibility as the audit and export pages.
+
+    Characters are annotated with the `coverage_corporation_id` and `coverage_alliance_id` they are counted in:
+    alts outside the corporations are counted with their main's corporation and alliance.
+    """
+    in_corps = Q(corporation_id__in=corp_ids)
+
+    return get_export_characters(corp_ids=corp_ids, using=using).annotate(
+        coverage_corporation_id=Case(
+            When(in_corps, then=F('corporation_id')),
+            default=F('character_ownership__user__profile__main_character__corporation_id'),
+        ),
+        coverage_alliance_id=Case(
+            When(in_corps, then=F('alliance_id')),
+            default=F('character_ownership__user__profile__main_character__alliance_id'),
+        ),
+    )
+
+
+def get_corp_coverage(user: User, using: Optional[str] = None) -> dict:
+    """
+    Returns the link coverage of the corporations visible by the user for the imports available to the user.
+
+    Results are cached for CHARLINK_COVERAGE_CACHE_TTL seconds and shared between users with the same visibility.
+    """
+    corps = list(
+        get_visible_corps(user, using)
+        .order_by('corporation_name')
+        .values('corporation_id', 'corporation_name')
+    )
+
+    imports = [
+        import_
+        for app_imports in get_user_available_apps(user).values()
+        for import_ in app_imports.imports
+    ]
+
+    corp_ids = [corp['corporation_id'] for corp in corps]
+    query_ids = [import_.get_query_id() for import_ in imports]
+
+    key_hash = hashlib.md5(json.dumps([corp_ids, query_ids]).encode('utf-8')).hexdigest()
+    cache_key = f'charlink:coverage:{key_hash}'
+
+    coverage = cache.get(cache_key)
+    if coverage is None:
+        coverage = get_link_coverage(get_coverage_characters(corp_ids, using), imports, group_by='coverage_corporation_id')
+        cache.set(cache_key, coverage, CHARLINK_COVERAGE_CACHE_TTL)
+
+    rows = []
+
+    for corp in corps:
+        corp_coverage = coverage.get(corp['corporation_id'], {})
+        row = []
+        for import_ in imports:
+            counts = corp_coverage.get(
+                import_.get_query_id(),
+                {'characters_linked': 0, 'characters_total': 0, 'users_linked': 0, 'users_total': 0}
+            )
+            row.append({
+                'import': import_,
+                **counts,
+                'characters_percentage': _percentage(counts['characters_linked'], counts['characters_total']),
+                'users_percentage': _percentage(counts['users_linked'], counts['users_total']),
+            })
+
+        rows.append({
+            'corporation_id': corp['corporation_id'],
+            'corporation_name': corp['corporation_name'],
+            'coverage': row,
+        })
+
+    return {
+        'imports': imports,
+        'corporations': rows,
+    }
+
+
+def can_view_scope(user: User, scope: str, scope_id: int) -> bool:
+    """
+    Checks if the user can view the coverage of the selected corporation, alliance or state.
+    """
+    if user.is_superuser:
+        return True
+
+    if scope == CoverageSnapshot.Scope.CORPORATION:
+        return get_visible_corps(user).filter(corporation_id=scope_id).exists()
+
+    if scope == CoverageSnapshot.Scope.ALLIANCE:
+        char = user.profile.main_character
+
+        if user.has_perm('charlink.view_alliance') and char is not None and char.alliance_id == scope_id:
+            return True
+
+        return (
+            user.has_perm('charlink.view_state') and
+            user.profile.state.member_alliances.filter(alliance_id=scope_id).exists()
+        )
+
+    if scope == CoverageSnapshot.Scope.STATE:
+        return user.has_perm('charlink.view_state') and user.profile.state_id == scope_id
+
+    return False
+
+
+def get_coverage_trends(scope: str, scope_id: int, imports: List[LoginImport], since: datetime.date) -> dict:
+    """
+    Returns the stored coverage snapshots of the selected scope from `since`, one row per snapshot date.
+    """
+    snapshots = (
+        CoverageSnapshot.objects
+        .filter(
+            scope=scope,
+            scope_id=scope_id,
+            import_id__in=[import_.get_query_id() for import_ in imports],
+            date__gte=since,
+        )
+        .order_by('date')
+        .values('date', 'import_id', 'characters_linked', 'characters_total', 'users_linked', 'users_total')
+    )
+
+    dates = {}
+    for snapshot in snapshots:
+        dates.setdefault(snapshot['date'], {})[snapshot['import_id']] = {
+            **snapshot,
+            'characters_percentage': _percentage(snapshot['characters_linked'], snapshot['characters_total']),
+            'users_percentage': _percentage(snapshot['users_linked'], snapshot['users_total']),
+        }
+
+    return {
+        'imports': imports,
+        'rows': [
+            {
+                'date': date,
+                'coverage': [date_snapshots.get(import_.get_query_id()) for import_ in imports],
+            }
+            for date, date_snapshots in dates.items()
+        ],
+    }
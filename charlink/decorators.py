@@ -1,8 +1,24 @@
+import cProfile
+import random
+from functools import wraps
+from typing import Callable, List, Optional
+
+from asgiref.sync import sync_to_async
+
 from django.shortcuts import redirect
 from django.contrib import messages
+from django.contrib.auth.views import redirect_to_login
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 
+from allianceauth.services.hooks import get_extension_logger
 from esi.decorators import token_required
 
+from .app_settings import CHARLINK_PROFILE_SAMPLE_RATE
+from .profiling import save_profile
+
+logger = get_extension_logger(__name__)
+
 
 def charlink(func):
     def wrapper(request, *args, **kwargs):
@@ -12,3 +28,76 @@ def charlink(func):
             messages.error(request, 'Scopes error. Contact an administrator.')
             return redirect('charlink:index')
     return wrapper
+
+
+def sample_profile(func):
+    """
+    Runs a CHARLINK_PROFILE_SAMPLE_RATE fraction of the requests under cProfile and saves the profiles.
+    """
+    @wraps(func)
+    def wrapper(request, *args, **kwargs):
+        if CHARLINK_PROFILE_SAMPLE_RATE <= 0 or random.random() >= CHARLINK_PROFILE_SAMPLE_RATE:
+            return func(request, *args, **kwargs)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # another profiler is already running in this interpreter
+            return func(request, *args, **kwargs)
+
+        try:
+            return func(request, *args, **kwargs)
+        finally:
+            profiler.disable()
+            view_name = request.resolver_match.view_name if request.resolver_match else func.__name__
+            try:
+                save_profile(profiler, view_name)
+            except OSError:
+                logger.warning(f"Failed to save the profile of {view_name}", exc_info=True)
+    return wrapper
+
+
+def async_permissions_required(perms: List[str]):
+    """
+    Async views counterpart of `login_required` and `permissions_required`, which only wrap sync views in Django 4.2.
+
+    Anonymous users and users without any of the permissions are redirected to the login page.
+    """
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(request, *args, **kwargs):
+            def has_perms():
+                return request.user.is_authenticated and any(request.user.has_perm(perm) for perm in perms)
+
+            if not await sync_to_async(has_perms)():
+                return redirect_to_login(request.get_full_path())
+
+            return await func(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def async_condition(etag_func: Callable[..., Optional[str]]):
+    """
+    Async views counterpart of `django.views.decorators.http.condition`, for ETags only.
+    """
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(request, *args, **kwargs):
+            etag = await sync_to_async(etag_func)(request, *args, **kwargs)
+            if etag is None:
+                return await func(request, *args, **kwargs)
+
+            etag = quote_etag(etag)
+
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = await func(request, *args, **kwargs)
+
+            if request.method in ('GET', 'HEAD') and not response.has_header('ETag'):
+                response.headers['ETag'] = etag
+
+            return response
+        return wrapper
+    return decorator
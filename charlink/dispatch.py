@@ -0,0 +1,140 @@
+import hashlib
+import json
+import math
+import time
+from typing import Optional
+
+from celery import Task
+from celery.result import AsyncResult
+
+from django.core.cache import cache
+
+from allianceauth.services.hooks import get_extension_logger
+
+from .app_settings import CHARLINK_DISPATCH_WINDOW, CHARLINK_TASK_RATE_LIMITS
+
+logger = get_extension_logger(__name__)
+
+
+def _dispatch_key(task: Task, args: Optional[tuple], kwargs: Optional[dict]) -> str:
+    signature = json.dumps([task.name, list(args or ()), kwargs or {}], sort_keys=True, default=str)
+    return f'charlink:dispatch:{hashlib.md5(signature.encode("utf-8")).hexdigest()}'
+
+
+def _admission_countdown(app_label: Optional[str]) -> int:
+    """
+    Takes a token from the bucket of the app and returns the seconds to wait for it, 0 if the app has no rate limit.
+
+    Tasks get consecutive slots `60 / rate` seconds apart from a shared counter, so concurrent requests never get the same slot.
+    After an idle period the slots restart from the current time, with `burst` of them already available.
+
+    A missing or non positive `rate` means no limit, a `burst` below 1 is raised to 1: the dispatch runs while linking,
+    after the character is saved, a bad setting must not make it fail.
+    """
+    limit = CHARLINK_TASK_RATE_LIMITS.get(app_label)
+    if not limit:
+        return 0
+
+    rate = limit.get('rate')
+    if not isinstance(rate, (int, float)) or rate <= 0:
+        logger.warning(f"Invalid rate {rate!r} in CHARLINK_TASK_RATE_LIMITS for {app_label}, tasks are not rate limited")
+        return 0
+
+    interval = 60 / rate
+    burst = limit.get('burst', rate)
+    if not isinstance(burst, (int, float)) or burst < 1:
+        logger.warning(f"Invalid burst {burst!r} in CHARLINK_TASK_RATE_LIMITS for {app_label}, using 1")
+        burst = 1
+
+    now = time.time()
+    earliest = now - (burst - 1) * interval
+
+    start_key = f'charlink:admission:{app_label}:start'
+    count_key = f'charlink:admission:{app_label}:count'
+
+    cache.add(start_key, earliest, None)
+    cache.add(count_key, 0, None)
+    count = cache.incr(count_key)
+
+    slot = cache.get(start_key, earliest) + (count - 1) * interval
+    if slot < earliest:
+        # the bucket is full, unused tokens don't pile up past the burst
+        cache.set(start_key, earliest - (count - 1) * interval, None)
+        return 0
+
+    return max(math.ceil(slot - now), 0)
+
+
+def dispatch(task: Task, app_label: Optional[str], args: Optional[tuple] = None, kwargs: Optional[dict] = None, **options) -> AsyncResult:
+    """
+    Sends the task within the rate limit of the app set in CHARLINK_TASK_RATE_LIMITS.
+
+    Tasks over the limit are not dropped, they are sent with a countdown until a slot is available.
+
+    Args:
+        `task`: The Celery task to send.
+        `app_label`: The app whose rate limit and priority apply, e.g. `memberaudit`. None for no limit.
+        `args`, `kwargs`: The task arguments.
+        `options`: Other apply_async options. A `countdown` is added to the admission one,
+            a `priority` is replaced by the configured priority of the app, if any.
+
+    Returns:
+        The AsyncResult of the sent task.
+    """
+    limit = CHARLINK_TASK_RATE_LIMITS.get(app_label) or {}
+    if 'priority' in limit:
+        options['priority'] = limit['priority']
+
+    countdown = _admission_countdown(app_label)
+    if countdown:
+        options['countdown'] = options.get('countdown', 0) + countdown
+        logger.debug(f"Deferred {task.name} by {countdown}s, {app_label} is over its rate limit")
+
+    return task.apply_async(args=args, kwargs=kwargs, **options)
+
+
+def dispatch_once(
+    task: Task,
+    args: Optional[tuple] = None,
+    kwargs: Optional[dict] = None,
+    window: int = CHARLINK_DISPATCH_WINDOW,
+    leading: bool = True,
+    app_label: Optional[str] = None,
+    **options
+) -> Optional[AsyncResult]:
+    """
+    Sends the task at most once per `window` seconds for the same arguments.
+
+    The first call of the window sends the task right away. The first call suppressed in the window schedules one more run
+    `window` seconds later, so changes made after the first run are not missed. The other calls are dropped.
+
+    Args:
+        `task`: The Celery task to send.
+        `args`, `kwargs`: The task arguments, part of the deduplication key.
+        `window`: The deduplication window in seconds.
+        `leading`: If False, the first call only schedules the run at the end of the window,
+            so a burst of calls results in a single run seeing all of their changes.
+        `app_label`: If given, the sent tasks also go through the rate limit of the app, see `dispatch`.
+        `options`: Other apply_async options, e.g. `priority`. They are not part of the deduplication key.
+
+    Returns:
+        The AsyncResult of the sent task, None if the call was coalesced with a previous one.
+    """
+    key = _dispatch_key(task, args, kwargs)
+
+    if leading and cache.add(key, 1, window):
+        try:
+            return dispatch(task, app_label, args=args, kwargs=kwargs, **options)
+        except Exception:
+            cache.delete(key)
+            raise
+
+    if cache.add(f'{key}:trailing', 1, window):
+        try:
+            return dispatch(task, app_label, args=args, kwargs=kwargs, countdown=window, **options)
+        except Exception:
+            cache.delete(f'{key}:trailing')
+            raise
+
+    logger.debug(f"Coalesced {task.name} with a previous call")
+    return None
@@ -0,0 +1,188 @@
+import csv
+import json
+import operator
+import zlib
+from functools import reduce
+from typing import Iterable, Iterator, List, Optional
+
+from django.db.models import Exists, OuterRef, Q, QuerySet
+
+from allianceauth.eveonline.models import EveCharacter
+
+from .app_settings import CHARLINK_EXPORT_CHUNK_SIZE
+from .app_imports.utils import LoginImport
+from .utils import chars_annotate_linked_apps
+
+EXPORT_FORMATS = ('csv', 'jsonl')
+
+BASE_FIELDS = {
+    'character_id': 'character_id',
+    'character_name': 'character_name',
+    'corporation_id': 'corporation_id',
+    'corporation_name': 'corporation_name',
+    'alliance_id': 'alliance_id',
+    'alliance_name': 'alliance_name',
+    'main_character_id': 'character_ownership__user__profile__main_character__character_id',
+    'main_character_name': 'character_ownership__user__profile__main_character__character_name',
+}
+
+
+class _Echo:
+    """
+    Pseudo buffer for csv.writer, returns the written row instead of storing it.
+    """
+
+    def write(self, value):
+        return value
+
+
+def filter_imports(imports: List[LoginImport], selected: Optional[Iterable[str]] = None) -> List[LoginImport]:
+    """
+    Filters the imports by query id or app label. An empty selection keeps every import.
+    """
+    selected = set(selected or [])
+    if not selected:
+        return list(imports)
+
+    return [
+        import_
+        for import_ in imports
+        if import_.get_query_id() in selected or import_.app_label in selected
+    ]
+
+
+def get_export_characters(
+    corp_ids: Optional[QuerySet] = None,
+    corporations: Optional[Iterable[int]] = None,
+    alliances: Optional[Iterable[int]] = None,
+    using: Optional[str] = None,
+) -> QuerySet[EveCharacter]:
+    """
+    Returns the characters to export.
+
+    Args:
+        `corp_ids`: visible corporations as a values('corporation_id') QuerySet, None means no visibility restriction.
+        `corporations`: optional list of corporation ids to filter on.
+        `alliances`: optional list of alliance ids to filter on.
+        `using`: database alias to read from, None means the default one.
+    """
+    characters = EveCharacter.objects.using(using).all()
+
+    if corp_ids is not None:
+        characters = characters.filter(
+            Q(corporation_id__in=corp_ids) |
+            Q(character_ownership__user__profile__main_character__corporation_id__in=corp_ids)
+        )
+
+    if corporations:
+        characters = characters.filter(corporation_id__in=corporations)
+
+    if alliances:
+        characters = characters.filter(alliance_id__in=alliances)
+
+    return characters.order_by('pk')
+
+
+def _allowed_alias(login_import: LoginImport) -> str:
+    return f'allowed_{login_import.get_query_id()}'
+
+
+def import_users_filter(login_import: LoginImport) -> Exists:
+    """
+    Filter on EveCharacter matching the characters whose owner can use the import.
+    """
+    return Exists(login_import.get_users_with_perms().filter(pk=OuterRef('character_ownership__user')))
+
+
+def annotate_import_users(characters: QuerySet[EveCharacter], imports: List[LoginImport]) -> QuerySet[EveCharacter]:
+    """
+    Annotates whether the owner of each character can use each import and keeps the characters allowed to use at least one of them.
+
+    Like the app audit pages, characters without an owner or whose owner lacks the import permissions are not audited for the import.
+    """
+    if not imports:
+        return characters.none()
+
+    characters = characters.annotate(**{
+        _allowed_alias(import_): import_users_filter(import_)
+        for import_ in imports
+    })
+
+    return characters.filter(reduce(operator.or_, (Q(**{_allowed_alias(import_): True}) for import_ in imports)))
+
+
+def iter_link_matrix(characters: QuerySet[EveCharacter], imports: List[LoginImport], chunk_size: int = CHARLINK_EXPORT_CHUNK_SIZE) -> Iterator[dict]:
+    """
+    Yields one dict per character with the base fields and the link status for each import.
+
+    The link status is None when the owner of the character can't use the import, see `annotate_import_users`.
+
+    Rows are fetched by pk pages of `chunk_size` characters, so memory usage doesn't depend on the number of characters.
+    A plain `.iterator()` isn't enough, MySQL and MariaDB buffer the whole result set on the client.
+    """
+    query_ids = [import_.get_query_id() for import_ in imports]
+    allowed = {import_.get_query_id(): _allowed_alias(import_) for import_ in imports}
+
+    rows = (
+        chars_annotate_linked_apps(annotate_import_users(characters, imports), imports)
+        .order_by('pk')
+        .values('pk', *BASE_FIELDS.values(), *query_ids, *allowed.values())
+    )
+
+    last_pk = None
+    while True:
+        page = rows if last_pk is None else rows.filter(pk__gt=last_pk)
+        page = list(page[:chunk_size])
+
+        for row in page:
+            yield {
+                **{field: row[lookup] for field, lookup in BASE_FIELDS.items()},
+                **{query_id: bool(row[query_id]) if row[allowed[query_id]] else None for query_id in query_ids},
+            }
+
+        if len(page) < chunk_size:
+            break
+
+        last_pk = page[-1]['pk']
+
+
+def stream_csv(characters: QuerySet[EveCharacter], imports: List[LoginImport], chunk_size: int = CHARLINK_EXPORT_CHUNK_SIZE) -> Iterator[str]:
+    fieldnames = [*BASE_FIELDS.keys(), *(import_.get_query_id() for import_ in imports)]
+    writer = csv.DictWriter(_Echo(), fieldnames=fieldnames)
+
+    yield writer.writeheader()
+    for row in iter_link_matrix(characters, imports, chunk_size):
+        yield writer.writerow(row)
+
+
+def stream_jsonl(characters: QuerySet[EveCharacter], imports: List[LoginImport], chunk_size: int = CHARLINK_EXPORT_CHUNK_SIZE) -> Iterator[str]:
+    for row in iter_link_matrix(characters, imports, chunk_size):
+        yield json.dumps(row) + '\n'
+
+
+def stream_export(
+    characters: QuerySet[EveCharacter],
+    imports: List[LoginImport],
+    export_format: str = 'csv',
+    chunk_size: int = CHARLINK_EXPORT_CHUNK_SIZE,
+) -> Iterator[str]:
+    if export_format == 'csv':
+        return stream_csv(characters, imports, chunk_size)
+    elif export_format == 'jsonl':
+        return stream_jsonl(characters, imports, chunk_size)
+
+    raise ValueError(f"Unknown export format {export_format}")
+
+
+def gzip_stream(chunks: Iterable[str]) -> Iterator[bytes]:
+    """
+    Compresses a stream of strings incrementally into a gzip stream.
+    """
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+
+    yield compressor.flush()
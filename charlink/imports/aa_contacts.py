@@ -1,6 +1,4 @@
-from django.contrib.auth.models import Permission
 from django.contrib import messages
-from django.db.models import Exists, OuterRef
 
 from allianceauth.eveonline.models import EveAllianceInfo, EveCharacter, EveCorporationInfo
 
@@ -9,9 +7,8 @@ from aa_contacts.tasks import update_alliance_contacts, update_corporation_conta
 
 from esi.models import Token
 
-from app_utils.allianceauth import users_with_permission
-
-from ..app_imports.utils import LoginImport, AppImport
+from ..app_imports.utils import LoginImport, AppImport, LinkSpec
+from ..dispatch import dispatch
 
 ALLIANCE_SCOPES = ['esi-alliances.read_contacts.v1']
 CORPORATION_SCOPES = ['esi-corporations.read_contacts.v1']
@@ -34,7 +31,7 @@ def _alliance_login(request, token: Token):
         assert False
 
     AllianceToken.objects.create(alliance=alliance, token=token)
-    update_alliance_contacts.delay(alliance.alliance_id)
+    dispatch(update_alliance_contacts, 'aa_contacts', args=[alliance.alliance_id])
 
 
 def _corporation_login(request, token: Token):
@@ -50,41 +47,7 @@ def _corporation_login(request, token: Token):
         assert False
 
     CorporationToken.objects.create(corporation=corporation, token=token)
-    update_corporation_contacts.delay(corporation.corporation_id)
-
-
-def _alliance_users_with_perms():
-    return users_with_permission(
-        Permission.objects.get(
-            content_type__app_label='aa_contacts',
-            codename='manage_alliance_contacts'
-        )
-    )
-
-
-def _corporation_users_with_perms():
-    return users_with_permission(
-        Permission.objects.get(
-            content_type__app_label='aa_contacts',
-            codename='manage_corporation_contacts'
-        )
-    )
-
-
-def _alliance_check_perms(user):
-    return user.has_perm('aa_contacts.manage_alliance_contacts')
-
-
-def _corporation_check_perms(user):
-    return user.has_perm('aa_contacts.manage_corporation_contacts')
-
-
-def _alliance_is_character_added(char: EveCharacter):
-    return AllianceToken.objects.filter(token__character_id=char.character_id).exists()
-
-
-def _corporation_is_character_added(char: EveCharacter):
-    return CorporationToken.objects.filter(token__character_id=char.character_id).exists()
+    dispatch(update_corporation_contacts, 'aa_contacts', args=[corporation.corporation_id])
 
 
 app_import = AppImport(
@@ -96,14 +59,8 @@ app_import = AppImport(
             field_label="Alliance Contacts",
             add_character=_alliance_login,
             scopes=ALLIANCE_SCOPES,
-            check_permissions=_alliance_check_perms,
-            is_character_added=_alliance_is_character_added,
-            is_character_added_annotation=Exists(
-                AllianceToken.objects.filter(
-                    token__character_id=OuterRef('character_id'),
-                )
-            ),
-            get_users_with_perms=_alliance_users_with_perms
+            required_permissions=['aa_contacts.manage_alliance_contacts'],
+            link_spec=LinkSpec(AllianceToken, 'token__character_id', 'character_id'),
         ),
         LoginImport(
             app_label="aa_contacts",
@@ -111,14 +68,8 @@ app_import = AppImport(
             field_label="Corporation Contacts",
             add_character=_corporation_login,
             scopes=CORPORATION_SCOPES,
-            check_permissions=_corporation_check_perms,
-            is_character_added=_corporation_is_character_added,
-            is_character_added_annotation=Exists(
-                CorporationToken.objects.filter(
-                    token__character_id=OuterRef('character_id'),
-                )
-            ),
-            get_users_with_perms=_corporation_users_with_perms
+            required_permissions=['aa_contacts.manage_corporation_contacts'],
+            link_spec=LinkSpec(CorporationToken, 'token__character_id', 'character_id'),
         )
     ]
 )
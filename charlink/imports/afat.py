@@ -1,12 +1,9 @@
 from django.db.models import Exists, OuterRef
-from django.contrib.auth.models import Permission, User
 
-from charlink.app_imports.utils import LoginImport, AppImport
+from charlink.app_imports.utils import LoginImport, AppImport, LinkSpec, PERMISSIONS_ANY
 
 from allianceauth.eveonline.models import EveCharacter
 
-from app_utils.allianceauth import users_with_permission
-
 from esi.models import Token
 
 _scopes_readfleet = ["esi-fleets.read_fleet.v1"]
@@ -33,33 +30,6 @@ def _is_character_added_clickfleet(character: EveCharacter):
     )
 
 
-def _check_perms_readfleet(user: User):
-    return user.has_perm('afat.manage_afat') or user.has_perm('afat.add_fatlink')
-
-
-def _users_with_perms_readfleet():
-    return users_with_permission(
-        Permission.objects.get(
-            content_type__app_label='afat',
-            codename='manage_afat'
-        )
-    ) | users_with_permission(
-        Permission.objects.get(
-            content_type__app_label='afat',
-            codename='add_fatlink'
-        )
-    )
-
-
-def _users_with_perms_clickfleet():
-    return users_with_permission(
-        Permission.objects.get(
-            content_type__app_label='afat',
-            codename='basic_access'
-        )
-    )
-
-
 app_import = AppImport('afat', [
     LoginImport(
         app_label='afat',
@@ -67,7 +37,8 @@ app_import = AppImport('afat', [
         field_label='AFAT Read Fleet',
         add_character=lambda requets, token: None,
         scopes=_scopes_readfleet,
-        check_permissions=_check_perms_readfleet,
+        required_permissions=['afat.manage_afat', 'afat.add_fatlink'],
+        required_permissions_mode=PERMISSIONS_ANY,
         is_character_added=_is_character_added_readfleet,
         is_character_added_annotation=Exists(
             Token.objects.all()
@@ -76,7 +47,7 @@ app_import = AppImport('afat', [
             .require_scopes(_scopes_readfleet)
             # .require_valid()
         ),
-        get_users_with_perms=_users_with_perms_readfleet,
+        dependencies=[LinkSpec(Token, 'character_id', 'character_id', tracked_fields=[])],
     ),
     LoginImport(
         app_label='afat',
@@ -84,7 +55,7 @@ app_import = AppImport('afat', [
         field_label='AFAT Click Fleet',
         add_character=lambda request, token: None,
         scopes=_scopes_clickfleet,
-        check_permissions=lambda user: user.has_perm('afat.basic_access'),
+        required_permissions=['afat.basic_access'],
         is_character_added=_is_character_added_clickfleet,
         is_character_added_annotation=Exists(
             Token.objects.all()
@@ -92,6 +63,6 @@ app_import = AppImport('afat', [
             .require_scopes(_scopes_clickfleet)
             # .require_valid()
         ),
-        get_users_with_perms=_users_with_perms_clickfleet,
+        dependencies=[LinkSpec(Token, 'character_id', 'character_id', tracked_fields=[])],
     )
 ])
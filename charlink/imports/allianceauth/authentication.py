@@ -3,7 +3,7 @@ from django.contrib.auth.models import User
 
 from allianceauth.authentication.models import CharacterOwnership
 
-from charlink.app_imports.utils import LoginImport, AppImport
+from charlink.app_imports.utils import LoginImport, AppImport, LinkSpec
 
 
 app_import = AppImport('allianceauth.authentication', [
@@ -14,8 +14,7 @@ app_import = AppImport('allianceauth.authentication', [
         add_character=lambda request, token: None,
         scopes=['publicData'],
         check_permissions=lambda user: True,
-        is_character_added=lambda character: CharacterOwnership.objects.filter(character=character).exists(),
-        is_character_added_annotation=Exists(CharacterOwnership.objects.filter(character_id=OuterRef('pk'))),
+        link_spec=LinkSpec(CharacterOwnership, 'character'),
         get_users_with_perms=lambda: User.objects.filter(
             Exists(CharacterOwnership.objects.filter(user_id=OuterRef('pk')))
         ),
@@ -1,13 +1,9 @@
-from django.db.models import Exists, OuterRef
-from django.contrib.auth.models import Permission
-
 from allianceauth.eveonline.models import EveCharacter, EveCorporationInfo
 
 from corpstats.models import CorpStat
 
-from charlink.app_imports.utils import LoginImport, AppImport
-
-from app_utils.allianceauth import users_with_permission
+from charlink.app_imports.utils import LoginImport, AppImport, LinkSpec
+from charlink.updates import queue_link_update
 
 
 def _add_character(request, token):
@@ -17,25 +13,8 @@ def _add_character(request, token):
     except EveCorporationInfo.DoesNotExist:
         corp = EveCorporationInfo.objects.create_corporation(corp_id)
     cs = CorpStat.objects.create(token=token, corp=corp)
-    cs.update()
-    assert cs.pk  # ensure update was successful
-
-
-def _is_character_added(character: EveCharacter):
-    return (
-        CorpStat.objects
-        .filter(token__character_id=character.character_id)
-        .exists()
-    )
-
-
-def _users_with_perms():
-    return users_with_permission(
-        Permission.objects.get(
-            content_type__app_label='corpstats',
-            codename='add_corpstat'
-        )
-    )
+    # the ESI requests run in a task, the outcome is polled from the link update status
+    queue_link_update(app_import.get('default'), token, cs)
 
 
 app_import = AppImport('corpstats', [
@@ -48,12 +27,7 @@ app_import = AppImport('corpstats', [
             'esi-corporations.track_members.v1',
             'esi-universe.read_structures.v1'
         ],
-        check_permissions=lambda user: user.has_perm('corpstats.add_corpstat'),
-        is_character_added=_is_character_added,
-        is_character_added_annotation=Exists(
-            CorpStat.objects
-            .filter(token__character_id=OuterRef('character_id'))
-        ),
-        get_users_with_perms=_users_with_perms,
+        required_permissions=['corpstats.add_corpstat'],
+        link_spec=LinkSpec(CorpStat, 'token__character_id', 'character_id'),
     ),
 ])
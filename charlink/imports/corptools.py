@@ -1,5 +1,3 @@
-from django.db.models import Exists, OuterRef
-from django.contrib.auth.models import Permission, User
 
 from corptools.models import CharacterAudit, CorporationAudit
 from corptools.tasks import update_character, update_all_corps
@@ -8,9 +6,14 @@ from corptools.views import CORP_REQUIRED_SCOPES
 
 from allianceauth.eveonline.models import EveCharacter, EveCorporationInfo
 
-from charlink.app_imports.utils import LoginImport, AppImport
+from charlink.app_imports.utils import LoginImport, AppImport, LinkSpec, PERMISSIONS_ANY
+from charlink.dispatch import dispatch, dispatch_once
 
-from app_utils.allianceauth import users_with_permission
+try:
+    from corptools.tasks import update_corp
+except ImportError:
+    # older corptools versions can only refresh every corporation
+    update_corp = None
 
 _corp_perms = [
     'corptools.own_corp_manager',
@@ -26,8 +29,7 @@ _corp_perms = [
 def _add_character_charaudit(request, token):
     CharacterAudit.objects.update_or_create(
         character=EveCharacter.objects.get_character_by_id(token.character_id))
-    update_character.apply_async(args=[token.character_id], kwargs={
-                                 "force_refresh": True}, priority=6)
+    dispatch(update_character, 'corptools', args=[token.character_id], kwargs={"force_refresh": True}, priority=6)
 
 
 def _add_character_corp(request, token):
@@ -38,46 +40,11 @@ def _add_character_corp(request, token):
                                                                        'corporation_name': char.corporation_name
                                                                        })
     CorporationAudit.objects.update_or_create(corporation=corp)
-    update_all_corps.apply_async(priority=6)
-
-
-def _check_perms_corp(user: User):
-    return any(user.has_perm(perm) for perm in _corp_perms)
-
-
-def _is_character_added_charaudit(character: EveCharacter):
-    return CharacterAudit.objects.filter(character=character).exists()
-
-
-def _is_character_added_corp(character: EveCharacter):
-    return CorporationAudit.objects.filter(corporation__corporation_id=character.corporation_id).exists()
-
-
-def _users_with_perms_charaudit():
-    return users_with_permission(
-        Permission.objects.get(
-            content_type__app_label='corptools',
-            codename='view_characteraudit'
-        )
-    )
-
-
-def _users_with_perms_corp():
-    users = users_with_permission(
-        Permission.objects.get(
-            content_type__app_label=_corp_perms[0].split('.')[0],
-            codename=_corp_perms[0].split('.')[1]
-        )
-    )
-    for perm_str in _corp_perms[1:]:
-        users |= users_with_permission(
-            Permission.objects.get(
-                content_type__app_label=perm_str.split('.')[0],
-                codename=perm_str.split('.')[1]
-            )
-        )
-
-    return users
+    if update_corp is not None:
+        dispatch_once(update_corp, args=[corp.corporation_id], app_label='corptools', priority=6)
+    else:
+        # refreshes every corporation, once per window is enough during onboarding waves
+        dispatch_once(update_all_corps, app_label='corptools', priority=6)
 
 
 app_import = AppImport('corptools', [
@@ -87,13 +54,8 @@ app_import = AppImport('corptools', [
         field_label=CORPTOOLS_APP_NAME,
         add_character=_add_character_charaudit,
         scopes=get_character_scopes(),
-        check_permissions=lambda user: user.has_perm('corptools.view_characteraudit'),
-        is_character_added=_is_character_added_charaudit,
-        is_character_added_annotation=Exists(
-            CharacterAudit.objects
-            .filter(character_id=OuterRef('pk'))
-        ),
-        get_users_with_perms=_users_with_perms_charaudit,
+        required_permissions=['corptools.view_characteraudit'],
+        link_spec=LinkSpec(CharacterAudit, 'character'),
     ),
     LoginImport(
         app_label='corptools',
@@ -101,12 +63,13 @@ app_import = AppImport('corptools', [
         field_label="Corporation Audit",
         add_character=_add_character_corp,
         scopes=CORP_REQUIRED_SCOPES,
-        check_permissions=_check_perms_corp,
-        is_character_added=_is_character_added_corp,
-        is_character_added_annotation=Exists(
-            CorporationAudit.objects
-            .filter(corporation__corporation_id=OuterRef('corporation_id'))
-        ),
-        get_users_with_perms=_users_with_perms_corp,
+        required_permissions=_corp_perms,
+        required_permissions_mode=PERMISSIONS_ANY,
+        link_spec=LinkSpec(CorporationAudit, 'corporation__corporation_id', 'corporation_id'),
+        dependencies=[
+            LinkSpec(CorporationAudit, 'corporation__corporation_id', 'corporation_id'),
+            # the status follows the character's corporation
+            LinkSpec(EveCharacter, 'id', tracked_fields=['corporation_id']),
+        ],
     )
 ])
@@ -1,12 +1,10 @@
 from django.db.models import Exists, OuterRef
-from django.contrib.auth.models import Permission
 
 from allianceauth.eveonline.models import EveCharacter
 
-from charlink.app_imports.utils import LoginImport, AppImport
+from charlink.app_imports.utils import LoginImport, AppImport, LinkSpec
 
 from marketmanager.views import CHARACTER_SCOPES, CORPORATION_SCOPES
-from app_utils.allianceauth import users_with_permission
 from esi.models import Token
 
 
@@ -37,14 +35,14 @@ app_import = AppImport('marketmanager', [
         field_label='Market Manager Character Login',
         add_character=lambda request, token: None,
         scopes=CHARACTER_SCOPES,
-        check_permissions=lambda user: user.has_perm("marketmanager.basic_market_browser"),
+        required_permissions=['marketmanager.basic_market_browser'],
         is_character_added=_is_character_added_character_login,
         is_character_added_annotation=Exists(
             Token.objects
             .filter(character_id=OuterRef('character_id'))
             .require_scopes(CHARACTER_SCOPES)
         ),
-        get_users_with_perms=lambda: users_with_permission(Permission.objects.get(content_type__app_label='marketmanager', codename='basic_market_browser'))
+        dependencies=[LinkSpec(Token, 'character_id', 'character_id', tracked_fields=[])],
     ),
     LoginImport(
         app_label='marketmanager',
@@ -52,13 +50,13 @@ app_import = AppImport('marketmanager', [
         field_label='Market Manager Corporation Login',
         add_character=lambda request, token: None,
         scopes=CORPORATION_SCOPES,
-        check_permissions=lambda user: user.has_perm("marketmanager.basic_market_browser"),
+        required_permissions=['marketmanager.basic_market_browser'],
         is_character_added=_is_character_added_corporation_login,
         is_character_added_annotation=Exists(
             Token.objects
             .filter(character_id=OuterRef('character_id'))
             .require_scopes(CORPORATION_SCOPES)
         ),
-        get_users_with_perms=lambda: users_with_permission(Permission.objects.get(content_type__app_label='marketmanager', codename='basic_market_browser'))
+        dependencies=[LinkSpec(Token, 'character_id', 'character_id', tracked_fields=[])],
     )
 ])
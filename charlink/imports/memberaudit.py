@@ -1,6 +1,5 @@
+from django.core.cache import cache
 from django.db import transaction
-from django.db.models import Exists, OuterRef
-from django.contrib.auth.models import Permission
 from django.contrib import messages
 from django.utils.html import format_html
 
@@ -12,9 +11,19 @@ from memberaudit import tasks
 
 from allianceauth.eveonline.models import EveCharacter
 
-from charlink.app_imports.utils import LoginImport, AppImport
+from charlink.app_imports.utils import LoginImport, AppImport, LinkSpec
+from charlink.dispatch import dispatch, dispatch_once
+from charlink.signals import MEMBERAUDIT_COMPLIANCE_DESIGNATIONS_KEY
 
-from app_utils.allianceauth import users_with_permission
+
+def _has_compliance_designations() -> bool:
+    has_designations = cache.get(MEMBERAUDIT_COMPLIANCE_DESIGNATIONS_KEY)
+    if has_designations is None:
+        has_designations = ComplianceGroupDesignation.objects.exists()
+        # cleared when a designation is saved or deleted
+        cache.set(MEMBERAUDIT_COMPLIANCE_DESIGNATIONS_KEY, has_designations, None)
+
+    return has_designations
 
 
 def _add_character(request, token: Token):
@@ -23,7 +32,9 @@ def _add_character(request, token: Token):
         character, created = Character.objects.update_or_create(
             eve_character=eve_character, defaults={"is_disabled": False}
         )
-    tasks.update_character.apply_async(
+    dispatch(
+        tasks.update_character,
+        'memberaudit',
         kwargs={
             "character_pk": character.pk,
             "force_update": True,
@@ -42,25 +53,17 @@ def _add_character(request, token: Token):
             ),
         ),
     )
-    if ComplianceGroupDesignation.objects.exists():
-        tasks.update_compliance_groups_for_user.apply_async(
-            args=[token.user.pk], priority=MEMBERAUDIT_TASKS_NORMAL_PRIORITY
+    if _has_compliance_designations():
+        # one run per user at the end of the window, after all the alts linked in a row
+        dispatch_once(
+            tasks.update_compliance_groups_for_user,
+            args=[token.user.pk],
+            leading=False,
+            app_label='memberaudit',
+            priority=MEMBERAUDIT_TASKS_NORMAL_PRIORITY,
         )
 
 
-def _is_character_added(character: EveCharacter):
-    return Character.objects.filter(eve_character=character).exists()
-
-
-def _users_with_perms():
-    return users_with_permission(
-        Permission.objects.get(
-            content_type__app_label='memberaudit',
-            codename='basic_access'
-        )
-    )
-
-
 app_import = AppImport('memberaudit', [
     LoginImport(
         app_label='memberaudit',
@@ -68,12 +71,7 @@ app_import = AppImport('memberaudit', [
         field_label=MEMBERAUDIT_APP_NAME,
         add_character=_add_character,
         scopes=Character.get_esi_scopes(),
-        check_permissions=lambda user: user.has_perm("memberaudit.basic_access"),
-        is_character_added=_is_character_added,
-        is_character_added_annotation=Exists(
-            Character.objects
-            .filter(eve_character_id=OuterRef('pk'))
-        ),
-        get_users_with_perms=_users_with_perms,
+        required_permissions=['memberaudit.basic_access'],
+        link_spec=LinkSpec(Character, 'eve_character'),
     ),
 ])
@@ -1,5 +1,3 @@
-from django.db.models import Exists, OuterRef
-from django.contrib.auth.models import Permission
 
 from moonstuff.providers import ESI_CHARACTER_SCOPES
 from moonstuff.models import TrackingCharacter
@@ -7,9 +5,8 @@ from moonstuff.tasks import import_extraction_data
 
 from allianceauth.eveonline.models import EveCharacter
 
-from charlink.app_imports.utils import LoginImport, AppImport
-
-from app_utils.allianceauth import users_with_permission
+from charlink.app_imports.utils import LoginImport, AppImport, LinkSpec
+from charlink.dispatch import dispatch_once
 
 
 def _add_character(request, token):
@@ -20,24 +17,12 @@ def _add_character(request, token):
         char.save()
 
         # Schedule an import task to pull data from the new Tracking Character.
-        import_extraction_data.delay()
+        # It imports the data of every tracking character, so calls are coalesced.
+        dispatch_once(import_extraction_data, app_label='moonstuff')
     else:
         assert False
 
 
-def _is_character_added(character: EveCharacter):
-    return TrackingCharacter.objects.filter(character=character).exists()
-
-
-def _users_with_perms():
-    return users_with_permission(
-        Permission.objects.get(
-            content_type__app_label='moonstuff',
-            codename='add_trackingcharacter'
-        )
-    )
-
-
 app_import = AppImport('moonstuff', [
     LoginImport(
         app_label='moonstuff',
@@ -45,12 +30,7 @@ app_import = AppImport('moonstuff', [
         field_label='Moon Tools',
         add_character=_add_character,
         scopes=ESI_CHARACTER_SCOPES,
-        check_permissions=lambda user: user.has_perm('moonstuff.add_trackingcharacter'),
-        is_character_added=_is_character_added,
-        is_character_added_annotation=Exists(
-            TrackingCharacter.objects
-            .filter(character_id=OuterRef('pk'))
-        ),
-        get_users_with_perms=_users_with_perms,
+        required_permissions=['moonstuff.add_trackingcharacter'],
+        link_spec=LinkSpec(TrackingCharacter, 'character'),
     ),
 ])
@@ -1,12 +1,9 @@
-from django.db.models import Exists, OuterRef
-from django.contrib.auth.models import Permission
 
 from django.utils import translation
 from django.utils.translation import gettext as _
 from django.utils.html import format_html
 from django.contrib import messages
 
-
 from structures import __title__, tasks
 from structures.models import Owner, Webhook, OwnerCharacter
 from structures.app_settings import (
@@ -14,13 +11,12 @@ from structures.app_settings import (
     STRUCTURES_DEFAULT_LANGUAGE,
 )
 
-from app_utils.allianceauth import notify_admins
-from app_utils.allianceauth import users_with_permission
-
 from allianceauth.eveonline.models import EveCharacter, EveCorporationInfo
 from allianceauth.authentication.models import CharacterOwnership
 
-from charlink.app_imports.utils import LoginImport, AppImport
+from charlink.app_imports.utils import LoginImport, AppImport, LinkSpec
+from charlink.dispatch import dispatch
+from charlink.notifications import queue_admin_notification
 
 
 def _add_character(request, token):
@@ -49,7 +45,7 @@ def _add_character(request, token):
             owner.save()
 
     if owner.characters.count() == 1:
-        tasks.update_all_for_owner.delay(owner_pk=owner.pk, user_pk=request.user.pk)
+        dispatch(tasks.update_all_for_owner, 'structures', kwargs={'owner_pk': owner.pk, 'user_pk': request.user.pk})
         messages.info(
             request,
             format_html(
@@ -66,7 +62,8 @@ def _add_character(request, token):
 
         if STRUCTURES_ADMIN_NOTIFICATIONS_ENABLED:
             with translation.override(STRUCTURES_DEFAULT_LANGUAGE):
-                notify_admins(
+                queue_admin_notification(
+                    group=f"structures:owner:{owner.pk}",
                     message=_(
                         "%(corporation)s was added as new "
                         "structure owner by %(user)s."
@@ -75,6 +72,7 @@ def _add_character(request, token):
                     title=_("%s: Structure owner added: %s") % (__title__, owner),
                 )
     else:
+        characters_count = owner.valid_characters_count()
         messages.info(
             request,
             format_html(
@@ -86,13 +84,14 @@ def _add_character(request, token):
                 % {
                     "corporation": owner,
                     "character": token_char,
-                    "characters_count": owner.valid_characters_count(),
+                    "characters_count": characters_count,
                 }
             ),
         )
         if STRUCTURES_ADMIN_NOTIFICATIONS_ENABLED:
             with translation.override(STRUCTURES_DEFAULT_LANGUAGE):
-                notify_admins(
+                queue_admin_notification(
+                    group=f"structures:owner:{owner.pk}",
                     message=_(
                         "%(character)s was added as sync character to "
                         "%(corporation)s by %(user)s.\n"
@@ -102,27 +101,12 @@ def _add_character(request, token):
                         "character": token_char,
                         "corporation": owner,
                         "user": request.user.username,
-                        "characters_count": owner.valid_characters_count(),
+                        "characters_count": characters_count,
                     },
                     title=_("%s: Character added to: %s") % (__title__, owner),
                 )
 
 
-def _is_character_added(character: EveCharacter):
-    return OwnerCharacter.objects.filter(
-        character_ownership__character=character
-    ).exists()
-
-
-def _users_with_perms():
-    return users_with_permission(
-        Permission.objects.get(
-            content_type__app_label='structures',
-            codename='add_structure_owner'
-        )
-    )
-
-
 app_import = AppImport('structures', [
     LoginImport(
         app_label='structures',
@@ -130,12 +114,7 @@ app_import = AppImport('structures', [
         field_label=__title__,
         add_character=_add_character,
         scopes=Owner.get_esi_scopes(),
-        check_permissions=lambda user: user.has_perm("structures.add_structure_owner"),
-        is_character_added=_is_character_added,
-        is_character_added_annotation=Exists(
-            OwnerCharacter.objects
-            .filter(character_ownership__character_id=OuterRef('pk'))
-        ),
-        get_users_with_perms=_users_with_perms,
+        required_permissions=['structures.add_structure_owner'],
+        link_spec=LinkSpec(OwnerCharacter, 'character_ownership__character'),
     ),
 ])
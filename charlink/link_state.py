@@ -0,0 +1,230 @@
+import hashlib
+import json
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Type
+
+from django.contrib.auth.models import User, Group
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Model
+
+from allianceauth.authentication.models import CharacterOwnership, UserProfile, State
+from allianceauth.eveonline.models import EveCharacter, EveCorporationInfo, EveAllianceInfo
+
+from . import __version__
+from .app_settings import CHARLINK_IGNORE_APPS, CHARLINK_LINK_STATE_DIRTY_TTL, CHARLINK_READ_DATABASE
+from .app_imports import import_apps
+from .app_imports.utils import LinkSpec, LoginImport
+
+LINK_STATE_VERSION_KEY = 'charlink:link_state:version'
+
+PERMISSIONS_VERSION_KEY = 'charlink:permissions:version'
+
+# models that change which characters an auditor can see or how they are shown, with the fields whose updates matter.
+# An empty list means only the creations and deletions matter, None means every change does.
+# Per import link changes bump the import versions instead.
+VISIBILITY_MODELS = {
+    CharacterOwnership: ['character', 'user'],
+    UserProfile: ['main_character', 'state'],
+    EveCharacter: ['character_name', 'corporation_id', 'corporation_name', 'alliance_id', 'alliance_name'],
+    EveCorporationInfo: ['corporation_name', 'alliance'],
+    EveAllianceInfo: ['alliance_name'],
+    State: [],
+    State.member_characters.through: None,
+    State.member_corporations.through: None,
+    State.member_alliances.through: None,
+    State.permissions.through: None,
+    User.groups.through: None,
+    User.user_permissions.through: None,
+    Group.permissions.through: None,
+}
+
+# models that change the permissions of the users, with the fields whose updates matter, like VISIBILITY_MODELS
+PERMISSION_MODELS = {
+    User: ['is_superuser', 'is_active'],
+    UserProfile: ['state'],
+    Group: [],
+    State: [],
+    State.permissions.through: None,
+    User.groups.through: None,
+    User.user_permissions.through: None,
+    Group.permissions.through: None,
+}
+
+_dependency_index = None
+
+
+def _version_key(query_id: str) -> str:
+    return f'charlink:link_state:{query_id}:version'
+
+
+def _full_key(query_id: str) -> str:
+    return f'charlink:link_state:{query_id}:full'
+
+
+def _dirty_key(query_id: str, character_id: int) -> str:
+    return f'charlink:link_state:{query_id}:dirty:{character_id}'
+
+
+def _get_or_init(key: str) -> int:
+    version = cache.get(key)
+    if version is None:
+        version = int(time.time() * 1000)
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+
+    return version
+
+
+def _incr(key: str) -> int:
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = int(time.time() * 1000)
+        cache.set(key, version, None)
+        return version
+
+
+def get_link_state_version() -> int:
+    """
+    Returns the current version of the visibility inputs, see VISIBILITY_MODELS, initializing it if missing.
+
+    The initial value is the current time in milliseconds, so versions handed out before a cache flush are not handed out again.
+    """
+    return _get_or_init(LINK_STATE_VERSION_KEY)
+
+
+def bump_link_state_version() -> int:
+    return _incr(LINK_STATE_VERSION_KEY)
+
+
+def get_permissions_version() -> int:
+    """
+    Returns the current version of the user permissions, see PERMISSION_MODELS, initializing it if missing.
+    """
+    return _get_or_init(PERMISSIONS_VERSION_KEY)
+
+
+def bump_permissions_version() -> int:
+    return _incr(PERMISSIONS_VERSION_KEY)
+
+
+def get_import_version(login_import: LoginImport) -> int:
+    return _get_or_init(_version_key(login_import.get_query_id()))
+
+
+def get_import_versions(imports: Iterable[LoginImport]) -> List[int]:
+    """
+    Returns the versions of the imports with a single cache request, initializing the missing ones.
+    """
+    keys = [_version_key(import_.get_query_id()) for import_ in imports]
+    versions = cache.get_many(keys)
+
+    return [versions[key] if key in versions else _get_or_init(key) for key in keys]
+
+
+def _get_imports() -> List[LoginImport]:
+    return [
+        import_
+        for app, app_import in import_apps().items()
+        if app not in CHARLINK_IGNORE_APPS
+        for import_ in app_import.imports
+    ]
+
+
+def mark_import_changed(login_import: LoginImport, character_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Bumps the version of the import and marks the characters as changed at the new version.
+
+    `character_ids` are EveCharacter pks, None means the change could not be attributed to specific characters.
+    """
+    query_id = login_import.get_query_id()
+    version = _incr(_version_key(query_id))
+
+    if character_ids is None:
+        cache.set(_full_key(query_id), version, None)
+    else:
+        cache.set_many(
+            {_dirty_key(query_id, character_id): version for character_id in character_ids},
+            CHARLINK_LINK_STATE_DIRTY_TTL
+        )
+
+    return version
+
+
+def get_changed_characters(login_import: LoginImport, character_ids: Iterable[int], since_version: int) -> Optional[Set[int]]:
+    """
+    Returns which of the characters changed after `since_version`, None if everything must be considered changed.
+
+    Dirty markers expire after CHARLINK_LINK_STATE_DIRTY_TTL seconds, anything built from an older version must be rebuilt.
+    """
+    query_id = login_import.get_query_id()
+
+    full_version = cache.get(_full_key(query_id))
+    if full_version is not None and full_version > since_version:
+        return None
+
+    character_ids = list(character_ids)
+    markers = cache.get_many([_dirty_key(query_id, character_id) for character_id in character_ids])
+
+    return {
+        character_id
+        for character_id in character_ids
+        if markers.get(_dirty_key(query_id, character_id), since_version) > since_version
+    }
+
+
+def get_dependency_index() -> Dict[Type[Model], List[Tuple[LoginImport, Optional[LinkSpec]]]]:
+    """
+    Returns the imports affected by each model, along with the LinkSpec resolving the affected characters if declared.
+    """
+    global _dependency_index
+    if _dependency_index is None:
+        index = {}
+
+        for app, app_import in import_apps().items():
+            if app not in CHARLINK_IGNORE_APPS:
+                for import_ in app_import.imports:
+                    for dependency in import_.get_dependencies():
+                        if isinstance(dependency, LinkSpec):
+                            index.setdefault(dependency.model, []).append((import_, dependency))
+                        else:
+                            index.setdefault(dependency, []).append((import_, None))
+
+        _dependency_index = index
+
+    return _dependency_index
+
+
+def get_visibility_signature(user: User) -> str:
+    """
+    Hash of what decides the characters visible by the user.
+
+    Changes of the main character's corporation or alliance bump the link state version instead.
+    """
+    return hashlib.md5(json.dumps([
+        user.pk,
+        user.is_superuser,
+        user.profile.state_id,
+        user.profile.main_character_id,
+        sorted(user.get_all_permissions()),
+    ]).encode('utf-8')).hexdigest()
+
+
+def link_state_etag(request, *args, **kwargs) -> Optional[str]:
+    """
+    ETag of an audit page, changes when the visibility inputs, the links of any import or the auditor's visibility change.
+
+    None when the pages are read from another database than the default one: the versions are bumped when the primary commits,
+    a lagging replica would render stale pages under the new ETag.
+    """
+    if CHARLINK_READ_DATABASE != DEFAULT_DB_ALIAS:
+        return None
+
+    return hashlib.md5(json.dumps([
+        __version__,
+        request.get_full_path(),
+        get_link_state_version(),
+        get_import_versions(_get_imports()),
+        get_visibility_signature(request.user),
+    ]).encode('utf-8')).hexdigest()
@@ -0,0 +1,59 @@
+from django.contrib.auth.models import User
+from django.core.exceptions import PermissionDenied
+from django.core.management.base import BaseCommand, CommandError
+from django.http import Http404
+from django.test import RequestFactory, AsyncRequestFactory
+from django.urls import reverse
+
+from charlink import views
+from charlink.profiling import benchmark_view
+from charlink.utils import get_user_available_apps
+
+
+class Command(BaseCommand):
+    help = "Compare the end-to-end latency of the sync (WSGI) and async (ASGI) audit views"
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help="Auditor the requests are made as")
+        parser.add_argument('--app', dest='apps', action='append', default=[], help="App to audit, can be repeated. Defaults to the apps available to the auditor")
+        parser.add_argument('--audit-user', dest='audit_users', type=int, action='append', default=[], help="Id of a user to audit, can be repeated. Defaults to the auditor")
+        parser.add_argument('--runs', type=int, default=5, help="Number of timed runs for each view")
+
+    def handle(self, *args, **options):
+        try:
+            auditor = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['username']} not found")
+
+        if options['runs'] < 1:
+            raise CommandError("--runs must be at least 1")
+
+        targets = [
+            ('audit_app', views.audit_app, views.audit_app_async, {'app': app})
+            for app in options['apps'] or get_user_available_apps(auditor)
+        ] + [
+            ('audit_user', views.audit_user, views.audit_user_async, {'user_id': user_id})
+            for user_id in options['audit_users'] or [auditor.pk]
+        ]
+
+        self.stdout.write(f"{'view':<12} {'target':<40} {'sync ms':>10} {'async ms':>10} {'speedup':>8}")
+        for name, sync_view, async_view, kwargs in targets:
+            path = reverse(f'charlink:{name}', kwargs=kwargs)
+            results = []
+
+            for factory, view in ((RequestFactory(), sync_view), (AsyncRequestFactory(), async_view)):
+                request = factory.get(path)
+                request.user = auditor
+
+                try:
+                    results.append(benchmark_view(view, request, runs=options['runs'], **kwargs))
+                except (PermissionDenied, Http404) as e:
+                    self.stderr.write(f"{path}: {e.__class__.__name__}")
+                    break
+            else:
+                sync_result, async_result = results
+                self.stdout.write(
+                    f"{name:<12} {str(next(iter(kwargs.values()))):<40} "
+                    f"{sync_result['best'] * 1000:>10.2f} {async_result['best'] * 1000:>10.2f} "
+                    f"{sync_result['best'] / async_result['best']:>7.2f}x"
+                )
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from charlink.app_imports import import_apps
+from charlink.app_settings import CHARLINK_IGNORE_APPS, CHARLINK_EXPORT_CHUNK_SIZE
+from charlink.exports import EXPORT_FORMATS, filter_imports, get_export_characters, stream_export, gzip_stream
+
+
+class Command(BaseCommand):
+    help = "Export the link status of every character for every import as CSV or JSONL"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv', help="Output format")
+        parser.add_argument('--gzip', action='store_true', help="Compress the output with gzip")
+        parser.add_argument('--corp', type=int, action='append', default=[], help="Corporation id to export, can be repeated")
+        parser.add_argument('--alliance', type=int, action='append', default=[], help="Alliance id to export, can be repeated")
+        parser.add_argument('--import', dest='imports', action='append', default=[], help="App label or import id to export, can be repeated")
+        parser.add_argument('--chunk-size', type=int, default=CHARLINK_EXPORT_CHUNK_SIZE, help="Number of rows fetched from the database at a time")
+        parser.add_argument('--output', help="Output file, defaults to stdout")
+
+    def handle(self, *args, **options):
+        imports = filter_imports(
+            [
+                import_
+                for app, app_imports in import_apps().items()
+                if app not in CHARLINK_IGNORE_APPS
+                for import_ in app_imports.imports
+            ],
+            options['imports']
+        )
+
+        if not imports:
+            raise CommandError("No imports selected")
+
+        if options['gzip'] and not options['output']:
+            raise CommandError("--gzip requires --output")
+
+        characters = get_export_characters(
+            corporations=options['corp'],
+            alliances=options['alliance'],
+        )
+
+        stream = stream_export(characters, imports, options['format'], options['chunk_size'])
+
+        if options['gzip']:
+            with open(options['output'], 'wb') as f:
+                for chunk in gzip_stream(stream):
+                    f.write(chunk)
+        elif options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as f:
+                for chunk in stream:
+                    f.write(chunk)
+        else:
+            for chunk in stream:
+                self.stdout.write(chunk, ending='')
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from charlink.app_imports import get_load_diagnostics
+from charlink.app_imports.utils import LOAD_STATUS_LOADED
+
+
+class Command(BaseCommand):
+    help = "Show how each import module was loaded, with import and validation times and the failure reasons"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--failed', action='store_true', help="Only show the modules that did not load")
+
+    def handle(self, *args, **options):
+        diagnostics = [
+            diagnostic
+            for diagnostic in get_load_diagnostics()
+            if not options['failed'] or diagnostic.status != LOAD_STATUS_LOADED
+        ]
+
+        self.stdout.write(f"{'module':<50} {'source':<8} {'status':<11} {'import ms':>10} {'validate ms':>12}")
+        for diagnostic in sorted(diagnostics, key=lambda d: d.import_time + d.validate_time, reverse=True):
+            line = (
+                f"{diagnostic.module:<50} {diagnostic.source:<8} {diagnostic.status:<11} "
+                f"{diagnostic.import_time * 1000:>10.2f} {diagnostic.validate_time * 1000:>12.2f}"
+            )
+
+            if diagnostic.status == LOAD_STATUS_LOADED:
+                self.stdout.write(line)
+            else:
+                self.stdout.write(self.style.ERROR(line))
+
+            if diagnostic.error:
+                self.stdout.write(f"    {diagnostic.error}")
@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from charlink.app_imports import import_apps
+from charlink.app_settings import CHARLINK_IGNORE_APPS, CHARLINK_READ_DATABASE
+from charlink.exports import filter_imports, get_export_characters
+from charlink.profiling import profile_imports
+
+
+class Command(BaseCommand):
+    help = "Time the link check annotation of every import against a sample of characters and rank the imports from the slowest"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sample', type=int, default=1000, help="Number of characters to check, 0 for all of them")
+        parser.add_argument('--runs', type=int, default=3, help="Number of timed runs for each import")
+        parser.add_argument('--corp', type=int, action='append', default=[], help="Corporation id to sample from, can be repeated")
+        parser.add_argument('--import', dest='imports', action='append', default=[], help="App label or import id to profile, can be repeated")
+        parser.add_argument('--database', default=CHARLINK_READ_DATABASE, help="Database alias to run the queries on")
+        parser.add_argument('--no-explain', dest='explain', action='store_false', help="Don't print the query plans")
+
+    def handle(self, *args, **options):
+        imports = filter_imports(
+            [
+                import_
+                for app, app_imports in import_apps().items()
+                if app not in CHARLINK_IGNORE_APPS
+                for import_ in app_imports.imports
+            ],
+            options['imports']
+        )
+
+        if not imports:
+            raise CommandError("No imports selected")
+
+        if options['runs'] < 1:
+            raise CommandError("--runs must be at least 1")
+
+        characters = get_export_characters(corporations=options['corp'], using=options['database'])
+
+        results = profile_imports(
+            characters,
+            imports,
+            runs=options['runs'],
+            explain=options['explain'],
+            sample=options['sample'] or None,
+        )
+
+        self.stdout.write(f"{'rank':>4}  {'import':<50} {'best ms':>10} {'mean ms':>10} {'queries':>8} {'linked':>15}")
+        for rank, result in enumerate(results, start=1):
+            self.stdout.write(
+                f"{rank:>4}  {result['import_id']:<50} "
+                f"{result['best'] * 1000:>10.2f} {result['mean'] * 1000:>10.2f} "
+                f"{result['queries']:>8} {result['linked']:>7}/{result['characters']:<7}"
+            )
+
+        if options['explain']:
+            for result in results:
+                self.stdout.write('')
+                self.stdout.write(self.style.MIGRATE_HEADING(result['import_id']))
+                self.stdout.write(result['explain'])
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-19 06:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('charlink', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CoverageSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('scope', models.CharField(choices=[('corporation', 'Corporation'), ('alliance', 'Alliance'), ('state', 'State')], max_length=16)),
+                ('scope_id', models.PositiveBigIntegerField()),
+                ('import_id', models.CharField(max_length=255)),
+                ('characters_linked', models.PositiveIntegerField(default=0)),
+                ('characters_total', models.PositiveIntegerField(default=0)),
+                ('users_linked', models.PositiveIntegerField(default=0)),
+                ('users_total', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'default_permissions': (),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='coveragesnapshot',
+            constraint=models.UniqueConstraint(fields=('scope', 'scope_id', 'import_id', 'date'), name='charlink_coveragesnapshot_unique'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-19 07:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('charlink', '0002_coveragesnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AddCharacterStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('import_id', models.CharField(max_length=255)),
+                ('bucket', models.PositiveSmallIntegerField()),
+                ('successes', models.PositiveIntegerField(default=0)),
+                ('failures', models.PositiveIntegerField(default=0)),
+                ('duration_total', models.FloatField(default=0, help_text='Sum of the call durations in seconds')),
+            ],
+            options={
+                'verbose_name_plural': 'add character stats',
+                'default_permissions': (),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='addcharacterstats',
+            constraint=models.UniqueConstraint(fields=('import_id', 'date', 'bucket'), name='charlink_addcharacterstats_unique'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-19 08:49
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('charlink', '0004_pendingadminnotification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LinkUpdate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('import_id', models.CharField(max_length=255)),
+                ('character_id', models.PositiveIntegerField()),
+                ('model', models.CharField(help_text='Label of the updated model, e.g. corputils.CorpStats', max_length=255)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('success', 'Success'), ('failure', 'Failure')], default='pending', max_length=16)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'default_permissions': (),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='linkupdate',
+            constraint=models.UniqueConstraint(fields=('import_id', 'character_id'), name='charlink_linkupdate_unique'),
+        ),
+    ]
@@ -1,4 +1,10 @@
+import datetime
+
 from django.db import models
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from .app_settings import CHARLINK_LINK_UPDATE_TIMEOUT
 
 
 class General(models.Model):
@@ -10,3 +16,133 @@ class General(models.Model):
             ('view_alliance', 'Can view linked character of members of their alliance.'),
             ('view_state', 'Can view linked character of members of their auth state.'),
         )
+
+
+class CoverageSnapshot(models.Model):
+    class Scope(models.TextChoices):
+        CORPORATION = 'corporation', 'Corporation'
+        ALLIANCE = 'alliance', 'Alliance'
+        STATE = 'state', 'State'
+
+    date = models.DateField()
+    scope = models.CharField(max_length=16, choices=Scope.choices)
+    scope_id = models.PositiveBigIntegerField()
+    import_id = models.CharField(max_length=255)
+
+    characters_linked = models.PositiveIntegerField(default=0)
+    characters_total = models.PositiveIntegerField(default=0)
+    users_linked = models.PositiveIntegerField(default=0)
+    users_total = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        default_permissions = ()
+        constraints = [
+            models.UniqueConstraint(
+                fields=['scope', 'scope_id', 'import_id', 'date'],
+                name='charlink_coveragesnapshot_unique',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.scope} {self.scope_id} {self.import_id} {self.date}"
+
+
+class AddCharacterStats(models.Model):
+    """
+    Daily counters of the add_character calls of an import, one row per duration bucket.
+    """
+
+    # upper bounds in milliseconds of the duration buckets, the last bucket holds the slower calls
+    BUCKET_BOUNDS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+    date = models.DateField()
+    import_id = models.CharField(max_length=255)
+    bucket = models.PositiveSmallIntegerField()
+
+    successes = models.PositiveIntegerField(default=0)
+    failures = models.PositiveIntegerField(default=0)
+    duration_total = models.FloatField(default=0, help_text="Sum of the call durations in seconds")
+
+    class Meta:
+        default_permissions = ()
+        verbose_name_plural = 'add character stats'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['import_id', 'date', 'bucket'],
+                name='charlink_addcharacterstats_unique',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.import_id} {self.date} {self.get_bucket_label(self.bucket)}"
+
+    @classmethod
+    def get_bucket_label(cls, bucket: int) -> str:
+        if bucket < len(cls.BUCKET_BOUNDS):
+            return f"< {cls.BUCKET_BOUNDS[bucket]} ms"
+
+        return f">= {cls.BUCKET_BOUNDS[-1]} ms"
+
+
+class PendingAdminNotification(models.Model):
+    """
+    Admin notification waiting to be sent in a digest with the other notifications of its group.
+    """
+
+    group = models.CharField(max_length=255, db_index=True)
+    title = models.CharField(max_length=255)
+    message = models.TextField()
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        default_permissions = ()
+
+    def __str__(self):
+        return f"{self.group}: {self.title}"
+
+
+class LinkUpdate(models.Model):
+    """
+    Status of the background update started by an import when a character is linked.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        SUCCESS = 'success', 'Success'
+        FAILURE = 'failure', 'Failure'
+
+    EXPIRED_ERROR = "The update didn't finish in time, link the character again to retry"
+
+    import_id = models.CharField(max_length=255)
+    character_id = models.PositiveIntegerField()
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, related_name='+')
+
+    model = models.CharField(max_length=255, help_text="Label of the updated model, e.g. corputils.CorpStats")
+    object_id = models.PositiveBigIntegerField()
+
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.PENDING)
+    error = models.TextField(blank=True, default='')
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        default_permissions = ()
+        constraints = [
+            models.UniqueConstraint(
+                fields=['import_id', 'character_id'],
+                name='charlink_linkupdate_unique',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.import_id} {self.character_id} {self.status}"
+
+    @staticmethod
+    def get_expired_before() -> datetime.datetime:
+        """
+        Pending updates last changed before this time are considered failed, their task was probably lost.
+        """
+        return timezone.now() - datetime.timedelta(seconds=CHARLINK_LINK_UPDATE_TIMEOUT)
+
+    def is_expired(self) -> bool:
+        return self.status == self.Status.PENDING and self.updated < self.get_expired_before()
@@ -0,0 +1,30 @@
+from django.core.cache import cache
+from django.db import transaction
+
+from .app_settings import CHARLINK_ADMIN_NOTIFICATIONS_WINDOW
+from .models import PendingAdminNotification
+from .tasks import ADMIN_NOTIFICATIONS_SCHEDULED_KEY, send_admin_notification_digests
+
+
+def queue_admin_notification(group: str, title: str, message: str):
+    """
+    Queues an admin notification, sent with the other notifications of the group in one digest
+    at most CHARLINK_ADMIN_NOTIFICATIONS_WINDOW seconds later.
+
+    Args:
+        `group`: What the notifications are about, e.g. `structures:owner:<owner pk>`. One digest is sent per group.
+        `title`: The title of the notification, used as is when it's the only one in the digest.
+        `message`: The message of the notification.
+    """
+    PendingAdminNotification.objects.create(group=group, title=title, message=message)
+
+    def schedule_digest():
+        # the first notification of the window schedules the digest, the next ones just join it.
+        # Set after commit, so a rolled back transaction doesn't leave the window marked as scheduled
+        if cache.add(ADMIN_NOTIFICATIONS_SCHEDULED_KEY.format(group=group), 1, CHARLINK_ADMIN_NOTIFICATIONS_WINDOW):
+            send_admin_notification_digests.apply_async(
+                kwargs={'group': group},
+                countdown=CHARLINK_ADMIN_NOTIFICATIONS_WINDOW,
+            )
+
+    transaction.on_commit(schedule_digest)
@@ -0,0 +1,164 @@
+import asyncio
+import cProfile
+import os
+import re
+import tempfile
+import time
+from typing import Callable, List, Optional
+
+from asgiref.sync import async_to_sync
+
+from django.db import DatabaseError, NotSupportedError, connections
+from django.db.models import QuerySet
+from django.http import HttpRequest
+from django.utils import timezone
+
+from allianceauth.eveonline.models import EveCharacter
+
+from .app_settings import CHARLINK_PROFILE_DIR, CHARLINK_PROFILE_MAX_FILES, CHARLINK_PROFILE_MAX_BYTES
+from .app_imports.utils import LoginImport
+from .utils import linked_annotation
+
+
+def profile_import(characters: QuerySet[EveCharacter], login_import: LoginImport, runs: int = 3, explain: bool = True) -> dict:
+    """
+    Evaluates the link check of the import used by the bulk queries, see `linked_annotation`, against the characters and measures it.
+
+    Returns:
+        A dict with the `import_id`, the wall times in seconds of each run (`times`, `best`, `mean`),
+        the number of queries of a run, the number of `characters` and `linked` characters,
+        and the backend's `explain` output, None if disabled or not supported.
+    """
+    # imported here, the module is loaded by every view through the profiling decorator
+    from django.test.utils import CaptureQueriesContext
+
+    query_id = login_import.get_query_id()
+    queryset = (
+        characters
+        .annotate(**{query_id: linked_annotation(login_import)})
+        .values_list('pk', query_id)
+    )
+
+    times = []
+    for _ in range(max(runs, 1)):
+        with CaptureQueriesContext(connections[queryset.db]) as ctx:
+            start = time.perf_counter()
+            rows = list(queryset.all())
+            times.append(time.perf_counter() - start)
+
+    plan = None
+    if explain:
+        try:
+            plan = queryset.explain()
+        except (NotSupportedError, DatabaseError) as e:
+            plan = f"EXPLAIN failed: {e}"
+
+    return {
+        'import_id': query_id,
+        'times': times,
+        'best': min(times),
+        'mean': sum(times) / len(times),
+        'queries': len(ctx.captured_queries),
+        'characters': len(rows),
+        'linked': sum(1 for _, linked in rows if linked),
+        'explain': plan,
+    }
+
+
+def profile_imports(
+    characters: QuerySet[EveCharacter],
+    imports: List[LoginImport],
+    runs: int = 3,
+    explain: bool = True,
+    sample: Optional[int] = None,
+) -> List[dict]:
+    """
+    Profiles each import against the same characters, the first `sample` ones by pk if given.
+
+    Results are ranked from the slowest to the fastest import by best wall time.
+    """
+    sample_ids = characters.order_by('pk').values_list('pk', flat=True)
+    if sample is not None:
+        sample_ids = sample_ids[:sample]
+
+    # materialized once, so every import is measured against the same list and without the sampling cost
+    sampled = characters.model.objects.using(characters.db).filter(pk__in=list(sample_ids))
+
+    results = [profile_import(sampled, import_, runs, explain) for import_ in imports]
+
+    return sorted(results, key=lambda result: result['best'], reverse=True)
+
+
+def benchmark_view(view: Callable, request: HttpRequest, runs: int = 5, **kwargs) -> dict:
+    """
+    Calls the view `runs` times with the request and measures the end-to-end latency, template rendering included.
+
+    Async views are run in an event loop, like under ASGI.
+
+    Returns:
+        A dict with the wall times in seconds of each run (`times`, `best`, `mean`) and the `status_code` of the last response.
+    """
+    if asyncio.iscoroutinefunction(view):
+        view = async_to_sync(view)
+
+    times = []
+    for _ in range(max(runs, 1)):
+        start = time.perf_counter()
+        response = view(request, **kwargs)
+        times.append(time.perf_counter() - start)
+
+    return {
+        'times': times,
+        'best': min(times),
+        'mean': sum(times) / len(times),
+        'status_code': response.status_code,
+    }
+
+
+def get_profile_dir() -> str:
+    return CHARLINK_PROFILE_DIR or os.path.join(tempfile.gettempdir(), 'charlink_profiles')
+
+
+def rotate_profiles(directory: str, max_files: int = CHARLINK_PROFILE_MAX_FILES, max_bytes: int = CHARLINK_PROFILE_MAX_BYTES):
+    """
+    Deletes the oldest profiles until there are at most `max_files` of them, taking at most `max_bytes`.
+    """
+    with os.scandir(directory) as entries:
+        profiles = sorted(
+            (entry.stat().st_mtime, entry.stat().st_size, entry.path)
+            for entry in entries
+            if entry.is_file() and entry.name.endswith('.prof')
+        )
+
+    count = len(profiles)
+    total = sum(size for _, size, _ in profiles)
+
+    for _, size, path in profiles:
+        if count <= max_files and total <= max_bytes:
+            break
+
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+        count -= 1
+        total -= size
+
+
+def save_profile(profiler: cProfile.Profile, view_name: str) -> str:
+    """
+    Dumps the profiler stats in the profile directory and rotates the old profiles.
+
+    Files are named after the time and the view, e.g. `20240101T120000123456_charlink.audit_corp.prof`, and can be read with pstats or snakeviz.
+    """
+    directory = get_profile_dir()
+    os.makedirs(directory, exist_ok=True)
+
+    name = re.sub(r'[^\w.-]', '_', view_name.replace(':', '.'))
+    path = os.path.join(directory, f"{timezone.now():%Y%m%dT%H%M%S%f}_{name}.prof")
+
+    profiler.dump_stats(path)
+    rotate_profiles(directory)
+
+    return path
@@ -0,0 +1,204 @@
+from typing import Dict, Iterable, List, Optional, Set, Type
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Model
+from django.db.models.signals import post_init, post_save, post_delete, m2m_changed
+from django.dispatch import Signal
+
+from .app_imports.utils import LoginImport, resolve_character_ids
+from .link_state import (
+    VISIBILITY_MODELS,
+    PERMISSION_MODELS,
+    get_dependency_index,
+    bump_link_state_version,
+    bump_permissions_version,
+    mark_import_changed,
+)
+
+# whether memberaudit has compliance groups, cached by its import and cleared here so every process invalidates it
+MEMBERAUDIT_COMPLIANCE_DESIGNATIONS_KEY = 'charlink:memberaudit:compliance_designations'
+
+# Sent after commit when the link status of an import may have changed.
+# Arguments: `login_import`, `character_ids` (set of EveCharacter pks, None if unknown) and `version` (the new import version).
+link_state_changed = Signal()
+
+
+# attnames of the tracked fields of each model, loaded values are kept on the instances to detect their changes
+_tracked_fields: Dict[Type[Model], Set[str]] = {}
+_dependencies_tracked = False
+
+_LOADED_VALUES_ATTR = '_charlink_loaded_values'
+
+
+def _store_loaded_values(sender, instance, **kwargs):
+    instance.__dict__[_LOADED_VALUES_ATTR] = {
+        attname: instance.__dict__[attname]
+        for attname in _tracked_fields.get(sender, ())
+        if attname in instance.__dict__
+    }
+
+
+def _track_fields(model: Type[Model], field_names: Iterable[str]):
+    attnames = {model._meta.get_field(field_name).attname for field_name in field_names}
+    if not attnames:
+        return
+
+    if model not in _tracked_fields:
+        _tracked_fields[model] = set()
+        post_init.connect(_store_loaded_values, sender=model, weak=False, dispatch_uid=f'charlink_loaded_values_{model._meta.label}')
+
+    _tracked_fields[model].update(attnames)
+
+
+for models_fields in (VISIBILITY_MODELS, PERMISSION_MODELS):
+    for tracked_model, tracked_fields in models_fields.items():
+        if tracked_fields:
+            _track_fields(tracked_model, tracked_fields)
+
+
+def _get_dependency_index():
+    global _dependencies_tracked
+    index = get_dependency_index()
+
+    # instances loaded before are considered changed on every save
+    if not _dependencies_tracked:
+        for model, dependencies in index.items():
+            for _, link_spec in dependencies:
+                if link_spec is not None and link_spec.tracked_fields:
+                    _track_fields(model, link_spec.tracked_fields)
+
+        _dependencies_tracked = True
+
+    return index
+
+
+def _fields_changed(instance: Model, field_names: Optional[List[str]], created_or_deleted: bool, update_fields) -> bool:
+    """
+    Checks if a change of `instance` can change the fields, None means any field.
+    """
+    if created_or_deleted or field_names is None or instance is None:
+        return True
+
+    if not field_names:
+        return False
+
+    fields = [instance._meta.get_field(field_name) for field_name in field_names]
+
+    if update_fields is not None and not any(field.name in update_fields or field.attname in update_fields for field in fields):
+        return False
+
+    loaded = instance.__dict__.get(_LOADED_VALUES_ATTR)
+    if loaded is None:
+        return True
+
+    return any(
+        field.attname not in loaded or loaded[field.attname] != instance.__dict__.get(field.attname)
+        for field in fields
+    )
+
+
+def _link_state_changed(model, instance, using, created_or_deleted=True, update_fields=None):
+    dependencies = [
+        (import_, link_spec)
+        for import_, link_spec in _get_dependency_index().get(model, [])
+        if _fields_changed(instance, link_spec.tracked_fields if link_spec is not None else None, created_or_deleted, update_fields)
+    ]
+    visibility_changed = model in VISIBILITY_MODELS and _fields_changed(instance, VISIBILITY_MODELS[model], created_or_deleted, update_fields)
+    permissions_changed = model in PERMISSION_MODELS and _fields_changed(instance, PERMISSION_MODELS[model], created_or_deleted, update_fields)
+    if not visibility_changed and not permissions_changed and not dependencies:
+        return
+
+    # the lookups are followed right away, related objects might not exist anymore after commit.
+    # Imports sharing a lookup share its values, resolved to EveCharacter pks once after commit
+    values = {}
+    changes = []
+    for import_, link_spec in dependencies:
+        if link_spec is None or instance is None:
+            changes.append((import_, None))
+        else:
+            key = (link_spec.character_lookup, link_spec.character_field)
+            if key not in values:
+                values[key] = link_spec.get_character_values(instance)
+            changes.append((import_, key))
+
+    def notify():
+        if visibility_changed:
+            bump_link_state_version()
+
+        if permissions_changed:
+            bump_permissions_version()
+
+        character_ids = {
+            key: resolve_character_ids(key[1], key_values) if key_values is not None else None
+            for key, key_values in values.items()
+        }
+
+        for import_, key in changes:
+            import_character_ids = character_ids[key] if key is not None else None
+            version = mark_import_changed(import_, import_character_ids)
+            link_state_changed.send(
+                sender=LoginImport,
+                login_import=import_,
+                character_ids=import_character_ids,
+                version=version,
+            )
+
+    transaction.on_commit(notify, using=using)
+
+
+def link_state_model_saved(sender, instance, created, update_fields, using, **kwargs):
+    _link_state_changed(sender, instance, using, created, update_fields)
+
+    if sender in _tracked_fields:
+        # the saved values are the loaded ones for the next save of the instance
+        _store_loaded_values(sender, instance)
+
+
+def link_state_model_deleted(sender, instance, using, **kwargs):
+    _link_state_changed(sender, instance, using)
+
+
+def link_state_m2m_changed(sender, instance, action, using, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        _link_state_changed(sender, None, using)
+
+        # e.g. the scopes of a token
+        if type(instance) in _get_dependency_index():
+            _link_state_changed(type(instance), instance, using)
+
+
+def compliance_designation_changed(sender, using, **kwargs):
+    transaction.on_commit(lambda: cache.delete(MEMBERAUDIT_COMPLIANCE_DESIGNATIONS_KEY), using=using)
+
+
+def connect_receivers():
+    """
+    Connects the receivers to the visibility and permission models and to the dependencies of the imports, called once the apps are ready.
+    """
+    models = {*VISIBILITY_MODELS, *PERMISSION_MODELS, *_get_dependency_index()}
+
+    for model in models:
+        label = model._meta.label
+        post_save.connect(link_state_model_saved, sender=model, dispatch_uid=f'charlink_link_state_saved_{label}')
+        post_delete.connect(link_state_model_deleted, sender=model, dispatch_uid=f'charlink_link_state_deleted_{label}')
+
+        # through models send m2m_changed, from both sides of the relation
+        through_models = {model} if model._meta.auto_created else {
+            getattr(field, 'through', None) or field.remote_field.through
+            for field in model._meta.get_fields(include_hidden=True)
+            if field.many_to_many
+        }
+        for through in through_models:
+            m2m_changed.connect(link_state_m2m_changed, sender=through, dispatch_uid=f'charlink_link_state_m2m_{through._meta.label}')
+
+    # memberaudit is optional
+    if apps.is_installed('memberaudit'):
+        try:
+            designation_model = apps.get_model('memberaudit', 'ComplianceGroupDesignation')
+        except LookupError:
+            return
+
+        post_save.connect(compliance_designation_changed, sender=designation_model, dispatch_uid='charlink_compliance_designation_saved')
+        post_delete.connect(compliance_designation_changed, sender=designation_model, dispatch_uid='charlink_compliance_designation_deleted')
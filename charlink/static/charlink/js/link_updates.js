@@ -0,0 +1,43 @@
+/* Polls the pending link updates shown on the index page and replaces them with their outcome */
+(function () {
+    const interval = 5000;
+    const maxAttempts = 60;
+
+    const setOutcome = (element, className, text) => {
+        element.classList.remove('alert-info');
+        element.classList.add(className);
+        element.textContent = text;
+    };
+
+    const poll = (element, attempt) => {
+        fetch(element.dataset.charlinkLinkUpdate, {credentials: 'same-origin'})
+            .then((response) => {
+                if (!response.ok) {
+                    throw new Error(response.statusText);
+                }
+                return response.json();
+            })
+            .then((update) => {
+                const label = element.dataset.label;
+
+                if (update.status === 'success') {
+                    setOutcome(element, 'alert-success', `${label} successfully updated`);
+                } else if (update.status === 'failure') {
+                    setOutcome(element, 'alert-danger', `Failed to update ${label}: ${update.error}`);
+                } else if (attempt < maxAttempts) {
+                    setTimeout(() => poll(element, attempt + 1), interval);
+                } else {
+                    setOutcome(element, 'alert-warning', `${label} is still updating, reload the page later to check the outcome`);
+                }
+            })
+            .catch(() => {
+                setOutcome(element, 'alert-warning', `Failed to check the update of ${element.dataset.label}, reload the page to retry`);
+            });
+    };
+
+    document.addEventListener('DOMContentLoaded', () => {
+        document.querySelectorAll('[data-charlink-link-update]').forEach((element) => {
+            setTimeout(() => poll(element, 1), interval);
+        });
+    });
+})();
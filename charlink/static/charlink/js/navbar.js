@@ -0,0 +1,75 @@
+/* Loads the corporations and apps navbar dropdowns when they are first opened */
+(function () {
+    const url = document.currentScript.dataset.url;
+    let data = null;
+
+    const loadData = () => {
+        if (data === null) {
+            data = fetch(url, {credentials: 'same-origin'})
+                .then((response) => {
+                    if (!response.ok) {
+                        throw new Error(response.statusText);
+                    }
+                    return response.json();
+                })
+                .catch((error) => {
+                    data = null;
+                    throw error;
+                });
+        }
+        return data;
+    };
+
+    const renderItems = (menu, items) => {
+        menu.querySelectorAll('.charlink-navbar-item, .charlink-navbar-loading').forEach((element) => element.remove());
+
+        items.forEach((item) => {
+            const li = document.createElement('li');
+            const link = document.createElement('a');
+
+            li.className = 'charlink-navbar-item';
+            link.className = 'dropdown-item';
+            link.href = item.url;
+            link.textContent = item.name;
+
+            li.appendChild(link);
+            menu.appendChild(li);
+        });
+    };
+
+    const filterItems = (menu, search) => {
+        const value = search.toLowerCase();
+
+        menu.querySelectorAll('.charlink-navbar-item').forEach((element) => {
+            element.classList.toggle('d-none', !element.textContent.toLowerCase().includes(value));
+        });
+    };
+
+    document.addEventListener('DOMContentLoaded', () => {
+        document.querySelectorAll('[data-charlink-navbar]').forEach((dropdown) => {
+            const key = dropdown.dataset.charlinkNavbar;
+            const menu = dropdown.querySelector('.dropdown-menu');
+            const input = menu.querySelector('input');
+            let loaded = false;
+
+            dropdown.addEventListener('show.bs.dropdown', () => {
+                if (loaded) {
+                    return;
+                }
+
+                loadData()
+                    .then((response) => {
+                        renderItems(menu, response[key]);
+                        filterItems(menu, input.value);
+                        loaded = true;
+                    })
+                    .catch(() => {
+                        menu.querySelector('.charlink-navbar-loading span').textContent = 'Failed to load, reopen to retry';
+                    });
+            });
+
+            dropdown.addEventListener('shown.bs.dropdown', () => input.focus());
+            input.addEventListener('input', () => filterItems(menu, input.value));
+        });
+    });
+})();
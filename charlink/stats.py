@@ -0,0 +1,91 @@
+import bisect
+import datetime
+from typing import Dict, Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .app_imports.utils import LoginImport
+from .models import AddCharacterStats
+
+
+def get_bucket(duration: float) -> int:
+    """
+    Returns the AddCharacterStats bucket of a duration in seconds.
+    """
+    return bisect.bisect_right(AddCharacterStats.BUCKET_BOUNDS, duration * 1000)
+
+
+def record_add_character(login_import: LoginImport, duration: float, success: bool, date: Optional[datetime.date] = None):
+    """
+    Adds an add_character call to the counters of its import, day and duration bucket.
+
+    Counters are incremented in the database, so concurrent logins don't lose updates.
+    """
+    lookup = {
+        'import_id': login_import.get_query_id(),
+        'date': date or timezone.now().date(),
+        'bucket': get_bucket(duration),
+    }
+    increments = {
+        'successes': F('successes') + int(success),
+        'failures': F('failures') + int(not success),
+        'duration_total': F('duration_total') + duration,
+    }
+
+    if AddCharacterStats.objects.filter(**lookup).update(**increments):
+        return
+
+    try:
+        with transaction.atomic():
+            AddCharacterStats.objects.create(
+                **lookup,
+                successes=int(success),
+                failures=int(not success),
+                duration_total=duration,
+            )
+    except IntegrityError:
+        # another request created the row in the meantime
+        AddCharacterStats.objects.filter(**lookup).update(**increments)
+
+
+def get_add_character_summary(since: datetime.date) -> Dict[str, dict]:
+    """
+    Returns the add_character counters of each import from `since`, sorted by total duration.
+
+    Returns:
+        A dict {import id: summary}, where summary is a dict with `successes`, `failures`, `duration_total`,
+        `duration_mean` in seconds and `histogram`, the number of calls of each bucket.
+    """
+    rows = (
+        AddCharacterStats.objects
+        .filter(date__gte=since)
+        .values('import_id', 'bucket')
+        .annotate(
+            successes_sum=Sum('successes'),
+            failures_sum=Sum('failures'),
+            duration_sum=Sum('duration_total'),
+        )
+        .order_by()
+    )
+
+    summary = {}
+    for row in rows:
+        import_summary = summary.setdefault(row['import_id'], {
+            'successes': 0,
+            'failures': 0,
+            'duration_total': 0.0,
+            'histogram': [0] * (len(AddCharacterStats.BUCKET_BOUNDS) + 1),
+        })
+
+        import_summary['successes'] += row['successes_sum']
+        import_summary['failures'] += row['failures_sum']
+        import_summary['duration_total'] += row['duration_sum']
+        import_summary['histogram'][row['bucket']] += row['successes_sum'] + row['failures_sum']
+
+    for import_summary in summary.values():
+        calls = import_summary['successes'] + import_summary['failures']
+        import_summary['duration_mean'] = import_summary['duration_total'] / calls if calls else 0.0
+
+    return dict(sorted(summary.items(), key=lambda item: item[1]['duration_total'], reverse=True))
@@ -0,0 +1,186 @@
+import datetime
+
+from celery import shared_task
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from allianceauth.services.hooks import get_extension_logger
+
+from app_utils.allianceauth import notify_admins
+
+from .app_imports import import_apps
+from .app_settings import CHARLINK_IGNORE_APPS, CHARLINK_ADD_CHARACTER_STATS_DAYS, CHARLINK_LINK_UPDATE_DAYS
+from .coverage import get_link_coverage, get_coverage_characters
+from .utils import get_owned_corps
+from .models import CoverageSnapshot, AddCharacterStats, PendingAdminNotification, LinkUpdate
+
+logger = get_extension_logger(__name__)
+
+ADMIN_NOTIFICATIONS_SCHEDULED_KEY = 'charlink:admin_notifications:scheduled:{group}'
+
+# fields of get_coverage_characters() the snapshots are grouped by
+SNAPSHOT_SCOPES = {
+    CoverageSnapshot.Scope.CORPORATION: 'coverage_corporation_id',
+    CoverageSnapshot.Scope.ALLIANCE: 'coverage_alliance_id',
+    CoverageSnapshot.Scope.STATE: 'character_ownership__user__profile__state_id',
+}
+
+
+@shared_task
+def snapshot_coverage():
+    imports = [
+        import_
+        for app, app_imports in import_apps().items()
+        if app not in CHARLINK_IGNORE_APPS
+        for import_ in app_imports.imports
+    ]
+
+    # counted like the coverage page of a superuser
+    characters = get_coverage_characters(get_owned_corps().values('corporation_id'))
+
+    today = timezone.now().date()
+    snapshots = []
+
+    for scope, group_by in SNAPSHOT_SCOPES.items():
+        coverage = get_link_coverage(characters, imports, group_by)
+
+        for scope_id, imports_counts in coverage.items():
+            if scope_id is None:
+                continue
+
+            for import_id, counts in imports_counts.items():
+                snapshots.append(
+                    CoverageSnapshot(
+                        date=today,
+                        scope=scope,
+                        scope_id=scope_id,
+                        import_id=import_id,
+                        **counts,
+                    )
+                )
+
+    with transaction.atomic():
+        CoverageSnapshot.objects.filter(date=today).delete()
+        CoverageSnapshot.objects.bulk_create(snapshots, batch_size=500)
+
+    logger.info(f"Saved {len(snapshots)} coverage snapshots for {today}")
+
+
+@shared_task
+def prune_add_character_stats():
+    since = timezone.now().date() - datetime.timedelta(days=CHARLINK_ADD_CHARACTER_STATS_DAYS)
+    deleted, _ = AddCharacterStats.objects.filter(date__lt=since).delete()
+
+    logger.info(f"Deleted {deleted} add character stats older than {since}")
+
+
+@shared_task
+def prune_link_updates():
+    """
+    Marks the expired pending link updates as failed and deletes the link updates older than CHARLINK_LINK_UPDATE_DAYS days.
+    """
+    expired = (
+        LinkUpdate.objects
+        .filter(status=LinkUpdate.Status.PENDING, updated__lt=LinkUpdate.get_expired_before())
+        .update(status=LinkUpdate.Status.FAILURE, error=LinkUpdate.EXPIRED_ERROR)
+    )
+
+    since = timezone.now() - datetime.timedelta(days=CHARLINK_LINK_UPDATE_DAYS)
+    deleted, _ = LinkUpdate.objects.filter(updated__lt=since).delete()
+
+    logger.info(f"Expired {expired} pending link updates, deleted {deleted} link updates older than {since}")
+
+
+@shared_task
+def send_admin_notification_digests(group=None):
+    """
+    Sends the pending admin notifications, one digest per group. Without a group, all the pending notifications are sent.
+    """
+    if group is not None:
+        # notifications queued from now on schedule a new digest
+        cache.delete(ADMIN_NOTIFICATIONS_SCHEDULED_KEY.format(group=group))
+
+    groups = PendingAdminNotification.objects.order_by('group').values_list('group', flat=True).distinct()
+    if group is not None:
+        groups = groups.filter(group=group)
+
+    sent = 0
+    for digest_group in list(groups):
+        try:
+            # the digest is sent before its notifications are deleted, a failed send rolls the delete back
+            with transaction.atomic():
+                notifications = list(
+                    PendingAdminNotification.objects
+                    .select_for_update()
+                    .filter(group=digest_group)
+                    .order_by('created', 'pk')
+                )
+                if not notifications:
+                    continue
+
+                if len(notifications) == 1:
+                    title = notifications[0].title
+                else:
+                    title = f"{notifications[0].title} (+{len(notifications) - 1} more)"
+
+                notify_admins(
+                    message="\n\n".join(notification.message for notification in notifications),
+                    title=title,
+                )
+
+                PendingAdminNotification.objects.filter(
+                    pk__in=[notification.pk for notification in notifications]
+                ).delete()
+        except Exception as e:
+            logger.exception(f"Failed to send the admin notification digest of {digest_group}, kept for the next digest: {e}")
+        else:
+            sent += 1
+
+    logger.info(f"Sent {sent} admin notification digests")
+
+
+@shared_task
+def calc_miningtaxes_admin_stats():
+    """
+    Recomputes the admin stats of Mining Taxes, scheduled by its import when characters are linked.
+    """
+    # imported here, Mining Taxes is an optional app
+    from miningtaxes.models import Stats
+
+    Stats.load().calc_admin_main_json()
+
+
+@shared_task
+def run_link_update(link_update_pk):
+    """
+    Calls `update()` on the object of a LinkUpdate and stores the outcome in its status.
+
+    The object is expected to delete itself when the update fails, like CorpStats does when the token can't be used.
+    """
+    try:
+        link_update = LinkUpdate.objects.get(pk=link_update_pk)
+    except LinkUpdate.DoesNotExist:
+        logger.info(f"Link update {link_update_pk} not found, skipping")
+        return
+
+    model = apps.get_model(link_update.model)
+    error = ''
+
+    try:
+        obj = model.objects.get(pk=link_update.object_id)
+        obj.update()
+    except model.DoesNotExist:
+        error = "Deleted before the update"
+    except Exception as e:
+        logger.exception(e)
+        error = str(e) or e.__class__.__name__
+    else:
+        if obj.pk is None:
+            error = "Update failed, check your notifications"
+
+    link_update.status = LinkUpdate.Status.FAILURE if error else LinkUpdate.Status.SUCCESS
+    link_update.error = error
+    link_update.save(update_fields=['status', 'error', 'updated'])
@@ -7,7 +7,7 @@ register = template.Library()
 
 @register.filter
 def get_corp_members(corp: EveCorporationInfo):
-    return EveCharacter.objects.filter(corporation_id=corp.corporation_id).select_related("character_ownership__user__profile__main_character")
+    return EveCharacter.objects.using(corp._state.db).filter(corporation_id=corp.corporation_id).select_related("character_ownership__user__profile__main_character")
 
 
 @register.filter
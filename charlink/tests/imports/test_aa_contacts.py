@@ -8,16 +8,14 @@ from app_utils.testdata_factories import UserMainFactory
 from charlink.imports.aa_contacts import (
     _alliance_login,
     _corporation_login,
-    _alliance_users_with_perms,
-    _corporation_users_with_perms,
-    _alliance_check_perms,
-    _corporation_check_perms,
-    _alliance_is_character_added,
-    _corporation_is_character_added
+    app_import,
 )
 
 from aa_contacts.models import AllianceToken, CorporationToken
 
+_alliance_is_character_added = app_import.get('alliance').is_character_added
+_corporation_is_character_added = app_import.get('corporation').is_character_added
+
 
 class TestAddCharacter(TestCase):
 
@@ -32,7 +30,7 @@ class TestAddCharacter(TestCase):
         super().setUpClass()
         cls.factory = RequestFactory()
 
-    @patch("charlink.imports.aa_contacts.update_alliance_contacts.delay")
+    @patch("charlink.imports.aa_contacts.update_alliance_contacts.apply_async")
     def test_alliance_login_ok(self, mock_update_alliance_contacts):
         mock_update_alliance_contacts.return_value = None
 
@@ -47,7 +45,7 @@ class TestAddCharacter(TestCase):
         self.assertTrue(AllianceToken.objects.filter(alliance=self.character.alliance).exists())
         self.assertTrue(mock_update_alliance_contacts.called)
 
-    @patch("charlink.imports.aa_contacts.update_alliance_contacts.delay")
+    @patch("charlink.imports.aa_contacts.update_alliance_contacts.apply_async")
     def test_alliance_login_missing_alliance(self, mock_update_alliance_contacts):
         mock_update_alliance_contacts.return_value = None
 
@@ -64,7 +62,7 @@ class TestAddCharacter(TestCase):
         self.assertTrue(AllianceToken.objects.filter(alliance=self.character.alliance).exists())
         self.assertTrue(mock_update_alliance_contacts.called)
 
-    @patch("charlink.imports.aa_contacts.update_corporation_contacts.delay")
+    @patch("charlink.imports.aa_contacts.update_corporation_contacts.apply_async")
     def test_character_not_in_alliance(self, mock_update_corporation_contacts):
         mock_update_corporation_contacts.return_value = None
 
@@ -84,7 +82,7 @@ class TestAddCharacter(TestCase):
         self.assertFalse(AllianceToken.objects.filter(alliance=self.character.alliance).exists())
         self.assertFalse(mock_update_corporation_contacts.called)
 
-    @patch("charlink.imports.aa_contacts.update_corporation_contacts.delay")
+    @patch("charlink.imports.aa_contacts.update_corporation_contacts.apply_async")
     def test_alliance_already_tracked(self, mock_update_corporation_contacts):
         mock_update_corporation_contacts.return_value = None
 
@@ -101,7 +99,7 @@ class TestAddCharacter(TestCase):
         self.assertTrue(AllianceToken.objects.filter(alliance=self.character.alliance).exists())
         self.assertFalse(mock_update_corporation_contacts.called)
 
-    @patch("charlink.imports.aa_contacts.update_corporation_contacts.delay")
+    @patch("charlink.imports.aa_contacts.update_corporation_contacts.apply_async")
     def test_corporation_login_ok(self, mock_update_corporation_contacts):
         mock_update_corporation_contacts.return_value = None
 
@@ -116,7 +114,7 @@ class TestAddCharacter(TestCase):
         self.assertTrue(CorporationToken.objects.filter(corporation=self.character.corporation).exists())
         self.assertTrue(mock_update_corporation_contacts.called)
 
-    @patch("charlink.imports.aa_contacts.update_corporation_contacts.delay")
+    @patch("charlink.imports.aa_contacts.update_corporation_contacts.apply_async")
     def test_corporation_login_missing_corporation(self, mock_update_corporation_contacts):
         mock_update_corporation_contacts.return_value = None
 
@@ -133,7 +131,7 @@ class TestAddCharacter(TestCase):
         self.assertTrue(CorporationToken.objects.filter(corporation=self.character.corporation).exists())
         self.assertTrue(mock_update_corporation_contacts.called)
 
-    @patch("charlink.imports.aa_contacts.update_corporation_contacts.delay")
+    @patch("charlink.imports.aa_contacts.update_corporation_contacts.apply_async")
     def test_corporation_already_tracked(self, mock_update_corporation_contacts):
         mock_update_corporation_contacts.return_value = None
 
@@ -160,13 +158,13 @@ class TestGetUsersWithPerms(TestCase):
         cls.user_corporation_perm = UserMainFactory(permissions=["aa_contacts.manage_corporation_contacts"])
 
     def test_alliance_users_with_perms(self):
-        users = _alliance_users_with_perms()
+        users = app_import.get('alliance').get_users_with_perms()
 
         self.assertEqual(users.count(), 1)
         self.assertEqual(users.first(), self.user_alliance_perm)
 
     def test_corporation_users_with_perms(self):
-        users = _corporation_users_with_perms()
+        users = app_import.get('corporation').get_users_with_perms()
 
         self.assertEqual(users.count(), 1)
         self.assertEqual(users.first(), self.user_corporation_perm)
@@ -181,12 +179,12 @@ class TestCheckPermissions(TestCase):
         cls.user_corporation_perm = UserMainFactory(permissions=["aa_contacts.manage_corporation_contacts"])
 
     def test_alliance_check_perms(self):
-        self.assertTrue(_alliance_check_perms(self.user_alliance_perm))
-        self.assertFalse(_alliance_check_perms(self.user_no_perm))
+        self.assertTrue(app_import.get('alliance').check_permissions(self.user_alliance_perm))
+        self.assertFalse(app_import.get('alliance').check_permissions(self.user_no_perm))
 
     def test_corporation_check_perms(self):
-        self.assertTrue(_corporation_check_perms(self.user_corporation_perm))
-        self.assertFalse(_corporation_check_perms(self.user_no_perm))
+        self.assertTrue(app_import.get('corporation').check_permissions(self.user_corporation_perm))
+        self.assertFalse(app_import.get('corporation').check_permissions(self.user_no_perm))
 
 
 class TestIsCharacterAdded(TestCase):
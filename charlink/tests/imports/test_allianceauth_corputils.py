@@ -7,8 +7,11 @@ from allianceauth.corputils.models import CorpStats
 from app_utils.testdata_factories import UserMainFactory, EveCorporationInfoFactory, EveCharacterFactory
 from app_utils.testing import add_character_to_user
 
-from charlink.imports.allianceauth.corputils import _add_character, _is_character_added
+from charlink.imports.allianceauth.corputils import _add_character, app_import
 from charlink.app_imports import import_apps
+from charlink.models import LinkUpdate
+
+_is_character_added = app_import.get('default').is_character_added
 
 
 class TestAddCharacter(TestCase):
@@ -18,26 +21,29 @@ class TestAddCharacter(TestCase):
         cls.user = UserMainFactory(permissions=['corputils.add_corpstats'])
         cls.token = cls.user.token_set.first()
 
+    @patch('charlink.updates.run_link_update')
     @patch('allianceauth.corputils.models.CorpStats.update')
-    def test_ok(self, mock_update):
-        mock_update.return_value = None
-
-        _add_character(None, self.token)
+    def test_ok(self, mock_update, mock_run_link_update):
+        with self.captureOnCommitCallbacks(execute=True):
+            _add_character(None, self.token)
 
-        self.assertTrue(mock_update.called)
+        self.assertFalse(mock_update.called)
         self.assertTrue(_is_character_added(self.user.profile.main_character))
+        link_update = LinkUpdate.objects.get(character_id=self.token.character_id)
+        self.assertEqual(link_update.status, LinkUpdate.Status.PENDING)
+        mock_run_link_update.delay.assert_called_once_with(link_update.pk)
 
     @patch('allianceauth.eveonline.managers.EveCorporationManager.create_corporation', wraps=lambda corp_id: EveCorporationInfoFactory(corporation_id=corp_id))
-    @patch('allianceauth.corputils.models.CorpStats.update')
-    def test_corp_missing(self, mock_update, mock_create_corporation):
-        mock_update.return_value = None
+    @patch('charlink.updates.run_link_update')
+    def test_corp_missing(self, mock_run_link_update, mock_create_corporation):
         character = self.user.profile.main_character
 
         character.corporation.delete()
 
-        _add_character(None, self.token)
+        with self.captureOnCommitCallbacks(execute=True):
+            _add_character(None, self.token)
 
-        self.assertTrue(mock_update.called)
+        self.assertTrue(mock_run_link_update.delay.called)
         self.assertTrue(mock_create_corporation.called)
         self.assertTrue(_is_character_added(self.user.profile.main_character))
 
@@ -1,12 +1,16 @@
 from unittest.mock import patch
 
+from django.core.cache import cache
 from django.test import TestCase
 
 from app_utils.testdata_factories import UserMainFactory
 
-from charlink.imports.corptools import _add_character_charaudit, _is_character_added_charaudit, _corp_perms, _is_character_added_corp, _add_character_corp
+from charlink.imports.corptools import _add_character_charaudit, _corp_perms, _add_character_corp, app_import
 from charlink.app_imports import import_apps
 
+_is_character_added_charaudit = app_import.get('default').is_character_added
+_is_character_added_corp = app_import.get('structures').is_character_added
+
 
 class TestAddCharacter(TestCase):
 
@@ -14,6 +18,9 @@ class TestAddCharacter(TestCase):
     def setUpTestData(cls):
         cls.user = UserMainFactory(permissions=['corptools.view_characteraudit', *_corp_perms])
 
+    def setUp(self):
+        cache.clear()
+
     @patch('charlink.imports.corptools.update_character.apply_async')
     def test_ok_charaudit(self, mock_update_character):
         mock_update_character.return_value = None
@@ -26,7 +33,21 @@ class TestAddCharacter(TestCase):
         self.assertTrue(_is_character_added_charaudit(self.user.profile.main_character))
 
     @patch('charlink.imports.corptools.update_all_corps.apply_async')
-    def test_ok_corp(self, mock_update_all_corps):
+    @patch('charlink.imports.corptools.update_corp.apply_async')
+    def test_ok_corp(self, mock_update_corp, mock_update_all_corps):
+        mock_update_corp.return_value = None
+
+        token = self.user.token_set.first()
+
+        _add_character_corp(None, token)
+
+        self.assertTrue(_is_character_added_corp(self.user.profile.main_character))
+        mock_update_corp.assert_called_once_with(args=[self.user.profile.main_character.corporation_id], kwargs=None, priority=6)
+        self.assertFalse(mock_update_all_corps.called)
+
+    @patch('charlink.imports.corptools.update_corp', None)
+    @patch('charlink.imports.corptools.update_all_corps.apply_async')
+    def test_ok_corp_no_update_corp(self, mock_update_all_corps):
         mock_update_all_corps.return_value = None
 
         token = self.user.token_set.first()
@@ -36,6 +57,17 @@ class TestAddCharacter(TestCase):
         self.assertTrue(_is_character_added_corp(self.user.profile.main_character))
         self.assertTrue(mock_update_all_corps.called)
 
+    @patch('charlink.imports.corptools.update_corp.apply_async')
+    def test_corp_coalesced(self, mock_update_corp):
+        token = self.user.token_set.first()
+
+        for _ in range(3):
+            _add_character_corp(None, token)
+
+        self.assertEqual(mock_update_corp.call_count, 2)
+        self.assertNotIn('countdown', mock_update_corp.call_args_list[0].kwargs)
+        self.assertIn('countdown', mock_update_corp.call_args_list[1].kwargs)
+
 
 class TestIsCharacterAdded(TestCase):
 
@@ -52,9 +84,9 @@ class TestIsCharacterAdded(TestCase):
         _add_character_charaudit(None, self.user.token_set.first())
         self.assertTrue(_is_character_added_charaudit(self.character))
 
-    @patch('charlink.imports.corptools.update_all_corps.apply_async')
-    def test_ok_corp(self, mock_update_all_corps):
-        mock_update_all_corps.return_value = None
+    @patch('charlink.imports.corptools.update_corp.apply_async')
+    def test_ok_corp(self, mock_update_corp):
+        mock_update_corp.return_value = None
 
         self.assertFalse(_is_character_added_corp(self.character))
         _add_character_corp(None, self.user.token_set.first())
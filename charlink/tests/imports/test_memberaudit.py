@@ -1,17 +1,21 @@
 from unittest.mock import patch
 
 from django.test import TestCase, RequestFactory
+from django.core.cache import cache
 from django.contrib.messages.storage.fallback import FallbackStorage
 
 from app_utils.testdata_factories import UserMainFactory
 from app_utils.testing import create_authgroup
 
-from charlink.imports.memberaudit import _add_character, _is_character_added
+from charlink.imports.memberaudit import _add_character, _has_compliance_designations, app_import
 from charlink.app_imports import import_apps
+from charlink.app_settings import CHARLINK_DISPATCH_WINDOW
 
 from memberaudit.app_settings import MEMBERAUDIT_TASKS_NORMAL_PRIORITY
 from memberaudit.models import ComplianceGroupDesignation
 
+_is_character_added = app_import.get('default').is_character_added
+
 
 class TestAddCharacter(TestCase):
 
@@ -25,6 +29,9 @@ class TestAddCharacter(TestCase):
         super().setUpClass()
         cls.factory = RequestFactory()
 
+    def setUp(self):
+        cache.clear()
+
     @patch('memberaudit.tasks.update_character.apply_async')
     def test_ok(self, mock_update_character):
         mock_update_character.return_value = None
@@ -58,16 +65,44 @@ class TestAddCharacter(TestCase):
         group = create_authgroup()
         ComplianceGroupDesignation.objects.create(group=group)
 
+        _add_character(request, token)
         _add_character(request, token)
 
-        mock_update_character.assert_called_once()
+        self.assertEqual(mock_update_character.call_count, 2)
         mock_update_compliance.assert_called_once_with(
             args=[self.user.pk],
+            kwargs=None,
+            countdown=CHARLINK_DISPATCH_WINDOW,
             priority=MEMBERAUDIT_TASKS_NORMAL_PRIORITY
         )
         self.assertTrue(_is_character_added(self.character))
 
 
+class TestHasComplianceDesignations(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cached(self):
+        self.assertFalse(_has_compliance_designations())
+
+        with self.assertNumQueries(0):
+            self.assertFalse(_has_compliance_designations())
+
+    def test_invalidated(self):
+        self.assertFalse(_has_compliance_designations())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            designation = ComplianceGroupDesignation.objects.create(group=create_authgroup())
+
+        self.assertTrue(_has_compliance_designations())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            designation.delete()
+
+        self.assertFalse(_has_compliance_designations())
+
+
 class TestIsCharacterAdded(TestCase):
 
     @classmethod
@@ -80,6 +115,9 @@ class TestIsCharacterAdded(TestCase):
         super().setUpClass()
         cls.factory = RequestFactory()
 
+    def setUp(self):
+        cache.clear()
+
     @patch('memberaudit.tasks.update_character.apply_async')
     def test_ok(self, mock_update_character):
         mock_update_character.return_value = None
@@ -1,15 +1,19 @@
 from unittest.mock import patch
 
 from django.test import TestCase, RequestFactory
+from django.core.cache import cache
 from django.contrib.messages.storage.fallback import FallbackStorage
 
 from app_utils.testdata_factories import UserMainFactory
 
-from charlink.imports.miningtaxes import _add_character_basic, _is_character_added_basic, _add_character_admin, _is_character_added_admin
+from charlink.imports.miningtaxes import _add_character_basic, _add_character_admin, app_import
 from charlink.app_imports import import_apps
 
 from miningtaxes.models import Character, AdminCharacter
 
+_is_character_added_basic = app_import.get('default').is_character_added
+_is_character_added_admin = app_import.get('admin').is_character_added
+
 
 class TestAddCharacter(TestCase):
 
@@ -23,8 +27,12 @@ class TestAddCharacter(TestCase):
         super().setUpClass()
         cls.factory = RequestFactory()
 
-    @patch('miningtaxes.tasks.update_character.delay')
-    def test_ok_basic(self, mock_update_character):
+    def setUp(self):
+        cache.clear()
+
+    @patch('charlink.imports.miningtaxes.calc_miningtaxes_admin_stats.apply_async')
+    @patch('miningtaxes.tasks.update_character.apply_async')
+    def test_ok_basic(self, mock_update_character, mock_calc_stats):
         mock_update_character.return_value = None
 
         token = self.user.token_set.first()
@@ -34,12 +42,15 @@ class TestAddCharacter(TestCase):
         messages = FallbackStorage(request)
         request._messages = messages
 
+        _add_character_basic(request, token)
         _add_character_basic(request, token)
 
-        mock_update_character.assert_called_once()
+        self.assertEqual(mock_update_character.call_count, 2)
         self.assertTrue(_is_character_added_basic(self.character))
+        mock_calc_stats.assert_called_once()
+        self.assertIn('countdown', mock_calc_stats.call_args.kwargs)
 
-    @patch('miningtaxes.tasks.update_admin_character.delay')
+    @patch('miningtaxes.tasks.update_admin_character.apply_async')
     def test_ok_admin(self, mock_update_character):
         mock_update_character.return_value = None
 
@@ -5,8 +5,11 @@ from django.contrib.messages.storage.fallback import FallbackStorage
 
 from app_utils.testdata_factories import UserMainFactory, EveCorporationInfoFactory
 
-from charlink.imports.moonmining import _add_character, _is_character_added
+from charlink.imports.moonmining import _add_character, app_import
 from charlink.app_imports import import_apps
+from charlink.models import PendingAdminNotification
+
+_is_character_added = app_import.get('default').is_character_added
 
 
 class TestAddCharacter(TestCase):
@@ -24,7 +27,7 @@ class TestAddCharacter(TestCase):
         super().setUpClass()
         cls.factory = RequestFactory()
 
-    @patch('moonmining.tasks.update_owner.delay')
+    @patch('moonmining.tasks.update_owner.apply_async')
     def test_ok(self, mock_update_owner):
         mock_update_owner.return_value = None
 
@@ -39,9 +42,10 @@ class TestAddCharacter(TestCase):
 
         mock_update_owner.assert_called_once()
         self.assertTrue(_is_character_added(self.character))
+        self.assertEqual(PendingAdminNotification.objects.filter(group__startswith='moonmining:owner:').count(), 1)
 
     @patch('allianceauth.eveonline.managers.EveCorporationManager.create_corporation', wraps=lambda corp_id: EveCorporationInfoFactory(corporation_id=corp_id))
-    @patch('moonmining.tasks.update_owner.delay')
+    @patch('moonmining.tasks.update_owner.apply_async')
     def test_missing_corporation(self, mock_update_owner, mock_create_corporation):
         mock_update_owner.return_value = None
 
@@ -60,12 +64,12 @@ class TestAddCharacter(TestCase):
         mock_create_corporation.assert_called_once()
         self.assertTrue(_is_character_added(self.character))
 
-    @patch('moonmining.tasks.update_owner.delay')
+    @patch('moonmining.tasks.update_owner.apply_async')
     @patch('charlink.imports.moonmining.MOONMINING_ADMIN_NOTIFICATIONS_ENABLED', False)
-    @patch('charlink.imports.moonmining.notify_admins')
-    def test_no_admin_notification(self, mock_notify_admins, mock_update_owner):
+    @patch('charlink.imports.moonmining.queue_admin_notification')
+    def test_no_admin_notification(self, mock_queue_admin_notification, mock_update_owner):
         mock_update_owner.return_value = None
-        mock_notify_admins.return_value = None
+        mock_queue_admin_notification.return_value = None
 
         token = self.user.token_set.first()
 
@@ -76,7 +80,7 @@ class TestAddCharacter(TestCase):
 
         _add_character(request, token)
 
-        self.assertFalse(mock_notify_admins.called)
+        self.assertFalse(mock_queue_admin_notification.called)
         mock_update_owner.assert_called_once()
         self.assertTrue(_is_character_added(self.character))
 
@@ -97,7 +101,7 @@ class TestIsCharacterAdded(TestCase):
         super().setUpClass()
         cls.factory = RequestFactory()
 
-    @patch('moonmining.tasks.update_owner.delay')
+    @patch('moonmining.tasks.update_owner.apply_async')
     def test_ok(self, mock_update_owner):
         mock_update_owner.return_value = None
 
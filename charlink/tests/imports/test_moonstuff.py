@@ -1,12 +1,15 @@
 from unittest.mock import patch
 
+from django.core.cache import cache
 from django.test import TestCase
 
 from app_utils.testdata_factories import UserMainFactory
 
-from charlink.imports.moonstuff import _add_character, _is_character_added
+from charlink.imports.moonstuff import _add_character, app_import
 from charlink.app_imports import import_apps
 
+_is_character_added = app_import.get('default').is_character_added
+
 
 class TestAddCharacter(TestCase):
 
@@ -14,7 +17,10 @@ class TestAddCharacter(TestCase):
     def setUpTestData(cls):
         cls.user = UserMainFactory(permissions=['moonstuff.add_trackingcharacter'])
 
-    @patch('charlink.imports.moonstuff.import_extraction_data.delay')
+    def setUp(self):
+        cache.clear()
+
+    @patch('charlink.imports.moonstuff.import_extraction_data.apply_async')
     def test_ok(self, mock_import_extraction_data):
         mock_import_extraction_data.return_value = None
 
@@ -38,7 +44,7 @@ class TestIsCharacterAdded(TestCase):
         cls.user = UserMainFactory(permissions=['moonstuff.add_trackingcharacter'])
         cls.character = cls.user.profile.main_character
 
-    @patch('charlink.imports.moonstuff.import_extraction_data.delay')
+    @patch('charlink.imports.moonstuff.import_extraction_data.apply_async')
     def test_ok(self, mock_import_extraction_data):
         mock_import_extraction_data.return_value = None
 
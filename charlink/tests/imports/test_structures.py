@@ -6,11 +6,14 @@ from django.contrib.messages.storage.fallback import FallbackStorage
 from app_utils.testdata_factories import UserMainFactory, EveCorporationInfoFactory, EveCharacterFactory
 from app_utils.testing import add_character_to_user
 
-from charlink.imports.structures import _add_character, _is_character_added
+from charlink.imports.structures import _add_character, app_import
 from charlink.app_imports import import_apps
+from charlink.models import PendingAdminNotification
 
 from structures.models import Webhook, Owner
 
+_is_character_added = app_import.get('default').is_character_added
+
 
 class TestAddCharacter(TestCase):
 
@@ -25,7 +28,7 @@ class TestAddCharacter(TestCase):
         super().setUpClass()
         cls.factory = RequestFactory()
 
-    @patch("structures.tasks.update_all_for_owner.delay")
+    @patch("structures.tasks.update_all_for_owner.apply_async")
     def test_ok(self, mock_update_all_for_owner):
         mock_update_all_for_owner.return_value = None
 
@@ -41,7 +44,7 @@ class TestAddCharacter(TestCase):
         mock_update_all_for_owner.assert_called_once()
 
     @patch('allianceauth.eveonline.managers.EveCorporationManager.create_corporation', wraps=lambda corp_id: EveCorporationInfoFactory(corporation_id=corp_id))
-    @patch("structures.tasks.update_all_for_owner.delay")
+    @patch("structures.tasks.update_all_for_owner.apply_async")
     def test_missing_corp(self, mock_update_all_for_owner, mock_create_corporation):
         mock_update_all_for_owner.return_value = None
 
@@ -59,7 +62,7 @@ class TestAddCharacter(TestCase):
         self.assertTrue(mock_update_all_for_owner.called)
         self.assertTrue(mock_create_corporation.called)
 
-    @patch("structures.tasks.update_all_for_owner.delay")
+    @patch("structures.tasks.update_all_for_owner.apply_async")
     def test_already_added(self, mock_update_all_for_owner):
         mock_update_all_for_owner.return_value = None
 
@@ -75,7 +78,7 @@ class TestAddCharacter(TestCase):
         self.assertTrue(_is_character_added(self.character))
         self.assertTrue(mock_update_all_for_owner.called)
 
-    @patch("structures.tasks.update_all_for_owner.delay")
+    @patch("structures.tasks.update_all_for_owner.apply_async")
     def test_default_webhooks(self, mock_update_all_for_owner):
         mock_update_all_for_owner.return_value = None
 
@@ -93,7 +96,7 @@ class TestAddCharacter(TestCase):
         mock_update_all_for_owner.assert_called_once()
         self.assertEqual(Owner.objects.first().webhooks.count(), 1)
 
-    @patch("structures.tasks.update_all_for_owner.delay")
+    @patch("structures.tasks.update_all_for_owner.apply_async")
     @patch('charlink.imports.structures.STRUCTURES_ADMIN_NOTIFICATIONS_ENABLED', False)
     def test_no_admin_notifications(self, mock_update_all_for_owner):
         mock_update_all_for_owner.return_value = None
@@ -109,7 +112,7 @@ class TestAddCharacter(TestCase):
         self.assertTrue(_is_character_added(self.character))
         mock_update_all_for_owner.assert_called_once()
 
-    @patch("structures.tasks.update_all_for_owner.delay")
+    @patch("structures.tasks.update_all_for_owner.apply_async")
     def test_second_owner(self, mock_update_all_for_owner):
         mock_update_all_for_owner.return_value = None
 
@@ -133,7 +136,10 @@ class TestAddCharacter(TestCase):
         self.assertEqual(Owner.objects.first().valid_characters_count(), 2)
         mock_update_all_for_owner.assert_called_once()
 
-    @patch("structures.tasks.update_all_for_owner.delay")
+        notifications = PendingAdminNotification.objects.filter(group=f'structures:owner:{Owner.objects.first().pk}')
+        self.assertEqual(notifications.count(), 2)
+
+    @patch("structures.tasks.update_all_for_owner.apply_async")
     @patch('charlink.imports.structures.STRUCTURES_ADMIN_NOTIFICATIONS_ENABLED', False)
     def test_second_owner_no_admin_notifications(self, mock_update_all_for_owner):
         mock_update_all_for_owner.return_value = None
@@ -157,6 +163,7 @@ class TestAddCharacter(TestCase):
         self.assertTrue(_is_character_added(character2))
         self.assertEqual(Owner.objects.first().valid_characters_count(), 2)
         mock_update_all_for_owner.assert_called_once()
+        self.assertFalse(PendingAdminNotification.objects.exists())
 
 
 class TestIsCharacterAdded(TestCase):
@@ -172,7 +179,7 @@ class TestIsCharacterAdded(TestCase):
         super().setUpClass()
         cls.factory = RequestFactory()
 
-    @patch("structures.tasks.update_all_for_owner.delay")
+    @patch("structures.tasks.update_all_for_owner.apply_async")
     def test_ok(self, mock_update_all_for_owner):
         mock_update_all_for_owner.return_value = None
 
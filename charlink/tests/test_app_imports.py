@@ -2,13 +2,32 @@ from importlib import import_module
 from unittest.mock import patch
 
 from django.test import TestCase
+from django.contrib.auth.models import Group, Permission, User
+from django.db.models import Exists, OuterRef, Q
 
-from app_utils.testdata_factories import UserMainFactory
+from allianceauth.eveonline.models import EveCharacter
+from allianceauth.authentication.models import CharacterOwnership
 
-from charlink.app_imports import import_apps, get_duplicated_apps
+from app_utils.testdata_factories import UserMainFactory, EveCharacterFactory
+
+from charlink.app_imports import import_apps, get_duplicated_apps, get_load_diagnostics
 from charlink.imports.corptools import _corp_perms
 
 from ..app_imports import AppImport
+from ..app_imports.utils import (
+    LoginImport,
+    LinkSpec,
+    PERMISSIONS_ALL,
+    PERMISSIONS_ANY,
+    LOAD_SOURCE_HOOK,
+    LOAD_SOURCE_DEFAULT,
+    LOAD_STATUS_LOADED,
+    LOAD_STATUS_FAILED,
+    LOAD_STATUS_DUPLICATED,
+    users_with_permissions,
+    user_has_permissions,
+    resolve_character_ids,
+)
 
 
 class TestImportApps(TestCase):
@@ -16,6 +35,7 @@ class TestImportApps(TestCase):
     @patch('charlink.app_imports.import_module', wraps=import_module)
     @patch('charlink.app_imports._imported', False)
     @patch('charlink.app_imports._duplicated_apps', set())
+    @patch('charlink.app_imports._load_diagnostics', [])
     @patch('charlink.app_imports._supported_apps', {
         'allianceauth.authentication': AppImport('allianceauth.authentication', [])
     })
@@ -61,6 +81,7 @@ class TestImportApps(TestCase):
     @patch('charlink.app_imports.import_module', wraps=import_module)
     @patch('charlink.app_imports._imported', False)
     @patch('charlink.app_imports._duplicated_apps', set())
+    @patch('charlink.app_imports._load_diagnostics', [])
     @patch('charlink.app_imports._supported_apps', {
         'allianceauth.authentication': AppImport('allianceauth.authentication', [])
     })
@@ -69,6 +90,50 @@ class TestImportApps(TestCase):
         self.assertTrue(mock_import_module.called)
 
 
+class TestLoadDiagnostics(TestCase):
+
+    def _get(self, module):
+        return next(diagnostic for diagnostic in get_load_diagnostics() if diagnostic.module == module)
+
+    def test_loaded(self):
+        diagnostic = self._get('testauth.testapp.charlink_hook')
+
+        self.assertEqual(diagnostic.source, LOAD_SOURCE_HOOK)
+        self.assertEqual(diagnostic.status, LOAD_STATUS_LOADED)
+        self.assertEqual(diagnostic.app_label, 'testauth.testapp')
+        self.assertGreater(diagnostic.import_time, 0)
+        self.assertGreater(diagnostic.validate_time, 0)
+        self.assertIsNone(diagnostic.error)
+
+    def test_default(self):
+        diagnostic = self._get('charlink.imports.allianceauth.authentication')
+
+        self.assertEqual(diagnostic.source, LOAD_SOURCE_DEFAULT)
+        self.assertEqual(diagnostic.status, LOAD_STATUS_LOADED)
+        self.assertFalse(any(diagnostic.module == 'charlink.imports.django.contrib.admin' for diagnostic in get_load_diagnostics()))
+
+    def test_invalid(self):
+        diagnostic = self._get('testauth.testapp.charlink_hook_invalid')
+
+        self.assertEqual(diagnostic.status, LOAD_STATUS_FAILED)
+        self.assertIsNone(diagnostic.app_label)
+        self.assertTrue(diagnostic.error.startswith('AssertionError'))
+        self.assertIn('assert', diagnostic.error)
+
+    def test_no_file(self):
+        diagnostic = self._get('testauth.testapp.charlink_hook_no_file')
+
+        self.assertEqual(diagnostic.status, LOAD_STATUS_FAILED)
+        self.assertTrue(diagnostic.error.startswith('ModuleNotFoundError'))
+
+    def test_duplicated(self):
+        diagnostics = [diagnostic for diagnostic in get_load_diagnostics() if diagnostic.app_label == 'testauth.testapp_duplicate']
+
+        self.assertEqual(len(diagnostics), 2)
+        for diagnostic in diagnostics:
+            self.assertEqual(diagnostic.status, LOAD_STATUS_DUPLICATED)
+
+
 class TestLoginImport(TestCase):
 
     def test_get_query_id(self):
@@ -195,6 +260,21 @@ class TestAppImport(TestCase):
             app_import.validate_import()
         app_import.imports[0].get_users_with_perms = tmp
 
+        app_import.imports[0].required_permissions = ['invalid']
+        with self.assertRaises(AssertionError):
+            app_import.validate_import()
+        app_import.imports[0].required_permissions = None
+
+        app_import.imports[0].required_permissions_mode = 'invalid'
+        with self.assertRaises(AssertionError):
+            app_import.validate_import()
+        app_import.imports[0].required_permissions_mode = PERMISSIONS_ALL
+
+        app_import.imports[0].link_spec = 1
+        with self.assertRaises(AssertionError):
+            app_import.validate_import()
+        app_import.imports[0].link_spec = None
+
         app_import.imports.append(app_import.imports[0])
         with self.assertRaises(AssertionError):
             app_import.validate_import()
@@ -209,3 +289,180 @@ class TestAppImport(TestCase):
         with self.assertRaises(AssertionError):
             app_import.validate_import()
         app_import.app_label = 'allianceauth.authentication'
+
+
+class TestRequiredPermissions(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user_both = UserMainFactory(permissions=['memberaudit.basic_access', 'moonmining.basic_access'])
+        cls.user_one = UserMainFactory(permissions=['memberaudit.basic_access'])
+        cls.user_none = UserMainFactory()
+        cls.superuser = UserMainFactory(is_superuser=True)
+
+        cls.group = Group.objects.create(name='Test Group')
+        cls.group.permissions.add(Permission.objects.get(content_type__app_label='moonmining', codename='basic_access'))
+        cls.user_group = UserMainFactory()
+        cls.user_group.groups.add(cls.group)
+
+        cls.permissions = ['memberaudit.basic_access', 'moonmining.basic_access']
+
+    def _login_import(self, **kwargs):
+        return LoginImport(
+            app_label='memberaudit',
+            unique_id='test',
+            field_label='Test',
+            add_character=lambda request, token: None,
+            scopes=[],
+            is_character_added=lambda character: False,
+            is_character_added_annotation=Exists(EveCharacter.objects.filter(pk=OuterRef('pk'))),
+            **kwargs
+        )
+
+    def test_user_has_permissions(self):
+        self.assertTrue(user_has_permissions(self.user_both, self.permissions))
+        self.assertFalse(user_has_permissions(self.user_one, self.permissions))
+        self.assertTrue(user_has_permissions(self.user_one, self.permissions, PERMISSIONS_ANY))
+        self.assertFalse(user_has_permissions(self.user_none, self.permissions, PERMISSIONS_ANY))
+        self.assertTrue(user_has_permissions(self.superuser, self.permissions))
+
+    def test_users_with_permissions(self):
+        with self.assertNumQueries(1):
+            users_all = set(users_with_permissions(self.permissions))
+
+        self.assertSetEqual(users_all, {self.user_both, self.superuser})
+
+        users_any = set(users_with_permissions(self.permissions, PERMISSIONS_ANY))
+        self.assertSetEqual(users_any, {self.user_both, self.user_one, self.user_group, self.superuser})
+
+    def test_derived_callables(self):
+        login_import = self._login_import(required_permissions=self.permissions, required_permissions_mode=PERMISSIONS_ANY)
+        login_import.validate_import()
+
+        self.assertTrue(login_import.check_permissions(self.user_group))
+        self.assertFalse(login_import.check_permissions(self.user_none))
+        self.assertEqual(login_import.get_users_with_perms().count(), 4)
+
+    def test_explicit_callables(self):
+        login_import = self._login_import(
+            required_permissions=self.permissions,
+            check_permissions=lambda user: True,
+        )
+
+        self.assertTrue(login_import.check_permissions(self.user_none))
+        self.assertEqual(login_import.get_users_with_perms().count(), 2)
+
+
+class TestLinkSpec(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserMainFactory()
+        cls.linked_char = cls.user.profile.main_character
+        cls.unlinked_char = EveCharacterFactory()
+
+        cls.link_spec = LinkSpec(CharacterOwnership, 'character')
+
+    def _login_import(self, **kwargs):
+        return LoginImport(
+            app_label='allianceauth.authentication',
+            unique_id='test',
+            field_label='Test',
+            add_character=lambda request, token: None,
+            scopes=[],
+            check_permissions=lambda user: True,
+            get_users_with_perms=lambda: User.objects.all(),
+            **kwargs
+        )
+
+    def test_is_character_added(self):
+        self.assertTrue(self.link_spec.is_character_added(self.linked_char))
+        self.assertFalse(self.link_spec.is_character_added(self.unlinked_char))
+
+    def test_annotation(self):
+        characters = EveCharacter.objects.annotate(added=self.link_spec.get_annotation())
+
+        self.assertTrue(characters.get(pk=self.linked_char.pk).added)
+        self.assertFalse(characters.get(pk=self.unlinked_char.pk).added)
+
+    def test_filter_linked(self):
+        self.assertQuerysetEqual(self.link_spec.filter_linked(EveCharacter.objects.all()), [self.linked_char])
+
+    def test_filters(self):
+        link_spec = LinkSpec(
+            CharacterOwnership,
+            'character_id',
+            'pk',
+            Q(user__username='invalid'),
+        )
+
+        self.assertFalse(link_spec.is_character_added(self.linked_char))
+        self.assertFalse(link_spec.filter_linked(EveCharacter.objects.all()).exists())
+
+    def test_login_import(self):
+        login_import = self._login_import(link_spec=self.link_spec)
+        login_import.validate_import()
+
+        self.assertTrue(login_import.is_character_added(self.linked_char))
+        self.assertQuerysetEqual(login_import.filter_linked(EveCharacter.objects.all()), [self.linked_char])
+        self.assertQuerysetEqual(EveCharacter.objects.filter(~login_import.get_linked_q()), [self.unlinked_char])
+
+    def test_explicit_override(self):
+        login_import = self._login_import(
+            link_spec=self.link_spec,
+            is_character_added=lambda character: False,
+            is_character_added_annotation=Exists(CharacterOwnership.objects.filter(character_id=OuterRef('pk'), user__username='invalid')),
+        )
+
+        self.assertFalse(login_import.is_character_added(self.linked_char))
+        self.assertFalse(login_import.filter_linked(EveCharacter.objects.all()).exists())
+
+    def test_get_character_values(self):
+        ownership = self.user.character_ownerships.first()
+
+        self.assertEqual(self.link_spec.get_character_values(ownership), {self.linked_char.pk})
+        self.assertIsNone(self.link_spec.get_character_values(self.user))
+
+    def test_get_character_values_character_field(self):
+        link_spec = LinkSpec(CharacterOwnership, 'character__character_id', 'character_id')
+        ownership = self.user.character_ownerships.first()
+
+        self.assertEqual(link_spec.get_character_values(ownership), {self.linked_char.character_id})
+
+    def test_get_dependencies(self):
+        self.assertEqual(self._login_import(link_spec=self.link_spec).get_dependencies(), [self.link_spec])
+        self.assertEqual(self._login_import(dependencies=[User]).get_dependencies(), [User])
+        self.assertIn(
+            CharacterOwnership,
+            self._login_import(
+                is_character_added=lambda character: True,
+                is_character_added_annotation=Exists(CharacterOwnership.objects.filter(character_id=OuterRef('pk'))),
+            ).get_dependencies()
+        )
+
+    def test_invalid_dependencies(self):
+        login_import = self._login_import(link_spec=self.link_spec, dependencies=['invalid'])
+
+        with self.assertRaises(AssertionError):
+            login_import.validate_import()
+
+    def test_tracked_fields(self):
+        self._login_import(
+            link_spec=self.link_spec,
+            dependencies=[LinkSpec(EveCharacter, 'id', tracked_fields=['corporation_id'])],
+        ).validate_import()
+
+        login_import = self._login_import(
+            link_spec=self.link_spec,
+            dependencies=[LinkSpec(EveCharacter, 'id', tracked_fields=['invalid'])],
+        )
+
+        with self.assertRaises(AssertionError):
+            login_import.validate_import()
+
+    def test_resolve_character_ids(self):
+        self.assertSetEqual(resolve_character_ids('pk', {1, 2}), {1, 2})
+        self.assertSetEqual(resolve_character_ids('character_id', {self.linked_char.character_id, 0}), {self.linked_char.pk})
+
+        with self.assertNumQueries(0):
+            self.assertSetEqual(resolve_character_ids('character_id', set()), set())
@@ -0,0 +1,135 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from app_utils.testdata_factories import UserMainFactory, EveCharacterFactory
+
+from memberaudit.models import Character
+
+from charlink.app_imports import import_apps
+from charlink.bitmaps import pks_to_bitmap, bitmap_to_pks, bitmap_count, get_import_bitmap, update_import_bitmap, filter_missing_links
+from charlink.link_state import get_import_version, mark_import_changed
+
+
+class TestBitmapConversions(TestCase):
+
+    def test_roundtrip(self):
+        bitmap = pks_to_bitmap([9, 1, 64, 8])
+
+        self.assertEqual(bitmap, (1 << 1) | (1 << 8) | (1 << 9) | (1 << 64))
+        self.assertListEqual(bitmap_to_pks(bitmap), [1, 8, 9, 64])
+        self.assertEqual(bitmap_count(bitmap), 4)
+
+    def test_empty(self):
+        self.assertEqual(pks_to_bitmap([]), 0)
+        self.assertListEqual(bitmap_to_pks(0), [])
+        self.assertEqual(bitmap_count(0), 0)
+
+
+class TestFilterMissingLinks(TestCase):
+
+    # (character pk, user id), ordered by name
+    characters = [(5, 1), (2, 1), (3, 2), (7, None), (4, 3)]
+    bitmaps = [
+        pks_to_bitmap([2, 3, 5]),
+        pks_to_bitmap([3, 7]),
+    ]
+
+    def test_any(self):
+        self.assertListEqual(filter_missing_links(self.characters, self.bitmaps, 'any'), [5, 2, 7, 4])
+
+    def test_all(self):
+        self.assertListEqual(filter_missing_links(self.characters, self.bitmaps, 'all'), [4])
+
+    def test_user(self):
+        self.assertListEqual(filter_missing_links(self.characters, [pks_to_bitmap([2])], 'user'), [3, 7, 4])
+
+    def test_allowed_users(self):
+        # user 2 can't use the first import, user 3 the second one
+        allowed_users = [{1, 3}, {1, 2}]
+
+        self.assertListEqual(filter_missing_links(self.characters, self.bitmaps, 'any', allowed_users), [5, 2, 4])
+        self.assertListEqual(filter_missing_links(self.characters, self.bitmaps, 'all', allowed_users), [4])
+        self.assertListEqual(filter_missing_links(self.characters, self.bitmaps, 'user', allowed_users), [4])
+
+    def test_user_owned_characters(self):
+        owned_characters = [*self.characters, (9, 3)]
+
+        self.assertListEqual(filter_missing_links(self.characters, [pks_to_bitmap([2, 9])], 'user', owned_characters=owned_characters), [3, 7])
+
+    def test_outside_characters_ignored(self):
+        self.assertListEqual(filter_missing_links([(4, 3)], [pks_to_bitmap([1, 2, 100])], 'any'), [4])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            filter_missing_links(self.characters, self.bitmaps, 'none')
+
+        with self.assertRaises(ValueError):
+            filter_missing_links(self.characters, [], 'any')
+
+
+class TestImportBitmap(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserMainFactory()
+        cls.character = cls.user.profile.main_character
+        cls.other_character = EveCharacterFactory()
+        Character.objects.create(eve_character=cls.character)
+
+    def setUp(self):
+        cache.clear()
+        self.login_import = import_apps()['memberaudit'].get('default')
+
+    def test_build(self):
+        bitmap = get_import_bitmap(self.login_import)
+
+        self.assertListEqual(bitmap_to_pks(bitmap), [self.character.pk])
+
+    def test_cached(self):
+        bitmap = get_import_bitmap(self.login_import)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_import_bitmap(self.login_import), bitmap)
+
+    def test_updated_from_signal(self):
+        get_import_bitmap(self.login_import)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Character.objects.create(eve_character=self.other_character)
+
+        with self.assertNumQueries(0):
+            bitmap = get_import_bitmap(self.login_import)
+
+        self.assertListEqual(bitmap_to_pks(bitmap), sorted([self.character.pk, self.other_character.pk]))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Character.objects.filter(eve_character=self.character).delete()
+
+        self.assertListEqual(bitmap_to_pks(get_import_bitmap(self.login_import)), [self.other_character.pk])
+
+    def test_missed_version(self):
+        get_import_bitmap(self.login_import)
+        mark_import_changed(self.login_import, [self.other_character.pk])
+
+        Character.objects.create(eve_character=self.other_character)
+        version = mark_import_changed(self.login_import, [self.other_character.pk])
+        update_import_bitmap(None, login_import=self.login_import, character_ids={self.other_character.pk}, version=version)
+
+        with self.assertNumQueries(1):
+            bitmap = get_import_bitmap(self.login_import)
+
+        self.assertEqual(bitmap_count(bitmap), 2)
+
+    def test_full_change(self):
+        get_import_bitmap(self.login_import)
+
+        Character.objects.create(eve_character=self.other_character)
+        version = mark_import_changed(self.login_import)
+        update_import_bitmap(None, login_import=self.login_import, character_ids=None, version=version)
+
+        self.assertEqual(bitmap_count(get_import_bitmap(self.login_import)), 2)
+
+    def test_not_cached(self):
+        update_import_bitmap(None, login_import=self.login_import, character_ids={self.character.pk}, version=get_import_version(self.login_import))
+
+        self.assertIsNone(cache.get(f'charlink:bitmap:{self.login_import.get_query_id()}'))
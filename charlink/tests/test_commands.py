@@ -0,0 +1,115 @@
+import csv
+import gzip
+import io
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from app_utils.testdata_factories import UserMainFactory
+
+
+class TestCharlinkExport(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = UserMainFactory.create_batch(2)
+
+    def test_stdout(self):
+        out = io.StringIO()
+        call_command('charlink_export', '--import', 'allianceauth.authentication', stdout=out)
+
+        rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]['allianceauth.authentication_default'], 'True')
+
+    def test_gzip_output(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'export.jsonl.gz')
+            call_command('charlink_export', '--format', 'jsonl', '--gzip', '--output', path)
+
+            with gzip.open(path, 'rt') as f:
+                self.assertEqual(len(f.readlines()), 2)
+
+    def test_gzip_without_output(self):
+        with self.assertRaises(CommandError):
+            call_command('charlink_export', '--gzip')
+
+    def test_no_imports(self):
+        with self.assertRaises(CommandError):
+            call_command('charlink_export', '--import', 'invalid')
+
+
+class TestCharlinkProfile(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = UserMainFactory.create_batch(2)
+
+    def test_ok(self):
+        out = io.StringIO()
+        call_command('charlink_profile', '--import', 'allianceauth.authentication', '--runs', '1', stdout=out)
+
+        output = out.getvalue()
+        self.assertIn('allianceauth.authentication_default', output)
+        self.assertIn('2/2', output)
+
+    def test_no_imports(self):
+        with self.assertRaises(CommandError):
+            call_command('charlink_profile', '--import', 'invalid')
+
+    def test_invalid_runs(self):
+        with self.assertRaises(CommandError):
+            call_command('charlink_profile', '--runs', '0')
+
+
+class TestCharlinkHooks(TestCase):
+
+    def test_ok(self):
+        out = io.StringIO()
+        call_command('charlink_hooks', stdout=out)
+
+        output = out.getvalue()
+        self.assertIn('testauth.testapp.charlink_hook ', output)
+        self.assertIn('charlink.imports.allianceauth.authentication', output)
+        self.assertIn('ModuleNotFoundError', output)
+
+    def test_failed(self):
+        out = io.StringIO()
+        call_command('charlink_hooks', '--failed', stdout=out)
+
+        output = out.getvalue()
+        self.assertNotIn('testauth.testapp.charlink_hook ', output)
+        self.assertIn('testauth.testapp.charlink_hook_invalid', output)
+
+
+class TestCharlinkBenchmarkAudit(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserMainFactory(permissions=['charlink.view_corp', 'memberaudit.basic_access'])
+        cls.other_user = UserMainFactory()
+
+    def test_ok(self):
+        out = io.StringIO()
+        call_command('charlink_benchmark_audit', self.user.username, '--app', 'memberaudit', '--runs', '1', stdout=out)
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[1].startswith('audit_app'))
+        self.assertIn('memberaudit', lines[1])
+        self.assertTrue(lines[2].startswith('audit_user'))
+
+    def test_not_visible(self):
+        out = io.StringIO()
+        err = io.StringIO()
+        call_command('charlink_benchmark_audit', self.user.username, '--audit-user', str(self.other_user.pk), '--app', 'memberaudit', stdout=out, stderr=err)
+
+        self.assertIn('PermissionDenied', err.getvalue())
+        self.assertEqual(len(out.getvalue().splitlines()), 2)
+
+    def test_user_missing(self):
+        with self.assertRaises(CommandError):
+            call_command('charlink_benchmark_audit', 'invalid')
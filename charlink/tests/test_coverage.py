@@ -0,0 +1,196 @@
+import datetime
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from allianceauth.eveonline.models import EveCharacter
+from allianceauth.authentication.models import CharacterOwnership
+
+from allianceauth.tests.auth_utils import AuthUtils
+
+from app_utils.testdata_factories import UserMainFactory, EveCharacterFactory, EveCorporationInfoFactory
+
+from charlink.app_imports import import_apps
+from charlink.coverage import get_link_coverage, get_corp_coverage, can_view_scope, get_coverage_trends
+from charlink.models import CoverageSnapshot
+
+
+class TestGetLinkCoverage(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserMainFactory()
+        cls.corp = cls.user.profile.main_character.corporation
+        EveCharacterFactory.create_batch(3, corporation=cls.corp)
+        cls.user2 = UserMainFactory(main_character__character=EveCharacterFactory(corporation=cls.corp))
+
+        cls.imports = import_apps()['allianceauth.authentication'].imports
+
+    def test_ok(self):
+        with self.assertNumQueries(1):
+            res = get_link_coverage(EveCharacter.objects.all(), self.imports)
+
+        self.assertDictEqual(
+            res[self.corp.corporation_id]['allianceauth.authentication_default'],
+            {
+                'characters_linked': 2,
+                'characters_total': 2,
+                'users_linked': 2,
+                'users_total': 2,
+            }
+        )
+
+    def test_users_without_perms(self):
+        imports = import_apps()['memberaudit'].imports
+        AuthUtils.add_permission_to_user_by_name('memberaudit.basic_access', self.user)
+
+        res = get_link_coverage(EveCharacter.objects.all(), imports)
+
+        self.assertDictEqual(
+            res[self.corp.corporation_id]['memberaudit_default'],
+            {
+                'characters_linked': 0,
+                'characters_total': 1,
+                'users_linked': 0,
+                'users_total': 1,
+            }
+        )
+
+    def test_group_by(self):
+        res = get_link_coverage(EveCharacter.objects.all(), self.imports, group_by='alliance_id')
+
+        self.assertIn(self.corp.alliance.alliance_id, res)
+
+
+class TestGetCorpCoverage(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserMainFactory(permissions=['charlink.view_corp', 'memberaudit.basic_access'])
+        cls.corp = cls.user.profile.main_character.corporation
+        EveCharacterFactory.create_batch(3, corporation=cls.corp)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_ok(self):
+        res = get_corp_coverage(self.user)
+
+        self.assertEqual(len(res['corporations']), 1)
+        self.assertEqual(res['corporations'][0]['corporation_id'], self.corp.corporation_id)
+        self.assertEqual(len(res['corporations'][0]['coverage']), len(res['imports']))
+
+        counts = {
+            counts['import'].get_query_id(): counts
+            for counts in res['corporations'][0]['coverage']
+        }
+        self.assertEqual(counts['allianceauth.authentication_default']['characters_linked'], 1)
+        self.assertEqual(counts['allianceauth.authentication_default']['characters_total'], 1)
+        self.assertEqual(counts['allianceauth.authentication_default']['characters_percentage'], 100.0)
+        self.assertEqual(counts['memberaudit_default']['users_total'], 1)
+        self.assertEqual(counts['memberaudit_default']['users_percentage'], 0.0)
+
+    def test_users_without_perms(self):
+        UserMainFactory(main_character__character=EveCharacterFactory(corporation=self.corp))
+
+        res = get_corp_coverage(self.user)
+
+        counts = {
+            counts['import'].get_query_id(): counts
+            for counts in res['corporations'][0]['coverage']
+        }
+        self.assertEqual(counts['allianceauth.authentication_default']['users_total'], 2)
+        self.assertEqual(counts['memberaudit_default']['characters_total'], 1)
+        self.assertEqual(counts['memberaudit_default']['users_total'], 1)
+
+    def test_alts_in_other_corps(self):
+        alt = EveCharacterFactory(corporation=EveCorporationInfoFactory())
+        CharacterOwnership.objects.create(character=alt, user=self.user, owner_hash='alt_hash')
+
+        res = get_corp_coverage(self.user)
+
+        self.assertEqual(len(res['corporations']), 1)
+        counts = {
+            counts['import'].get_query_id(): counts
+            for counts in res['corporations'][0]['coverage']
+        }
+        self.assertEqual(counts['allianceauth.authentication_default']['characters_linked'], 2)
+        self.assertEqual(counts['allianceauth.authentication_default']['characters_total'], 2)
+        self.assertEqual(counts['allianceauth.authentication_default']['users_total'], 1)
+
+    @patch('charlink.coverage.get_link_coverage', wraps=get_link_coverage)
+    def test_cached(self, mock_get_link_coverage):
+        get_corp_coverage(self.user)
+        get_corp_coverage(self.user)
+
+        mock_get_link_coverage.assert_called_once()
+
+
+class TestCanViewScope(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserMainFactory()
+        cls.superuser = UserMainFactory(is_superuser=True)
+        cls.main_char = cls.user.profile.main_character
+        cls.other_corp = EveCorporationInfoFactory()
+
+    def test_superuser(self):
+        self.assertTrue(can_view_scope(self.superuser, CoverageSnapshot.Scope.CORPORATION, self.other_corp.corporation_id))
+
+    def test_corporation(self):
+        self.assertFalse(can_view_scope(self.user, CoverageSnapshot.Scope.CORPORATION, self.main_char.corporation_id))
+
+        user = AuthUtils.add_permission_to_user_by_name('charlink.view_corp', self.user)
+        self.assertTrue(can_view_scope(user, CoverageSnapshot.Scope.CORPORATION, self.main_char.corporation_id))
+        self.assertFalse(can_view_scope(user, CoverageSnapshot.Scope.CORPORATION, self.other_corp.corporation_id))
+
+    def test_alliance(self):
+        self.assertFalse(can_view_scope(self.user, CoverageSnapshot.Scope.ALLIANCE, self.main_char.alliance_id))
+
+        user = AuthUtils.add_permission_to_user_by_name('charlink.view_alliance', self.user)
+        self.assertTrue(can_view_scope(user, CoverageSnapshot.Scope.ALLIANCE, self.main_char.alliance_id))
+        self.assertFalse(can_view_scope(user, CoverageSnapshot.Scope.ALLIANCE, self.other_corp.alliance.alliance_id))
+
+    def test_state(self):
+        self.assertFalse(can_view_scope(self.user, CoverageSnapshot.Scope.STATE, self.user.profile.state_id))
+
+        user = AuthUtils.add_permission_to_user_by_name('charlink.view_state', self.user)
+        self.assertTrue(can_view_scope(user, CoverageSnapshot.Scope.STATE, self.user.profile.state_id))
+
+    def test_invalid_scope(self):
+        self.assertFalse(can_view_scope(self.user, 'invalid', 1))
+
+
+class TestGetCoverageTrends(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.imports = import_apps()['allianceauth.authentication'].imports
+        today = timezone.now().date()
+
+        for days in range(3):
+            CoverageSnapshot.objects.create(
+                date=today - datetime.timedelta(days=days * 10),
+                scope=CoverageSnapshot.Scope.CORPORATION,
+                scope_id=1,
+                import_id='allianceauth.authentication_default',
+                characters_linked=days,
+                characters_total=4,
+                users_linked=days,
+                users_total=2,
+            )
+
+    def test_ok(self):
+        res = get_coverage_trends(
+            CoverageSnapshot.Scope.CORPORATION,
+            1,
+            self.imports,
+            timezone.now().date() - datetime.timedelta(days=15)
+        )
+
+        self.assertEqual(len(res['rows']), 2)
+        self.assertLess(res['rows'][0]['date'], res['rows'][1]['date'])
+        self.assertEqual(res['rows'][0]['coverage'][0]['characters_percentage'], 25.0)
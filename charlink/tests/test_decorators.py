@@ -1,9 +1,12 @@
+import os
+import pstats
+import tempfile
 from unittest.mock import patch
 
 from django.test import TestCase, RequestFactory
 from django.urls import reverse
 
-from charlink.decorators import charlink
+from charlink.decorators import charlink, sample_profile
 
 
 class TestCharlink(TestCase):
@@ -47,3 +50,44 @@ class TestCharlink(TestCase):
         )
 
         self.assertTrue(mock_messages_error.called)
+
+
+class TestSampleProfile(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.factory = RequestFactory()
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def _get_view(self):
+        @sample_profile
+        def test_view(request):
+            return 'ok'
+
+        return test_view
+
+    @patch('charlink.decorators.CHARLINK_PROFILE_SAMPLE_RATE', 0)
+    def test_disabled(self):
+        with patch('charlink.profiling.CHARLINK_PROFILE_DIR', self.tmpdir.name):
+            self.assertEqual(self._get_view()(self.factory.get('/charlink/')), 'ok')
+
+        self.assertListEqual(os.listdir(self.tmpdir.name), [])
+
+    @patch('charlink.decorators.CHARLINK_PROFILE_SAMPLE_RATE', 1)
+    def test_sampled(self):
+        with patch('charlink.profiling.CHARLINK_PROFILE_DIR', self.tmpdir.name):
+            self.assertEqual(self._get_view()(self.factory.get('/charlink/')), 'ok')
+
+        files = os.listdir(self.tmpdir.name)
+        self.assertEqual(len(files), 1)
+        self.assertTrue(files[0].endswith('_test_view.prof'))
+        pstats.Stats(os.path.join(self.tmpdir.name, files[0]))
+
+    @patch('charlink.decorators.CHARLINK_PROFILE_SAMPLE_RATE', 1)
+    @patch('charlink.decorators.save_profile', side_effect=OSError)
+    def test_save_error(self, mock_save_profile):
+        self.assertEqual(self._get_view()(self.factory.get('/charlink/')), 'ok')
+        self.assertTrue(mock_save_profile.called)
@@ -0,0 +1,143 @@
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from charlink.dispatch import dispatch, dispatch_once
+
+
+class TestDispatchOnce(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.task = Mock()
+        self.task.name = 'test.task'
+
+    def test_first(self):
+        result = dispatch_once(self.task, args=[1], priority=6)
+
+        self.assertIs(result, self.task.apply_async.return_value)
+        self.task.apply_async.assert_called_once_with(args=[1], kwargs=None, priority=6)
+
+    def test_coalesced(self):
+        dispatch_once(self.task, window=60)
+        trailing = dispatch_once(self.task, window=60)
+        dropped = dispatch_once(self.task, window=60)
+
+        self.assertIsNotNone(trailing)
+        self.assertIsNone(dropped)
+        self.assertEqual(self.task.apply_async.call_count, 2)
+        self.assertEqual(self.task.apply_async.call_args.kwargs['countdown'], 60)
+
+    def test_not_leading(self):
+        scheduled = dispatch_once(self.task, window=60, leading=False)
+        dropped = dispatch_once(self.task, window=60, leading=False)
+
+        self.assertIsNotNone(scheduled)
+        self.assertIsNone(dropped)
+        self.task.apply_async.assert_called_once_with(args=None, kwargs=None, countdown=60)
+
+    def test_different_args(self):
+        dispatch_once(self.task, args=[1])
+        dispatch_once(self.task, args=[2])
+        dispatch_once(self.task, kwargs={'test': 1})
+
+        for call in self.task.apply_async.call_args_list:
+            self.assertNotIn('countdown', call.kwargs)
+
+    def test_different_tasks(self):
+        other_task = Mock()
+        other_task.name = 'test.other_task'
+
+        dispatch_once(self.task)
+        dispatch_once(other_task)
+
+        self.task.apply_async.assert_called_once()
+        other_task.apply_async.assert_called_once()
+
+    def test_send_error(self):
+        self.task.apply_async.side_effect = [ConnectionError, None]
+
+        with self.assertRaises(ConnectionError):
+            dispatch_once(self.task)
+
+        dispatch_once(self.task)
+
+        self.assertNotIn('countdown', self.task.apply_async.call_args.kwargs)
+
+    @patch('charlink.dispatch.CHARLINK_TASK_RATE_LIMITS', {'testapp': {'rate': 60, 'burst': 1}})
+    def test_rate_limited(self):
+        dispatch_once(self.task, args=[1], app_label='testapp')
+        dispatch_once(self.task, args=[2], app_label='testapp')
+
+        self.assertNotIn('countdown', self.task.apply_async.call_args_list[0].kwargs)
+        self.assertEqual(self.task.apply_async.call_args_list[1].kwargs['countdown'], 1)
+
+
+@patch('charlink.dispatch.time.time', return_value=1000000.0)
+@patch('charlink.dispatch.CHARLINK_TASK_RATE_LIMITS', {'testapp': {'rate': 30, 'burst': 2, 'priority': 8}})
+class TestDispatch(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.task = Mock()
+        self.task.name = 'test.task'
+
+    def _countdowns(self):
+        return [call.kwargs.get('countdown', 0) for call in self.task.apply_async.call_args_list]
+
+    def test_no_limit(self, mock_time):
+        for _ in range(5):
+            dispatch(self.task, 'otherapp', args=[1], priority=6)
+
+        self.assertEqual(self.task.apply_async.call_count, 5)
+        self.task.apply_async.assert_called_with(args=[1], kwargs=None, priority=6)
+
+    def test_invalid_rate(self, mock_time):
+        for rate_limits in ({'testapp': {'rate': 0}}, {'testapp': {'burst': 2}}):
+            with self.subTest(rate_limits=rate_limits), patch('charlink.dispatch.CHARLINK_TASK_RATE_LIMITS', rate_limits):
+                self.task.apply_async.reset_mock()
+
+                for _ in range(3):
+                    dispatch(self.task, 'testapp')
+
+                self.assertListEqual(self._countdowns(), [0, 0, 0])
+
+    @patch('charlink.dispatch.CHARLINK_TASK_RATE_LIMITS', {'testapp': {'rate': 30, 'burst': 0}})
+    def test_invalid_burst(self, mock_time):
+        for _ in range(3):
+            dispatch(self.task, 'testapp')
+
+        self.assertListEqual(self._countdowns(), [0, 2, 4])
+
+    def test_burst_then_deferred(self, mock_time):
+        for _ in range(5):
+            dispatch(self.task, 'testapp', priority=6)
+
+        self.assertListEqual(self._countdowns(), [0, 0, 2, 4, 6])
+        self.assertEqual(self.task.apply_async.call_args.kwargs['priority'], 8)
+
+    def test_refill(self, mock_time):
+        for _ in range(3):
+            dispatch(self.task, 'testapp')
+
+        mock_time.return_value += 2
+        dispatch(self.task, 'testapp')
+
+        # the slot freed after 2 seconds was already given to the third task
+        self.assertEqual(self._countdowns()[-1], 2)
+
+    def test_full_after_idle(self, mock_time):
+        dispatch(self.task, 'testapp')
+
+        mock_time.return_value += 3600
+        for _ in range(3):
+            dispatch(self.task, 'testapp')
+
+        self.assertListEqual(self._countdowns(), [0, 0, 0, 2])
+
+    def test_countdown_added(self, mock_time):
+        for _ in range(3):
+            dispatch(self.task, 'testapp', countdown=10)
+
+        self.assertListEqual(self._countdowns(), [10, 10, 12])
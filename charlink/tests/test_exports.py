@@ -0,0 +1,115 @@
+import csv
+import gzip
+import io
+import json
+
+from django.test import TestCase
+
+from app_utils.testdata_factories import UserMainFactory, EveCorporationInfoFactory, EveCharacterFactory
+
+from charlink.app_imports import import_apps
+from charlink.exports import filter_imports, get_export_characters, iter_link_matrix, stream_export, gzip_stream
+
+
+class TestFilterImports(TestCase):
+
+    def test_ok(self):
+        imports = [
+            *import_apps()['allianceauth.authentication'].imports,
+            *import_apps()['corptools'].imports,
+        ]
+
+        self.assertEqual(len(filter_imports(imports)), 3)
+        self.assertEqual(len(filter_imports(imports, ['corptools'])), 2)
+        self.assertEqual(len(filter_imports(imports, ['corptools_default'])), 1)
+        self.assertEqual(len(filter_imports(imports, ['invalid'])), 0)
+
+
+class TestGetExportCharacters(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserMainFactory()
+        cls.corp = cls.user.profile.main_character.corporation
+        cls.corp2 = EveCorporationInfoFactory()
+        EveCharacterFactory.create_batch(3, corporation=cls.corp2)
+
+    def test_no_filters(self):
+        self.assertEqual(get_export_characters().count(), 4)
+
+    def test_visible_corps(self):
+        characters = get_export_characters(corp_ids=[self.corp.corporation_id])
+        self.assertEqual(characters.count(), 1)
+
+    def test_corporations(self):
+        characters = get_export_characters(corporations=[self.corp2.corporation_id])
+        self.assertEqual(characters.count(), 3)
+
+    def test_alliances(self):
+        characters = get_export_characters(alliances=[self.corp2.alliance.alliance_id])
+        self.assertEqual(characters.count(), 3)
+
+
+class TestStreamExport(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = UserMainFactory.create_batch(3)
+        cls.imports = import_apps()['allianceauth.authentication'].imports
+
+    def test_iter_link_matrix(self):
+        rows = list(iter_link_matrix(get_export_characters(), self.imports, chunk_size=1))
+
+        self.assertEqual(len(rows), 3)
+        for row in rows:
+            self.assertTrue(row['allianceauth.authentication_default'])
+            self.assertEqual(row['main_character_id'], row['character_id'])
+
+    def test_iter_link_matrix_pages(self):
+        expected = list(get_export_characters().values_list('character_id', flat=True))
+
+        for chunk_size in (1, 2, 3, 4):
+            with self.subTest(chunk_size=chunk_size):
+                rows = list(iter_link_matrix(get_export_characters(), self.imports, chunk_size=chunk_size))
+                self.assertListEqual([row['character_id'] for row in rows], expected)
+
+    def test_iter_link_matrix_import_users(self):
+        EveCharacterFactory()
+        imports = [*self.imports, import_apps()['memberaudit'].get('default')]
+
+        rows = list(iter_link_matrix(get_export_characters(), imports))
+
+        self.assertEqual(len(rows), 3)
+        for row in rows:
+            self.assertTrue(row['allianceauth.authentication_default'])
+            self.assertIsNone(row['memberaudit_default'])
+
+    def test_iter_link_matrix_no_import_users(self):
+        rows = list(iter_link_matrix(get_export_characters(), [import_apps()['memberaudit'].get('default')]))
+
+        self.assertListEqual(rows, [])
+
+    def test_csv(self):
+        content = ''.join(stream_export(get_export_characters(), self.imports, 'csv'))
+        rows = list(csv.DictReader(io.StringIO(content)))
+
+        self.assertEqual(len(rows), 3)
+        self.assertIn('allianceauth.authentication_default', rows[0])
+        self.assertEqual(rows[0]['allianceauth.authentication_default'], 'True')
+
+    def test_jsonl(self):
+        content = ''.join(stream_export(get_export_characters(), self.imports, 'jsonl'))
+        rows = [json.loads(line) for line in content.splitlines()]
+
+        self.assertEqual(len(rows), 3)
+        self.assertTrue(rows[0]['allianceauth.authentication_default'])
+
+    def test_invalid_format(self):
+        with self.assertRaises(ValueError):
+            stream_export(get_export_characters(), self.imports, 'xml')
+
+    def test_gzip(self):
+        content = b''.join(gzip_stream(stream_export(get_export_characters(), self.imports, 'jsonl')))
+        lines = gzip.decompress(content).decode('utf-8').splitlines()
+
+        self.assertEqual(len(lines), 3)
@@ -0,0 +1,323 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.test import TestCase, RequestFactory
+from django.utils import timezone
+
+from allianceauth.eveonline.models import EveCharacter
+from allianceauth.tests.auth_utils import AuthUtils
+
+from app_utils.testdata_factories import UserMainFactory, EveCharacterFactory, EveCorporationInfoFactory
+
+from esi.models import Token
+from memberaudit.models import Character
+
+from charlink.app_imports import import_apps
+from charlink.app_imports.utils import resolve_character_ids
+from charlink.link_state import (
+    get_link_state_version,
+    bump_link_state_version,
+    get_import_version,
+    get_import_versions,
+    get_permissions_version,
+    mark_import_changed,
+    get_changed_characters,
+    get_visibility_signature,
+    link_state_etag,
+)
+from charlink.models import CoverageSnapshot
+from charlink.signals import link_state_changed
+
+
+class TestLinkStateVersion(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_get(self):
+        version = get_link_state_version()
+        self.assertEqual(get_link_state_version(), version)
+
+    def test_bump(self):
+        version = get_link_state_version()
+        self.assertEqual(bump_link_state_version(), version + 1)
+        self.assertEqual(get_link_state_version(), version + 1)
+
+    def test_bump_missing(self):
+        version = bump_link_state_version()
+        self.assertEqual(get_link_state_version(), version)
+
+
+class TestImportChanges(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.login_import = import_apps()['memberaudit'].get('default')
+
+    def test_characters(self):
+        version = get_import_version(self.login_import)
+
+        new_version = mark_import_changed(self.login_import, [1, 2])
+
+        self.assertGreater(new_version, version)
+        self.assertEqual(get_import_version(self.login_import), new_version)
+        self.assertSetEqual(get_changed_characters(self.login_import, [1, 2, 3], version), {1, 2})
+        self.assertSetEqual(get_changed_characters(self.login_import, [1, 2, 3], new_version), set())
+
+    def test_get_import_versions(self):
+        other_import = import_apps()['allianceauth.authentication'].get('default')
+        version = mark_import_changed(self.login_import)
+
+        versions = get_import_versions([self.login_import, other_import])
+
+        self.assertEqual(versions[0], version)
+        self.assertEqual(versions[1], get_import_version(other_import))
+
+    def test_full(self):
+        version = get_import_version(self.login_import)
+
+        new_version = mark_import_changed(self.login_import)
+
+        self.assertIsNone(get_changed_characters(self.login_import, [1, 2, 3], version))
+        self.assertSetEqual(get_changed_characters(self.login_import, [1, 2, 3], new_version), set())
+
+
+class TestSignals(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserMainFactory()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_link_model(self):
+        login_import = import_apps()['memberaudit'].get('default')
+        version = get_link_state_version()
+        import_version = get_import_version(login_import)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Character.objects.create(eve_character=self.user.profile.main_character)
+
+        self.assertEqual(get_link_state_version(), version)
+        self.assertGreater(get_import_version(login_import), import_version)
+
+    def test_visibility_fields(self):
+        character = EveCharacter.objects.get(pk=self.user.profile.main_character.pk)
+        version = get_link_state_version()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            # periodic updates save the same values
+            character.save()
+
+        self.assertEqual(get_link_state_version(), version)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            character.alliance_id = None
+            character.save()
+
+        self.assertGreater(get_link_state_version(), version)
+
+    def test_visibility_update_fields(self):
+        profile = self.user.profile
+        version = get_link_state_version()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save(update_fields=['language'])
+
+        self.assertEqual(get_link_state_version(), version)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.main_character = EveCharacterFactory()
+            profile.save(update_fields=['main_character'])
+
+        self.assertGreater(get_link_state_version(), version)
+
+    def test_permissions(self):
+        version = get_link_state_version()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            AuthUtils.add_permission_to_user_by_name('charlink.view_corp', self.user)
+
+        self.assertGreater(get_link_state_version(), version)
+
+    def test_permissions_version(self):
+        version = get_permissions_version()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save(update_fields=['last_login'])
+
+        self.assertEqual(get_permissions_version(), version)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+
+        self.assertGreater(get_permissions_version(), version)
+
+    def test_group_members(self):
+        group = Group.objects.create(name='Test')
+        version = get_link_state_version()
+
+        # reverse side of User.groups
+        with self.captureOnCommitCallbacks(execute=True):
+            group.user_set.add(self.user)
+
+        self.assertGreater(get_link_state_version(), version)
+
+    def test_other_model(self):
+        version = get_link_state_version()
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            CoverageSnapshot.objects.create(
+                date=timezone.now().date(),
+                scope=CoverageSnapshot.Scope.CORPORATION,
+                scope_id=1,
+                import_id='test_default'
+            )
+
+        # the receivers are connected only to the link state models
+        self.assertEqual(len(callbacks), 0)
+        self.assertEqual(get_link_state_version(), version)
+
+    def test_not_committed(self):
+        login_import = import_apps()['memberaudit'].get('default')
+        version = get_import_version(login_import)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            Character.objects.create(eve_character=self.user.profile.main_character)
+
+        self.assertGreater(len(callbacks), 0)
+        self.assertEqual(get_import_version(login_import), version)
+
+    def test_link_state_changed(self):
+        received = []
+
+        def handler(sender, login_import, character_ids, version, **kwargs):
+            received.append((login_import.get_query_id(), character_ids))
+
+        link_state_changed.connect(handler)
+        try:
+            with self.captureOnCommitCallbacks(execute=True):
+                Character.objects.create(eve_character=self.user.profile.main_character)
+        finally:
+            link_state_changed.disconnect(handler)
+
+        self.assertIn(('memberaudit_default', {self.user.profile.main_character.pk}), received)
+
+
+class TestDependencySignals(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserMainFactory()
+        cls.character = cls.user.profile.main_character
+        cls.afat_import = import_apps()['afat'].get('readfleet')
+        cls.corp_import = import_apps()['corptools'].get('structures')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_token_refresh(self):
+        token = Token.objects.get(pk=self.user.token_set.first().pk)
+        version = get_import_version(self.afat_import)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            token.access_token = 'refreshed'
+            token.save()
+
+        self.assertEqual(get_import_version(self.afat_import), version)
+
+    def test_token_deleted(self):
+        version = get_import_version(self.afat_import)
+
+        with patch('charlink.signals.resolve_character_ids', wraps=resolve_character_ids) as mock_resolve:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.user.token_set.first().delete()
+
+        self.assertGreater(get_import_version(self.afat_import), version)
+        self.assertSetEqual(get_changed_characters(self.afat_import, [self.character.pk], version), {self.character.pk})
+        # shared by every import depending on the tokens
+        mock_resolve.assert_called_once()
+
+    def test_character_corporation_changed(self):
+        character = EveCharacter.objects.get(pk=self.character.pk)
+        version = get_import_version(self.corp_import)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            character.save()
+
+        self.assertEqual(get_import_version(self.corp_import), version)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            character.corporation_id = EveCorporationInfoFactory().corporation_id
+            character.save()
+
+        self.assertGreater(get_import_version(self.corp_import), version)
+        self.assertSetEqual(get_changed_characters(self.corp_import, [self.character.pk], version), {self.character.pk})
+
+    def test_update_fields(self):
+        character = EveCharacter.objects.get(pk=self.character.pk)
+        version = get_import_version(self.corp_import)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            character.corporation_id = EveCorporationInfoFactory().corporation_id
+            character.save(update_fields=['character_name'])
+
+        self.assertEqual(get_import_version(self.corp_import), version)
+
+
+class TestLinkStateEtag(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.factory = RequestFactory()
+        cls.user = UserMainFactory(permissions=['charlink.view_corp'])
+        cls.user2 = UserMainFactory(
+            permissions=['charlink.view_corp'],
+            main_character__character=EveCharacterFactory(corporation=cls.user.profile.main_character.corporation),
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def _get_request(self, user, path='/charlink/audit/corp/1/'):
+        request = self.factory.get(path)
+        request.user = user
+        return request
+
+    def test_stable(self):
+        self.assertEqual(
+            link_state_etag(self._get_request(self.user)),
+            link_state_etag(self._get_request(self.user)),
+        )
+
+    def test_version_changed(self):
+        etag = link_state_etag(self._get_request(self.user))
+        bump_link_state_version()
+
+        self.assertNotEqual(link_state_etag(self._get_request(self.user)), etag)
+
+    def test_import_changed(self):
+        etag = link_state_etag(self._get_request(self.user))
+        mark_import_changed(import_apps()['memberaudit'].get('default'), [self.user.profile.main_character.pk])
+
+        self.assertNotEqual(link_state_etag(self._get_request(self.user)), etag)
+
+    def test_different_path(self):
+        self.assertNotEqual(
+            link_state_etag(self._get_request(self.user)),
+            link_state_etag(self._get_request(self.user, '/charlink/audit/corp/2/')),
+        )
+
+    @patch('charlink.link_state.CHARLINK_READ_DATABASE', 'replica')
+    def test_read_database(self):
+        self.assertIsNone(link_state_etag(self._get_request(self.user)))
+
+    def test_different_user(self):
+        self.assertNotEqual(get_visibility_signature(self.user), get_visibility_signature(self.user2))
+        self.assertNotEqual(
+            link_state_etag(self._get_request(self.user)),
+            link_state_etag(self._get_request(self.user2)),
+        )
@@ -0,0 +1,50 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from charlink.models import PendingAdminNotification
+from charlink.notifications import queue_admin_notification
+
+
+@patch('charlink.notifications.send_admin_notification_digests')
+class TestQueueAdminNotification(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_ok(self, mock_send_digests):
+        with self.captureOnCommitCallbacks(execute=True):
+            queue_admin_notification('test:1', 'Title', 'Message')
+
+        notification = PendingAdminNotification.objects.get()
+        self.assertEqual(notification.group, 'test:1')
+        self.assertEqual(notification.title, 'Title')
+        self.assertEqual(notification.message, 'Message')
+        mock_send_digests.apply_async.assert_called_once()
+        self.assertDictEqual(mock_send_digests.apply_async.call_args.kwargs['kwargs'], {'group': 'test:1'})
+
+    def test_scheduled_once_per_group(self, mock_send_digests):
+        with self.captureOnCommitCallbacks(execute=True):
+            queue_admin_notification('test:1', 'Title', 'Message 1')
+            queue_admin_notification('test:1', 'Title', 'Message 2')
+            queue_admin_notification('test:2', 'Title', 'Message 3')
+
+        self.assertEqual(PendingAdminNotification.objects.count(), 3)
+        self.assertEqual(mock_send_digests.apply_async.call_count, 2)
+
+    def test_not_committed(self, mock_send_digests):
+        with self.captureOnCommitCallbacks() as callbacks:
+            queue_admin_notification('test:1', 'Title', 'Message')
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertFalse(mock_send_digests.apply_async.called)
+
+    def test_rolled_back(self, mock_send_digests):
+        with self.captureOnCommitCallbacks():
+            queue_admin_notification('test:1', 'Title', 'Message 1')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            queue_admin_notification('test:1', 'Title', 'Message 2')
+
+        mock_send_digests.apply_async.assert_called_once()
@@ -0,0 +1,79 @@
+import os
+import tempfile
+
+from django.test import TestCase
+
+from app_utils.testdata_factories import UserMainFactory, EveCharacterFactory
+
+from allianceauth.eveonline.models import EveCharacter
+
+from charlink.app_imports import import_apps
+from charlink.profiling import profile_import, profile_imports, rotate_profiles
+
+
+class TestProfileImport(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = UserMainFactory.create_batch(2)
+        EveCharacterFactory()
+        cls.login_import = import_apps()['allianceauth.authentication'].get('default')
+
+    def test_ok(self):
+        result = profile_import(EveCharacter.objects.all(), self.login_import, runs=2)
+
+        self.assertEqual(result['import_id'], 'allianceauth.authentication_default')
+        self.assertEqual(len(result['times']), 2)
+        self.assertLessEqual(result['best'], result['mean'])
+        self.assertEqual(result['queries'], 1)
+        self.assertEqual(result['characters'], 3)
+        self.assertEqual(result['linked'], 2)
+        self.assertIsInstance(result['explain'], str)
+
+    def test_no_explain(self):
+        result = profile_import(EveCharacter.objects.all(), self.login_import, explain=False)
+
+        self.assertIsNone(result['explain'])
+
+
+class TestProfileImports(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = UserMainFactory.create_batch(3)
+
+    def test_ranked(self):
+        imports = [
+            *import_apps()['allianceauth.authentication'].imports,
+            *import_apps()['corptools'].imports,
+        ]
+
+        results = profile_imports(EveCharacter.objects.all(), imports, runs=1, explain=False, sample=2)
+
+        self.assertEqual(len(results), 3)
+        self.assertEqual([result['best'] for result in results], sorted((result['best'] for result in results), reverse=True))
+        for result in results:
+            self.assertEqual(result['characters'], 2)
+
+
+class TestRotateProfiles(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+        for index in range(5):
+            path = os.path.join(self.tmpdir.name, f'{index}.prof')
+            with open(path, 'wb') as f:
+                f.write(b'x' * 10)
+            os.utime(path, (index, index))
+
+    def test_max_files(self):
+        rotate_profiles(self.tmpdir.name, max_files=2, max_bytes=1000)
+
+        self.assertListEqual(sorted(os.listdir(self.tmpdir.name)), ['3.prof', '4.prof'])
+
+    def test_max_bytes(self):
+        rotate_profiles(self.tmpdir.name, max_files=10, max_bytes=35)
+
+        self.assertListEqual(sorted(os.listdir(self.tmpdir.name)), ['2.prof', '3.prof', '4.prof'])
@@ -0,0 +1,75 @@
+import datetime
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from app_utils.testdata_factories import UserMainFactory
+
+from charlink.app_imports import import_apps
+from charlink.models import AddCharacterStats
+from charlink.stats import get_bucket, record_add_character, get_add_character_summary
+
+
+class TestGetBucket(TestCase):
+
+    def test_ok(self):
+        self.assertEqual(get_bucket(0.01), 0)
+        self.assertEqual(get_bucket(0.05), 1)
+        self.assertEqual(get_bucket(0.3), 3)
+        self.assertEqual(get_bucket(60), len(AddCharacterStats.BUCKET_BOUNDS))
+
+
+class TestRecordAddCharacter(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.login_import = import_apps()['allianceauth.authentication'].get('default')
+
+    def test_ok(self):
+        record_add_character(self.login_import, 0.3, True)
+        record_add_character(self.login_import, 0.4, False)
+        record_add_character(self.login_import, 2, True)
+
+        self.assertEqual(AddCharacterStats.objects.count(), 2)
+
+        stats = AddCharacterStats.objects.get(bucket=get_bucket(0.3))
+        self.assertEqual(stats.import_id, 'allianceauth.authentication_default')
+        self.assertEqual(stats.date, timezone.now().date())
+        self.assertEqual(stats.successes, 1)
+        self.assertEqual(stats.failures, 1)
+        self.assertAlmostEqual(stats.duration_total, 0.7)
+
+    def test_summary(self):
+        today = timezone.now().date()
+        record_add_character(self.login_import, 0.3, True)
+        record_add_character(self.login_import, 0.5, False)
+        record_add_character(self.login_import, 1, True, today - datetime.timedelta(days=10))
+
+        summary = get_add_character_summary(today)
+
+        self.assertListEqual(list(summary), ['allianceauth.authentication_default'])
+        import_summary = summary['allianceauth.authentication_default']
+        self.assertEqual(import_summary['successes'], 1)
+        self.assertEqual(import_summary['failures'], 1)
+        self.assertAlmostEqual(import_summary['duration_mean'], 0.4)
+        self.assertEqual(import_summary['histogram'][get_bucket(0.3)], 1)
+        self.assertEqual(import_summary['histogram'][get_bucket(0.5)], 1)
+        self.assertEqual(sum(import_summary['histogram']), 2)
+
+
+class TestAddCharacterStatsAdmin(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.superuser = UserMainFactory(is_superuser=True, is_staff=True)
+        record_add_character(import_apps()['allianceauth.authentication'].get('default'), 0.3, True)
+
+    def test_changelist(self):
+        self.client.force_login(self.superuser)
+
+        res = self.client.get(reverse('admin:charlink_addcharacterstats_changelist'))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(res.context['summary']), 1)
+        self.assertContains(res, 'allianceauth.authentication_default')
@@ -0,0 +1,222 @@
+import datetime
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from allianceauth.authentication.models import CharacterOwnership
+from allianceauth.corputils.models import CorpStats
+
+from app_utils.testdata_factories import UserMainFactory, EveCharacterFactory, EveCorporationInfoFactory
+
+from charlink.coverage import get_corp_coverage
+from charlink.models import CoverageSnapshot, AddCharacterStats, PendingAdminNotification, LinkUpdate
+from charlink.tasks import snapshot_coverage, prune_add_character_stats, prune_link_updates, send_admin_notification_digests, run_link_update, calc_miningtaxes_admin_stats
+
+
+class TestSnapshotCoverage(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserMainFactory()
+        cls.main_char = cls.user.profile.main_character
+        EveCharacterFactory.create_batch(2, corporation=cls.main_char.corporation)
+
+    def test_ok(self):
+        snapshot_coverage()
+
+        snapshot = CoverageSnapshot.objects.get(
+            scope=CoverageSnapshot.Scope.CORPORATION,
+            scope_id=self.main_char.corporation_id,
+            import_id='allianceauth.authentication_default',
+        )
+        self.assertEqual(snapshot.characters_linked, 1)
+        self.assertEqual(snapshot.characters_total, 1)
+        self.assertEqual(snapshot.users_linked, 1)
+
+        self.assertTrue(
+            CoverageSnapshot.objects.filter(
+                scope=CoverageSnapshot.Scope.ALLIANCE,
+                scope_id=self.main_char.alliance_id,
+            ).exists()
+        )
+        self.assertTrue(
+            CoverageSnapshot.objects.filter(
+                scope=CoverageSnapshot.Scope.STATE,
+                scope_id=self.user.profile.state_id,
+            ).exists()
+        )
+
+    def test_same_as_coverage_page(self):
+        cache.clear()
+        superuser = UserMainFactory(is_superuser=True)
+        alt = EveCharacterFactory(corporation=EveCorporationInfoFactory())
+        CharacterOwnership.objects.create(character=alt, user=self.user, owner_hash='alt_hash')
+
+        snapshot_coverage()
+
+        coverage = get_corp_coverage(superuser)
+        for corp in coverage['corporations']:
+            for counts in corp['coverage']:
+                snapshot = CoverageSnapshot.objects.get(
+                    scope=CoverageSnapshot.Scope.CORPORATION,
+                    scope_id=corp['corporation_id'],
+                    import_id=counts['import'].get_query_id(),
+                )
+                self.assertEqual(snapshot.characters_linked, counts['characters_linked'])
+                self.assertEqual(snapshot.characters_total, counts['characters_total'])
+                self.assertEqual(snapshot.users_linked, counts['users_linked'])
+                self.assertEqual(snapshot.users_total, counts['users_total'])
+
+    def test_same_day_replaces(self):
+        snapshot_coverage()
+        count = CoverageSnapshot.objects.count()
+
+        snapshot_coverage()
+
+        self.assertEqual(CoverageSnapshot.objects.count(), count)
+
+
+class TestPruneAddCharacterStats(TestCase):
+
+    def test_ok(self):
+        today = timezone.now().date()
+        AddCharacterStats.objects.create(date=today, import_id='test_default', bucket=0, successes=1)
+        AddCharacterStats.objects.create(date=today - datetime.timedelta(days=60), import_id='test_default', bucket=0, successes=1)
+
+        prune_add_character_stats()
+
+        self.assertQuerysetEqual(AddCharacterStats.objects.values_list('date', flat=True), [today])
+
+
+class TestPruneLinkUpdates(TestCase):
+
+    def _create(self, import_id, status, age):
+        link_update = LinkUpdate.objects.create(
+            import_id=import_id,
+            character_id=1,
+            model='corputils.CorpStats',
+            object_id=1,
+            status=status,
+        )
+        # updated is set on save
+        LinkUpdate.objects.filter(pk=link_update.pk).update(updated=timezone.now() - age)
+
+    def test_ok(self):
+        self._create('pending_default', LinkUpdate.Status.PENDING, datetime.timedelta(minutes=1))
+        self._create('lost_default', LinkUpdate.Status.PENDING, datetime.timedelta(hours=1))
+        self._create('old_default', LinkUpdate.Status.SUCCESS, datetime.timedelta(days=30))
+
+        prune_link_updates()
+
+        self.assertQuerysetEqual(
+            LinkUpdate.objects.order_by('import_id').values_list('import_id', 'status', 'error'),
+            [
+                ('lost_default', LinkUpdate.Status.FAILURE, LinkUpdate.EXPIRED_ERROR),
+                ('pending_default', LinkUpdate.Status.PENDING, ''),
+            ],
+            transform=tuple,
+        )
+
+
+@patch('charlink.tasks.notify_admins')
+class TestSendAdminNotificationDigests(TestCase):
+
+    def setUp(self):
+        PendingAdminNotification.objects.create(group='test:1', title='Title 1', message='Message 1')
+        PendingAdminNotification.objects.create(group='test:1', title='Title 2', message='Message 2')
+        PendingAdminNotification.objects.create(group='test:2', title='Title 3', message='Message 3')
+
+    def test_group(self, mock_notify_admins):
+        send_admin_notification_digests(group='test:1')
+
+        mock_notify_admins.assert_called_once_with(message='Message 1\n\nMessage 2', title='Title 1 (+1 more)')
+        self.assertQuerysetEqual(PendingAdminNotification.objects.values_list('group', flat=True), ['test:2'])
+
+    def test_all(self, mock_notify_admins):
+        send_admin_notification_digests()
+
+        self.assertEqual(mock_notify_admins.call_count, 2)
+        mock_notify_admins.assert_any_call(message='Message 3', title='Title 3')
+        self.assertFalse(PendingAdminNotification.objects.exists())
+
+    def test_send_failure(self, mock_notify_admins):
+        mock_notify_admins.side_effect = [Exception("Send failed"), None]
+
+        send_admin_notification_digests()
+
+        self.assertEqual(mock_notify_admins.call_count, 2)
+        mock_notify_admins.assert_called_with(message='Message 3', title='Title 3')
+        self.assertQuerysetEqual(PendingAdminNotification.objects.values_list('group', flat=True), ['test:1', 'test:1'])
+
+    def test_empty(self, mock_notify_admins):
+        send_admin_notification_digests(group='test:3')
+
+        self.assertFalse(mock_notify_admins.called)
+
+
+class TestCalcMiningtaxesAdminStats(TestCase):
+
+    @patch('miningtaxes.models.Stats.calc_admin_main_json')
+    def test_ok(self, mock_calc_admin_main_json):
+        calc_miningtaxes_admin_stats()
+
+        mock_calc_admin_main_json.assert_called_once()
+
+
+class TestRunLinkUpdate(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserMainFactory()
+        cls.token = cls.user.token_set.first()
+
+    def setUp(self):
+        self.corpstats = CorpStats.objects.create(token=self.token, corp=self.user.profile.main_character.corporation)
+        self.link_update = LinkUpdate.objects.create(
+            import_id='allianceauth.corputils_default',
+            character_id=self.token.character_id,
+            user=self.user,
+            model='corputils.CorpStats',
+            object_id=self.corpstats.pk,
+        )
+
+    @patch('allianceauth.corputils.models.CorpStats.update')
+    def test_ok(self, mock_update):
+        run_link_update(self.link_update.pk)
+
+        self.assertTrue(mock_update.called)
+        self.link_update.refresh_from_db()
+        self.assertEqual(self.link_update.status, LinkUpdate.Status.SUCCESS)
+        self.assertEqual(self.link_update.error, '')
+
+    @patch('allianceauth.corputils.models.CorpStats.update', autospec=True, side_effect=lambda corpstats: corpstats.delete())
+    def test_deleted_by_update(self, mock_update):
+        run_link_update(self.link_update.pk)
+
+        self.link_update.refresh_from_db()
+        self.assertEqual(self.link_update.status, LinkUpdate.Status.FAILURE)
+        self.assertFalse(CorpStats.objects.exists())
+
+    @patch('allianceauth.corputils.models.CorpStats.update', side_effect=Exception('ESI error'))
+    def test_exception(self, mock_update):
+        run_link_update(self.link_update.pk)
+
+        self.link_update.refresh_from_db()
+        self.assertEqual(self.link_update.status, LinkUpdate.Status.FAILURE)
+        self.assertEqual(self.link_update.error, 'ESI error')
+
+    def test_object_missing(self):
+        self.corpstats.delete()
+
+        run_link_update(self.link_update.pk)
+
+        self.link_update.refresh_from_db()
+        self.assertEqual(self.link_update.status, LinkUpdate.Status.FAILURE)
+
+    def test_link_update_missing(self):
+        run_link_update(0)
+
+        self.link_update.refresh_from_db()
+        self.assertEqual(self.link_update.status, LinkUpdate.Status.PENDING)
@@ -0,0 +1,71 @@
+from unittest.mock import patch, MagicMock
+
+from django.test import TestCase
+from django.urls import reverse
+
+from app_utils.testdata_factories import UserMainFactory
+
+from charlink.app_imports import import_apps
+from charlink.tracing import span
+
+
+class TestSpan(TestCase):
+
+    @patch('charlink.tracing._tracer', None)
+    def test_no_tracer(self):
+        with span('test', test=1) as current_span:
+            self.assertIsNone(current_span)
+
+    @patch('charlink.tracing._tracer')
+    def test_attributes(self, mock_tracer):
+        login_import = import_apps()['allianceauth.authentication'].get('default')
+
+        with span('test', login_import=login_import, imports=[login_import], template='test.html', empty=None):
+            pass
+
+        mock_tracer.start_as_current_span.assert_called_once_with('test', attributes={
+            'charlink.template': 'test.html',
+            'charlink.import_id': 'allianceauth.authentication_default',
+            'charlink.import_ids': ['allianceauth.authentication_default'],
+        })
+
+    @patch('charlink.tracing._tracer')
+    def test_exception(self, mock_tracer):
+        mock_tracer.start_as_current_span.return_value = MagicMock()
+
+        with self.assertRaises(ValueError):
+            with span('test'):
+                raise ValueError
+
+        self.assertIs(mock_tracer.start_as_current_span.return_value.__exit__.call_args[0][0], ValueError)
+
+
+class TestInstrumentation(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserMainFactory(permissions=['charlink.view_corp'])
+
+    def _span_names(self, mock_tracer):
+        return [call.args[0] for call in mock_tracer.start_as_current_span.call_args_list]
+
+    @patch('charlink.tracing._tracer')
+    def test_check_permissions(self, mock_tracer):
+        login_import = import_apps()['allianceauth.authentication'].get('default')
+
+        self.assertTrue(login_import.has_permissions(self.user))
+        mock_tracer.start_as_current_span.assert_called_once_with(
+            'charlink.check_permissions',
+            attributes={'charlink.import_id': 'allianceauth.authentication_default'}
+        )
+
+    @patch('charlink.tracing._tracer')
+    def test_audit_user(self, mock_tracer):
+        self.client.force_login(self.user)
+
+        res = self.client.get(reverse('charlink:audit_user', args=[self.user.pk]))
+
+        self.assertEqual(res.status_code, 200)
+        names = self._span_names(mock_tracer)
+        self.assertIn('charlink.audit_queryset', names)
+        self.assertIn('charlink.render', names)
@@ -0,0 +1,60 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from allianceauth.corputils.models import CorpStats
+
+from app_utils.testdata_factories import UserMainFactory
+
+from charlink.app_imports import import_apps
+from charlink.models import LinkUpdate
+from charlink.updates import queue_link_update
+
+
+@patch('charlink.updates.run_link_update')
+class TestQueueLinkUpdate(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserMainFactory()
+        cls.token = cls.user.token_set.first()
+        cls.login_import = import_apps()['allianceauth.corputils'].get('default')
+        cls.corpstats = CorpStats.objects.create(token=cls.token, corp=cls.user.profile.main_character.corporation)
+
+    def test_ok(self, mock_run_link_update):
+        with self.captureOnCommitCallbacks(execute=True):
+            link_update = queue_link_update(self.login_import, self.token, self.corpstats)
+
+        link_update.refresh_from_db()
+        self.assertEqual(link_update.import_id, 'allianceauth.corputils_default')
+        self.assertEqual(link_update.character_id, self.token.character_id)
+        self.assertEqual(link_update.user, self.user)
+        self.assertEqual(link_update.model, 'corputils.CorpStats')
+        self.assertEqual(link_update.object_id, self.corpstats.pk)
+        self.assertEqual(link_update.status, LinkUpdate.Status.PENDING)
+        mock_run_link_update.delay.assert_called_once_with(link_update.pk)
+
+    def test_replaces_previous(self, mock_run_link_update):
+        LinkUpdate.objects.create(
+            import_id='allianceauth.corputils_default',
+            character_id=self.token.character_id,
+            model='corputils.CorpStats',
+            object_id=0,
+            status=LinkUpdate.Status.FAILURE,
+            error='Error',
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            queue_link_update(self.login_import, self.token, self.corpstats)
+
+        link_update = LinkUpdate.objects.get()
+        self.assertEqual(link_update.object_id, self.corpstats.pk)
+        self.assertEqual(link_update.status, LinkUpdate.Status.PENDING)
+        self.assertEqual(link_update.error, '')
+
+    def test_not_committed(self, mock_run_link_update):
+        with self.captureOnCommitCallbacks() as callbacks:
+            queue_link_update(self.login_import, self.token, self.corpstats)
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertFalse(mock_run_link_update.delay.called)
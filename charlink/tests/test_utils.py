@@ -1,4 +1,9 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connections
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from allianceauth.eveonline.models import EveCharacter
 from allianceauth.tests.auth_utils import AuthUtils
@@ -6,7 +11,9 @@ from allianceauth.tests.auth_utils import AuthUtils
 from app_utils.testdata_factories import UserMainFactory, EveCorporationInfoFactory, EveCharacterFactory
 from app_utils.testing import create_state
 
-from charlink.utils import get_visible_corps, chars_annotate_linked_apps, get_user_available_apps, get_user_linked_chars
+from memberaudit.models import Character
+
+from charlink.utils import get_visible_corps, chars_annotate_linked_apps, get_user_available_apps, get_user_linked_chars, get_link_matrix
 from charlink.app_imports import import_apps
 from charlink.imports.corptools import _corp_perms
 
@@ -167,3 +174,67 @@ class TestGetUserLinkedChars(TestCase):
 
         self.assertIn('apps', res)
         self.assertIn('characters', res)
+
+
+class TestGetLinkMatrix(TestCase):
+    databases = {'default', 'replica'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserMainFactory()
+        cls.linked_char = cls.user.profile.main_character
+        cls.unlinked_char = EveCharacterFactory()
+        Character.objects.create(eve_character=cls.linked_char)
+
+        cls.imports = [
+            import_apps()['memberaudit'].get('default'),
+            import_apps()['allianceauth.authentication'].get('default'),
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_ok(self):
+        matrix = get_link_matrix([self.linked_char.character_id, self.unlinked_char.character_id, 1], self.imports)
+
+        self.assertDictEqual(matrix, {
+            self.linked_char.character_id: {'memberaudit_default': True, 'allianceauth.authentication_default': True},
+            self.unlinked_char.character_id: {'memberaudit_default': False, 'allianceauth.authentication_default': False},
+            1: {'memberaudit_default': False, 'allianceauth.authentication_default': False},
+        })
+
+    def test_cached(self):
+        character_ids = [self.linked_char.character_id, self.unlinked_char.character_id]
+        matrix = get_link_matrix(character_ids, self.imports)
+
+        with self.assertNumQueries(0):
+            self.assertDictEqual(get_link_matrix(character_ids, self.imports), matrix)
+
+    def test_changed(self):
+        character_ids = [self.linked_char.character_id, self.unlinked_char.character_id]
+        get_link_matrix(character_ids, self.imports[:1])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Character.objects.create(eve_character=self.unlinked_char)
+
+        # only the changed character is fetched again
+        with self.assertNumQueries(1):
+            matrix = get_link_matrix(character_ids, self.imports[:1])
+
+        self.assertTrue(matrix[self.unlinked_char.character_id]['memberaudit_default'])
+        self.assertTrue(matrix[self.linked_char.character_id]['memberaudit_default'])
+
+    def test_default_database(self):
+        character_ids = [self.linked_char.character_id, self.unlinked_char.character_id]
+
+        # cached statuses must not come from a lagging replica
+        with CaptureQueriesContext(connections['replica']) as ctx, self.assertNumQueries(2):
+            matrix = get_link_matrix(character_ids, self.imports)
+
+        self.assertEqual(len(ctx.captured_queries), 0)
+        self.assertTrue(matrix[self.linked_char.character_id]['memberaudit_default'])
+
+    @patch('charlink.utils.CHARLINK_LINK_MATRIX_MAX_BATCH', 1)
+    def test_batch_limit(self):
+        with self.assertRaises(ValueError):
+            get_link_matrix([self.linked_char.character_id, self.unlinked_char.character_id], self.imports)
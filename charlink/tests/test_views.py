@@ -1,19 +1,38 @@
+import datetime
+import gzip
+import json
+import re
 from unittest.mock import patch, Mock
 
-from django.test import TestCase, RequestFactory
+from asgiref.sync import async_to_sync
+
+from django.test import TestCase, RequestFactory, AsyncRequestFactory
 from django.urls import reverse
+from django.contrib.auth.models import User
 from django.contrib.messages import get_messages, DEFAULT_LEVELS
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.db import DatabaseError, connections
 from django.db.models import OuterRef, Exists
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
 from allianceauth.authentication.models import CharacterOwnership
+from allianceauth.tests.auth_utils import AuthUtils
 
 from app_utils.testdata_factories import UserMainFactory, EveCorporationInfoFactory, EveCharacterFactory
 
-from charlink.views import get_navbar_elements, dashboard_login
+from memberaudit.models import Character
+
+from charlink.views import get_navbar_elements, get_navbar_data, dashboard_login, audit_user, audit_user_async, audit_app, audit_app_async
+from charlink.link_state import bump_link_state_version
 from charlink.imports.memberaudit import app_import as memberaudit_import
 from charlink.imports.miningtaxes import app_import as miningtaxes_import
 from charlink.imports.corptools import _corp_perms
+from charlink.app_imports import import_apps
+from charlink.bitmaps import get_import_bitmap, bitmap_to_pks
 from charlink.app_imports.utils import AppImport, LoginImport
+from charlink.models import AddCharacterStats, LinkUpdate
 
 
 class TestGetNavbarElements(TestCase):
@@ -23,29 +42,81 @@ class TestGetNavbarElements(TestCase):
         cls.permuser = UserMainFactory(permissions=['charlink.view_corp'])
         cls.nopermuser = UserMainFactory()
 
+    def setUp(self):
+        cache.clear()
+
     def test_with_perm(self):
         res = get_navbar_elements(self.permuser)
 
-        self.assertIn('available', res)
         self.assertTrue(res['is_auditor'])
 
-        self.assertIn('available', res)
-        self.assertGreater(len(res['available']), 0)
-
-        self.assertIn('available_apps', res)
-        self.assertGreater(len(res['available_apps']), 0)
-
     def test_without_perm(self):
         res = get_navbar_elements(self.nopermuser)
 
-        self.assertIn('available', res)
         self.assertFalse(res['is_auditor'])
 
-        self.assertIn('available', res)
-        self.assertEqual(len(res['available']), 0)
+    def test_cached(self):
+        get_navbar_elements(self.permuser)
+        user = User.objects.get(pk=self.permuser.pk)
+
+        with self.assertNumQueries(0):
+            res = get_navbar_elements(user)
+
+        self.assertTrue(res['is_auditor'])
+
+    def test_permissions_changed(self):
+        self.assertFalse(get_navbar_elements(self.nopermuser)['is_auditor'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            AuthUtils.add_permission_to_user_by_name('charlink.view_corp', self.nopermuser)
+
+        self.assertTrue(get_navbar_elements(User.objects.get(pk=self.nopermuser.pk))['is_auditor'])
+
+    def test_superuser_changed(self):
+        user = User.objects.get(pk=self.nopermuser.pk)
+        self.assertFalse(get_navbar_elements(user)['is_auditor'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            user.is_superuser = True
+            user.save()
+
+        self.assertTrue(get_navbar_elements(User.objects.get(pk=user.pk))['is_auditor'])
+
+
+class TestNavbarData(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.permuser = UserMainFactory(permissions=['charlink.view_corp'])
+        cls.nopermuser = UserMainFactory()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_get_navbar_data(self):
+        res = get_navbar_data(self.permuser)
 
-        self.assertIn('available_apps', res)
-        self.assertEqual(len(res['available_apps']), 0)
+        self.assertEqual(len(res['corporations']), 1)
+        self.assertEqual(res['corporations'][0]['name'], self.permuser.profile.main_character.corporation_name)
+        self.assertGreater(len(res['apps']), 0)
+
+        with self.assertNumQueries(0):
+            self.assertDictEqual(get_navbar_data(self.permuser), res)
+
+    def test_view(self):
+        self.client.force_login(self.permuser)
+
+        res = self.client.get(reverse('charlink:navbar_data'))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(res.json()['corporations']), 1)
+
+    def test_view_no_perm(self):
+        self.client.force_login(self.nopermuser)
+
+        res = self.client.get(reverse('charlink:navbar_data'))
+
+        self.assertNotEqual(res.status_code, 200)
 
 
 class TestDashboardLogin(TestCase):
@@ -218,6 +289,40 @@ class TestIndex(TestCase):
         self.assertIn('form', res.context)
         self.assertIn('characters_added', res.context)
 
+    def test_link_updates(self):
+        character = self.user.profile.main_character
+        for import_id, status in [
+            ('allianceauth.corputils_default', LinkUpdate.Status.PENDING),
+            ('corpstats_default', LinkUpdate.Status.SUCCESS),
+            ('moonmining_default', LinkUpdate.Status.PENDING),
+        ]:
+            LinkUpdate.objects.create(
+                import_id=import_id,
+                character_id=character.character_id,
+                user=self.user,
+                model='corputils.CorpStats',
+                object_id=1,
+                status=status,
+            )
+        # expired, its task was lost
+        LinkUpdate.objects.filter(import_id='moonmining_default').update(updated=timezone.now() - datetime.timedelta(hours=1))
+
+        self.client.force_login(self.user)
+
+        res = self.client.get(reverse('charlink:index'))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertListEqual(
+            res.context['link_updates'],
+            [
+                {
+                    'url': reverse('charlink:link_update', args=['allianceauth.corputils_default', character.character_id]),
+                    'label': 'Corporation Stats',
+                    'character_name': character.character_name,
+                }
+            ]
+        )
+
     def test_post_ok(self):
         self.client.force_login(self.user)
 
@@ -361,6 +466,90 @@ class TestLoginView(TestCase):
         self.assertEqual(sorted_messages[0].level, DEFAULT_LEVELS['SUCCESS'])
         self.assertEqual(sorted_messages[1].level, DEFAULT_LEVELS['ERROR'])
 
+        self.assertEqual(AddCharacterStats.objects.get(import_id='memberaudit_default').successes, 1)
+        self.assertEqual(AddCharacterStats.objects.get(import_id='miningtaxes_default').failures, 1)
+        self.assertFalse(AddCharacterStats.objects.filter(import_id='allianceauth.authentication_default').exists())
+
+    @patch('charlink.views.record_add_character', side_effect=DatabaseError('test'))
+    @patch('charlink.decorators.token_required')
+    def test_stats_failure(self, mock_token_required, mock_record_add_character):
+        session = self.client.session
+        session['charlink'] = {
+            'scopes': self.scopes,
+            'imports': [
+                ('memberaudit', 'default'),
+                ('miningtaxes', 'default'),
+            ],
+        }
+        session.save()
+
+        def fake_decorator(f):
+            def fake_wrapper(request, *args, **kwargs):
+                return f(request, self.token, *args, **kwargs)
+            return fake_wrapper
+
+        mock_token_required.return_value = fake_decorator
+
+        self.client.force_login(self.user)
+        memberaudit_default = import_apps()['memberaudit'].get('default')
+        miningtaxes_default = import_apps()['miningtaxes'].get('default')
+
+        with patch.object(memberaudit_default, 'add_character') as mock_memberaudit_add_character:
+            with patch.object(miningtaxes_default, 'add_character') as mock_miningtaxes_add_character:
+                res = self.client.get(reverse('charlink:login'))
+
+        self.assertRedirects(res, reverse('charlink:index'), fetch_redirect_response=False)
+        mock_memberaudit_add_character.assert_called_once()
+        mock_miningtaxes_add_character.assert_called_once()
+        self.assertEqual(mock_record_add_character.call_count, 2)
+
+        messages = list(get_messages(res.wsgi_request))
+        self.assertEqual(len(messages), 2)
+        self.assertTrue(all(message.level == DEFAULT_LEVELS['SUCCESS'] for message in messages))
+
+    @patch('charlink.decorators.token_required')
+    def test_link_update_queued(self, mock_token_required):
+        session = self.client.session
+        session['charlink'] = {
+            'scopes': self.scopes,
+            'imports': [
+                ('memberaudit', 'default'),
+                ('miningtaxes', 'default'),
+            ],
+        }
+        session.save()
+
+        def fake_decorator(f):
+            def fake_wrapper(request, *args, **kwargs):
+                return f(request, self.token, *args, **kwargs)
+            return fake_wrapper
+
+        mock_token_required.return_value = fake_decorator
+
+        def queue_update(import_id, status):
+            def add_character(request, token):
+                LinkUpdate.objects.update_or_create(
+                    import_id=import_id,
+                    character_id=token.character_id,
+                    defaults={'user': token.user, 'model': 'corputils.CorpStats', 'object_id': 1, 'status': status, 'error': 'Error'},
+                )
+            return add_character
+
+        self.client.force_login(self.user)
+        memberaudit_default = import_apps()['memberaudit'].get('default')
+        miningtaxes_default = import_apps()['miningtaxes'].get('default')
+
+        with patch.object(memberaudit_default, 'add_character', side_effect=queue_update('memberaudit_default', LinkUpdate.Status.PENDING)):
+            with patch.object(miningtaxes_default, 'add_character', side_effect=queue_update('miningtaxes_default', LinkUpdate.Status.FAILURE)):
+                res = self.client.get(reverse('charlink:login'))
+
+        messages = sorted(get_messages(res.wsgi_request), key=lambda x: x.level)
+        self.assertEqual(len(messages), 2)
+        self.assertEqual(messages[0].level, DEFAULT_LEVELS['INFO'])
+        self.assertIn('queued', messages[0].message)
+        self.assertEqual(messages[1].level, DEFAULT_LEVELS['ERROR'])
+        self.assertIn('Error', messages[1].message)
+
 
 class TestAudit(TestCase):
 
@@ -387,6 +576,26 @@ class TestAudit(TestCase):
 
         self.assertNotEqual(res.status_code, 200)
 
+    def test_not_modified(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        url = reverse('charlink:audit_corp', args=[self.corp.corporation_id])
+
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.has_header('ETag'))
+
+        with CaptureQueriesContext(connections['default']) as ctx:
+            res2 = self.client.get(url, HTTP_IF_NONE_MATCH=res['ETag'])
+        self.assertEqual(res2.status_code, 304)
+        self.assertFalse(any('eveonline_evecorporationinfo' in query['sql'] for query in ctx.captured_queries))
+
+        bump_link_state_version()
+
+        res3 = self.client.get(url, HTTP_IF_NONE_MATCH=res['ETag'])
+        self.assertEqual(res3.status_code, 200)
+        self.assertNotEqual(res3['ETag'], res['ETag'])
+
 
 class TestSearch(TestCase):
 
@@ -541,3 +750,530 @@ class TestAuditApp(TestCase):
         self.assertEqual(res.status_code, 200)
         self.assertIn('logins', res.context)
         self.assertEqual(len(res.context['logins']), 2)
+
+
+class TestAuditAsync(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        permissions = ["memberaudit.basic_access", "moonmining.add_refinery_owner", "moonmining.basic_access"]
+        cls.user = UserMainFactory(permissions=['charlink.view_corp', *permissions])
+        char2 = EveCharacterFactory(corporation=cls.user.profile.main_character.corporation)
+        cls.user2 = UserMainFactory(permissions=permissions, main_character__character=char2)
+        cls.user_ext = UserMainFactory()
+        cls.no_perm_user = UserMainFactory()
+
+    def setUp(self):
+        cache.clear()
+
+    def _request(self, factory, user, path='/', headers=None):
+        request = factory.get(path, headers=headers)
+        request.user = user
+        return request
+
+    async def test_audit_app(self):
+        response = await audit_app_async(self._request(AsyncRequestFactory(), self.user), 'memberaudit')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header('ETag'))
+        self.assertContains(response, self.user2.profile.main_character.character_name)
+
+    async def test_audit_user(self):
+        response = await audit_user_async(self._request(AsyncRequestFactory(), self.user), self.user2.pk)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, self.user2.profile.main_character.character_name)
+
+    def test_same_as_sync(self):
+        for sync_view, async_view, arg in (
+            (audit_app, audit_app_async, 'moonmining'),
+            (audit_user, audit_user_async, self.user2.pk),
+        ):
+            with self.subTest(view=sync_view.__name__):
+                sync_response = sync_view(self._request(RequestFactory(), self.user), arg)
+                async_response = async_to_sync(async_view)(self._request(AsyncRequestFactory(), self.user), arg)
+
+                csrf_token = re.compile(rb'name="csrfmiddlewaretoken" value="[^"]+"')
+                self.assertEqual(csrf_token.sub(b'', async_response.content), csrf_token.sub(b'', sync_response.content))
+
+    async def test_not_modified(self):
+        response = await audit_app_async(self._request(AsyncRequestFactory(), self.user), 'memberaudit')
+
+        response = await audit_app_async(
+            self._request(AsyncRequestFactory(), self.user, headers={'If-None-Match': response.headers['ETag']}),
+            'memberaudit',
+        )
+
+        self.assertEqual(response.status_code, 304)
+
+    @patch('charlink.link_state.CHARLINK_READ_DATABASE', 'replica')
+    async def test_read_database_no_etag(self):
+        response = await audit_app_async(self._request(AsyncRequestFactory(), self.user), 'memberaudit')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+
+    async def test_no_perm(self):
+        response = await audit_app_async(self._request(AsyncRequestFactory(), self.no_perm_user), 'memberaudit')
+
+        self.assertEqual(response.status_code, 302)
+
+    async def test_not_visible_user(self):
+        with self.assertRaises(PermissionDenied):
+            await audit_user_async(self._request(AsyncRequestFactory(), self.user), self.user_ext.pk)
+
+
+class TestExport(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserMainFactory(permissions=['charlink.view_corp', 'memberaudit.basic_access'])
+        char2 = EveCharacterFactory(corporation=cls.user.profile.main_character.corporation)
+        cls.user2 = UserMainFactory(main_character__character=char2)
+        cls.user_ext = UserMainFactory()
+        cls.no_perm_user = UserMainFactory()
+
+    def test_csv(self):
+        self.client.force_login(self.user)
+
+        res = self.client.get(reverse('charlink:export'))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res['Content-Type'], 'text/csv')
+        lines = b''.join(res.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertIn('memberaudit_default', lines[0])
+
+    def test_jsonl_filtered(self):
+        self.client.force_login(self.user)
+
+        res = self.client.get(reverse('charlink:export'), {'format': 'jsonl', 'import': 'memberaudit'})
+
+        self.assertEqual(res.status_code, 200)
+        rows = [json.loads(line) for line in b''.join(res.streaming_content).decode('utf-8').splitlines()]
+        # user2 can't use memberaudit
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['character_id'], self.user.profile.main_character.character_id)
+        self.assertIn('memberaudit_default', rows[0])
+        self.assertNotIn('allianceauth.authentication_default', rows[0])
+
+    def test_gzip(self):
+        self.client.force_login(self.user)
+
+        res = self.client.get(reverse('charlink:export'), {'gzip': '1'})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res['Content-Type'], 'application/gzip')
+        lines = gzip.decompress(b''.join(res.streaming_content)).decode('utf-8').splitlines()
+        self.assertEqual(len(lines), 3)
+
+    def test_invalid_params(self):
+        self.client.force_login(self.user)
+
+        res = self.client.get(reverse('charlink:export'), {'format': 'xml'})
+        self.assertEqual(res.status_code, 404)
+
+        res = self.client.get(reverse('charlink:export'), {'corp': 'abc'})
+        self.assertEqual(res.status_code, 404)
+
+    def test_no_perm(self):
+        self.client.force_login(self.no_perm_user)
+
+        res = self.client.get(reverse('charlink:export'))
+
+        self.assertNotEqual(res.status_code, 200)
+
+
+class TestCoverage(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserMainFactory(permissions=['charlink.view_corp'])
+        cls.no_perm_user = UserMainFactory()
+
+    def test_ok(self):
+        self.client.force_login(self.user)
+
+        res = self.client.get(reverse('charlink:coverage'))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertIn('coverage', res.context)
+        self.assertEqual(len(res.context['coverage']['corporations']), 1)
+
+    def test_no_perm(self):
+        self.client.force_login(self.no_perm_user)
+
+        res = self.client.get(reverse('charlink:coverage'))
+
+        self.assertNotEqual(res.status_code, 200)
+
+
+class TestTrends(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserMainFactory(permissions=['charlink.view_corp'])
+        cls.corp = cls.user.profile.main_character.corporation
+        cls.corp2 = EveCorporationInfoFactory()
+
+    def test_ok(self):
+        self.client.force_login(self.user)
+
+        res = self.client.get(reverse('charlink:trends', args=['corporation', self.corp.corporation_id]), {'days': 'abc'})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertIn('trends', res.context)
+        self.assertEqual(res.context['days'], 90)
+
+    def test_days_clamped(self):
+        self.client.force_login(self.user)
+
+        res = self.client.get(reverse('charlink:trends', args=['corporation', self.corp.corporation_id]), {'days': '99999999'})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.context['days'], 3650)
+
+        res = self.client.get(reverse('charlink:trends', args=['corporation', self.corp.corporation_id]), {'days': '-5'})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.context['days'], 1)
+
+    def test_no_perm(self):
+        self.client.force_login(self.user)
+
+        res = self.client.get(reverse('charlink:trends', args=['corporation', self.corp2.corporation_id]))
+        self.assertEqual(res.status_code, 403)
+
+        res = self.client.get(reverse('charlink:trends', args=['alliance', self.corp.alliance.alliance_id]))
+        self.assertEqual(res.status_code, 403)
+
+        res = self.client.get(reverse('charlink:trends', args=['state', self.user.profile.state_id]))
+        self.assertEqual(res.status_code, 403)
+
+    def test_invalid_scope(self):
+        self.client.force_login(self.user)
+
+        res = self.client.get(reverse('charlink:trends', args=['invalid', 1]))
+
+        self.assertEqual(res.status_code, 404)
+
+
+@patch('charlink.views.CHARLINK_READ_DATABASE', 'replica')
+class TestReadDatabase(TestCase):
+    databases = {'default', 'replica'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserMainFactory(permissions=['charlink.view_corp', 'memberaudit.basic_access'])
+        cls.main_char = cls.user.profile.main_character
+
+    def _get(self, url, data=None):
+        with CaptureQueriesContext(connections['replica']) as replica, CaptureQueriesContext(connections['default']) as default:
+            res = self.client.get(url, data)
+
+        return res, [query['sql'] for query in replica.captured_queries], [query['sql'] for query in default.captured_queries]
+
+    def test_audit(self):
+        self.client.force_login(self.user)
+
+        res, replica_queries, default_queries = self._get(reverse('charlink:audit_corp', args=[self.main_char.corporation_id]))
+
+        # the replica is empty, so the corporation is not found there
+        self.assertEqual(res.status_code, 404)
+        self.assertTrue(any('eveonline_evecorporationinfo' in sql for sql in replica_queries))
+        self.assertFalse(any('eveonline_evecorporationinfo' in sql for sql in default_queries))
+
+    def test_search(self):
+        self.client.force_login(self.user)
+        search_string = 'charlink-search'
+
+        res, replica_queries, default_queries = self._get(reverse('charlink:search'), {'search_string': search_string})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(any(search_string in sql for sql in replica_queries))
+        self.assertFalse(any(search_string in sql for sql in default_queries))
+
+    def test_audit_user(self):
+        self.client.force_login(self.user)
+
+        res, replica_queries, _ = self._get(reverse('charlink:audit_user', args=[self.user.pk]))
+
+        self.assertEqual(res.status_code, 404)
+        self.assertTrue(any('auth_user' in sql for sql in replica_queries))
+
+    def test_audit_app(self):
+        self.client.force_login(self.user)
+
+        res, replica_queries, default_queries = self._get(reverse('charlink:audit_app', args=['memberaudit']))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(any('memberaudit_character' in sql for sql in replica_queries))
+        self.assertFalse(any('memberaudit_character' in sql for sql in default_queries))
+
+    def test_link_matrix(self):
+        self.client.force_login(self.user)
+
+        res, replica_queries, default_queries = self._get(reverse('charlink:link_matrix'), {'character': self.main_char.character_id})
+
+        # visibility from the replica, nothing is visible there
+        self.assertEqual(res.status_code, 200)
+        self.assertListEqual(res.json()['not_found'], [self.main_char.character_id])
+        self.assertTrue(any('eveonline_evecorporationinfo' in sql for sql in replica_queries))
+        self.assertFalse(any('eveonline_evecorporationinfo' in sql for sql in default_queries))
+
+    def test_missing_links_bitmaps_use_default(self):
+        cache.clear()
+        Character.objects.create(eve_character=self.main_char)
+        self.client.force_login(self.user)
+
+        res = self.client.get(reverse('charlink:missing_links'), {'import': 'memberaudit'})
+
+        self.assertEqual(res.status_code, 200)
+        with self.assertNumQueries(0):
+            bitmap = get_import_bitmap(import_apps()['memberaudit'].get('default'))
+        self.assertListEqual(bitmap_to_pks(bitmap), [self.main_char.pk])
+
+    def test_index_uses_default(self):
+        self.client.force_login(self.user)
+
+        with CaptureQueriesContext(connections['replica']) as ctx:
+            res = self.client.get(reverse('charlink:index'))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(ctx.captured_queries), 0)
+        self.assertEqual(res.context['characters_added']['characters'].db, 'default')
+        self.assertEqual(len(res.context['characters_added']['characters']), 1)
+
+
+class TestHooksStatus(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.superuser = UserMainFactory(is_superuser=True)
+        cls.permuser = UserMainFactory(permissions=['charlink.view_corp', 'charlink.view_state'])
+
+    def test_ok(self):
+        self.client.force_login(self.superuser)
+
+        res = self.client.get(reverse('charlink:hooks'))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTemplateUsed(res, 'charlink/hooks.html')
+        self.assertContains(res, 'testauth.testapp.charlink_hook_invalid')
+        self.assertContains(res, 'AssertionError')
+
+    def test_not_superuser(self):
+        self.client.force_login(self.permuser)
+
+        res = self.client.get(reverse('charlink:hooks'))
+
+        self.assertEqual(res.status_code, 403)
+
+
+class TestLinkMatrix(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserMainFactory(permissions=['charlink.view_corp'])
+        cls.nopermuser = UserMainFactory()
+        cls.corp_char = EveCharacterFactory(corporation=cls.user.profile.main_character.corporation)
+        cls.other_char = EveCharacterFactory()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_ok(self):
+        self.client.force_login(self.user)
+
+        res = self.client.get(reverse('charlink:link_matrix'), {
+            'character': [
+                self.user.profile.main_character.character_id,
+                self.other_char.character_id,
+            ],
+            'import': 'allianceauth.authentication',
+        })
+
+        self.assertEqual(res.status_code, 200)
+        data = res.json()
+        self.assertListEqual(data['imports'], ['allianceauth.authentication_default'])
+        self.assertDictEqual(data['characters'], {
+            str(self.user.profile.main_character.character_id): {'allianceauth.authentication_default': True},
+        })
+        self.assertListEqual(data['not_found'], [self.other_char.character_id])
+
+    @patch('charlink.views.CHARLINK_LINK_MATRIX_MAX_BATCH', 1)
+    def test_batch_limit(self):
+        self.client.force_login(self.user)
+
+        res = self.client.get(reverse('charlink:link_matrix'), {
+            'character': [self.user.profile.main_character.character_id, self.other_char.character_id],
+        })
+
+        self.assertEqual(res.status_code, 400)
+
+    def test_invalid_character(self):
+        self.client.force_login(self.user)
+
+        res = self.client.get(reverse('charlink:link_matrix'), {'character': 'invalid'})
+
+        self.assertEqual(res.status_code, 400)
+
+    def test_no_perm(self):
+        self.client.force_login(self.nopermuser)
+
+        res = self.client.get(reverse('charlink:link_matrix'), {'character': self.user.profile.main_character.character_id})
+
+        self.assertNotEqual(res.status_code, 200)
+
+
+class TestMissingLinks(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserMainFactory(permissions=['charlink.view_corp', 'memberaudit.basic_access'])
+        cls.nopermuser = UserMainFactory()
+        cls.corp = cls.user.profile.main_character.corporation
+        cls.member = UserMainFactory(
+            main_character__character=EveCharacterFactory(corporation=cls.corp),
+            permissions=['memberaudit.basic_access'],
+        )
+        cls.member_char = cls.member.profile.main_character
+        # can't use Member Audit, never missing it
+        UserMainFactory(main_character__character=EveCharacterFactory(corporation=cls.corp))
+        # without owner, never audited
+        EveCharacterFactory(corporation=cls.corp)
+        cls.other_char = EveCharacterFactory()
+        Character.objects.create(eve_character=cls.user.profile.main_character)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_no_import(self):
+        self.client.force_login(self.user)
+
+        res = self.client.get(reverse('charlink:missing_links'))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertIsNone(res.context['page_obj'])
+
+    def test_any(self):
+        self.client.force_login(self.user)
+
+        res = self.client.get(reverse('charlink:missing_links'), {'import': 'memberaudit'})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertListEqual(res.context['characters'], [self.member_char])
+        self.assertListEqual(res.context['characters'][0].links, [False])
+
+    def test_user(self):
+        self.client.force_login(self.user)
+
+        res = self.client.get(reverse('charlink:missing_links'), {
+            'import': 'memberaudit',
+            'mode': 'user',
+            'corp': self.corp.corporation_id,
+        })
+
+        self.assertEqual(res.status_code, 200)
+        self.assertListEqual(res.context['characters'], [self.member_char])
+
+    def test_user_alt_in_other_corp(self):
+        CharacterOwnership.objects.create(character=self.other_char, user=self.member, owner_hash='alt_hash')
+        Character.objects.create(eve_character=self.other_char)
+        self.client.force_login(self.user)
+
+        res = self.client.get(reverse('charlink:missing_links'), {
+            'import': 'memberaudit',
+            'mode': 'user',
+            'corp': self.corp.corporation_id,
+        })
+
+        self.assertEqual(res.status_code, 200)
+        self.assertListEqual(res.context['characters'], [])
+
+    @patch('charlink.views.CHARLINK_MISSING_LINKS_PAGE_SIZE', 1)
+    def test_pagination(self):
+        member2 = UserMainFactory(
+            main_character__character=EveCharacterFactory(corporation=self.corp),
+            permissions=['memberaudit.basic_access'],
+        )
+        self.client.force_login(self.user)
+
+        res = self.client.get(reverse('charlink:missing_links'), {'import': 'memberaudit', 'page': 2})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.context['page_obj'].paginator.count, 2)
+        self.assertEqual(len(res.context['characters']), 1)
+        self.assertIn(res.context['characters'][0], [self.member_char, member2.profile.main_character])
+        self.assertNotIn('page=', res.context['querystring'])
+
+    def test_invalid_params(self):
+        self.client.force_login(self.user)
+
+        res = self.client.get(reverse('charlink:missing_links'), {'import': 'memberaudit', 'mode': 'none'})
+        self.assertEqual(res.status_code, 404)
+
+        res = self.client.get(reverse('charlink:missing_links'), {'import': 'memberaudit', 'corp': 'abc'})
+        self.assertEqual(res.status_code, 404)
+
+    def test_no_perm(self):
+        self.client.force_login(self.nopermuser)
+
+        res = self.client.get(reverse('charlink:missing_links'))
+
+        self.assertNotEqual(res.status_code, 200)
+
+
+class TestLinkUpdate(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserMainFactory()
+        cls.other_user = UserMainFactory()
+        cls.character_id = cls.user.profile.main_character.character_id
+        LinkUpdate.objects.create(
+            import_id='allianceauth.corputils_default',
+            character_id=cls.character_id,
+            user=cls.user,
+            model='corputils.CorpStats',
+            object_id=1,
+            status=LinkUpdate.Status.FAILURE,
+            error='Error',
+        )
+
+    def test_ok(self):
+        self.client.force_login(self.user)
+
+        res = self.client.get(reverse('charlink:link_update', args=['allianceauth.corputils_default', self.character_id]))
+
+        self.assertEqual(res.status_code, 200)
+        data = res.json()
+        self.assertEqual(data['status'], 'failure')
+        self.assertEqual(data['error'], 'Error')
+        self.assertEqual(data['character_id'], self.character_id)
+
+    def test_expired(self):
+        LinkUpdate.objects.filter(character_id=self.character_id).update(
+            status=LinkUpdate.Status.PENDING,
+            updated=timezone.now() - datetime.timedelta(hours=1),
+        )
+        self.client.force_login(self.user)
+
+        res = self.client.get(reverse('charlink:link_update', args=['allianceauth.corputils_default', self.character_id]))
+
+        self.assertEqual(res.status_code, 200)
+        data = res.json()
+        self.assertEqual(data['status'], 'failure')
+        self.assertEqual(data['error'], LinkUpdate.EXPIRED_ERROR)
+
+    def test_other_user(self):
+        self.client.force_login(self.other_user)
+
+        res = self.client.get(reverse('charlink:link_update', args=['allianceauth.corputils_default', self.character_id]))
+
+        self.assertEqual(res.status_code, 404)
+
+    def test_missing(self):
+        self.client.force_login(self.user)
+
+        res = self.client.get(reverse('charlink:link_update', args=['corpstats_default', self.character_id]))
+
+        self.assertEqual(res.status_code, 404)
@@ -0,0 +1,42 @@
+from contextlib import contextmanager
+from typing import Iterable, Optional
+
+from . import __version__
+
+try:
+    from opentelemetry import trace
+except ImportError:
+    trace = None
+
+_tracer = trace.get_tracer('charlink', __version__) if trace is not None else None
+
+
+@contextmanager
+def span(name: str, login_import=None, imports: Optional[Iterable] = None, **attributes):
+    """
+    Wraps the block in an OpenTelemetry span if opentelemetry is installed, does nothing otherwise.
+
+    Args:
+        `name`: The span name.
+        `login_import`: LoginImport the block runs for, its query id is stored in the `charlink.import_id` attribute.
+        `imports`: LoginImports the block runs for, their query ids are stored in the `charlink.import_ids` attribute.
+        `attributes`: Other attributes, stored with the `charlink.` prefix. None values are skipped.
+    """
+    if _tracer is None:
+        yield None
+        return
+
+    span_attributes = {
+        f'charlink.{key}': value
+        for key, value in attributes.items()
+        if value is not None
+    }
+
+    if login_import is not None:
+        span_attributes['charlink.import_id'] = login_import.get_query_id()
+
+    if imports is not None:
+        span_attributes['charlink.import_ids'] = [import_.get_query_id() for import_ in imports]
+
+    with _tracer.start_as_current_span(name, attributes=span_attributes) as current_span:
+        yield current_span
@@ -0,0 +1,45 @@
+import datetime
+from typing import Optional
+
+from django.db import models, transaction
+
+from esi.models import Token
+
+from .app_imports.utils import LoginImport
+from .models import LinkUpdate
+from .tasks import run_link_update
+
+
+def queue_link_update(login_import: LoginImport, token: Token, obj: models.Model) -> LinkUpdate:
+    """
+    Schedules `obj.update()` in a Celery task once the transaction is committed, instead of running it in the SSO callback.
+
+    The outcome is stored in the LinkUpdate of the import and the token character, replacing the previous one,
+    and can be polled from the `charlink:link_update` view. The index page polls the pending updates of the user.
+    """
+    link_update, _ = LinkUpdate.objects.update_or_create(
+        import_id=login_import.get_query_id(),
+        character_id=token.character_id,
+        defaults={
+            'user': token.user,
+            'model': obj._meta.label,
+            'object_id': obj.pk,
+            'status': LinkUpdate.Status.PENDING,
+            'error': '',
+        },
+    )
+
+    transaction.on_commit(lambda: run_link_update.delay(link_update.pk))
+
+    return link_update
+
+
+def get_link_update(login_import: LoginImport, character_id: int, since: datetime.datetime) -> Optional[LinkUpdate]:
+    """
+    Returns the LinkUpdate of the import and character queued or finished after `since`, None if there isn't one.
+    """
+    return (
+        LinkUpdate.objects
+        .filter(import_id=login_import.get_query_id(), character_id=character_id, updated__gte=since)
+        .first()
+    )
@@ -1,6 +1,7 @@
 from django.urls import path
 
 from . import views
+from .app_settings import CHARLINK_ASYNC_AUDIT_VIEWS
 
 app_name = 'charlink'
 
@@ -9,7 +10,15 @@ urlpatterns = [
     path('dashboard/', views.dashboard_post, name='dashboard_post'),
     path('login/', views.login_view, name='login'),
     path('audit/corp/<int:corp_id>/', views.audit, name='audit_corp'),
-    path('audit/user/<int:user_id>/', views.audit_user, name='audit_user'),
-    path('audit/app/<str:app>/', views.audit_app, name='audit_app'),
+    path('audit/user/<int:user_id>/', views.audit_user_async if CHARLINK_ASYNC_AUDIT_VIEWS else views.audit_user, name='audit_user'),
+    path('audit/app/<str:app>/', views.audit_app_async if CHARLINK_ASYNC_AUDIT_VIEWS else views.audit_app, name='audit_app'),
     path('search/', views.search, name='search'),
+    path('audit/coverage/', views.coverage, name='coverage'),
+    path('audit/trends/<str:scope>/<int:scope_id>/', views.trends, name='trends'),
+    path('audit/export/', views.export, name='export'),
+    path('audit/missing/', views.missing_links, name='missing_links'),
+    path('audit/navbar/', views.navbar_data, name='navbar_data'),
+    path('audit/links/', views.link_matrix, name='link_matrix'),
+    path('hooks/', views.hooks_status, name='hooks'),
+    path('updates/<str:import_id>/<int:character_id>/', views.link_update, name='link_update'),
 ]
@@ -1,26 +1,38 @@
-from typing import List
+from typing import Dict, Iterable, List, Optional
 
-from django.db.models import Exists, OuterRef, Q
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import BooleanField, Exists, ExpressionWrapper, OuterRef, Q
 from django.contrib.auth.models import User
 
 from allianceauth.authentication.models import CharacterOwnership
 from allianceauth.eveonline.models import EveCharacter, EveCorporationInfo
 
-from .app_settings import CHARLINK_IGNORE_APPS
+from .app_settings import CHARLINK_IGNORE_APPS, CHARLINK_LINK_MATRIX_MAX_BATCH, CHARLINK_LINK_STATE_DIRTY_TTL
 from .app_imports import import_apps
 from .app_imports.utils import LoginImport
+from .link_state import get_import_version, get_changed_characters
 
+LINK_MATRIX_CHUNK_SIZE = 500
 
-def get_visible_corps(user: User):
-    char = user.profile.main_character
 
-    corps = EveCorporationInfo.objects.filter(
+def get_owned_corps(using: Optional[str] = None):
+    """
+    Returns the corporations with at least an owned character, the ones a superuser can audit.
+    """
+    return EveCorporationInfo.objects.using(using).filter(
         Exists(
             CharacterOwnership.objects
             .filter(character__corporation_id=OuterRef('corporation_id'))
         )
     )
 
+
+def get_visible_corps(user: User, using: Optional[str] = None):
+    char = user.profile.main_character
+
+    corps = get_owned_corps(using)
+
     if user.is_superuser:
         corps = corps.all()
     else:
@@ -57,10 +69,17 @@ def get_visible_corps(user: User):
     return corps
 
 
+def linked_annotation(login_import: LoginImport) -> ExpressionWrapper:
+    """
+    Boolean annotation on EveCharacter telling whether the character is added to the import, built from `LoginImport.get_linked_q`.
+    """
+    return ExpressionWrapper(login_import.get_linked_q(), output_field=BooleanField())
+
+
 def chars_annotate_linked_apps(characters, imports: List[LoginImport]):
     for import_ in imports:
         characters = characters.annotate(
-            **{import_.get_query_id(): import_.is_character_added_annotation}
+            **{import_.get_query_id(): linked_annotation(import_)}
         )
 
     return characters
@@ -76,13 +95,13 @@ def get_user_available_apps(user: User):
     }
 
 
-def get_user_linked_chars(user: User):
+def get_user_linked_chars(user: User, using: Optional[str] = None):
     available_apps = get_user_available_apps(user)
 
     return {
         'apps': available_apps,
         'characters': chars_annotate_linked_apps(
-            EveCharacter.objects.filter(character_ownership__user=user),
+            EveCharacter.objects.using(using).filter(character_ownership__user=user),
             [
                 import_
                 for imports in available_apps.values()
@@ -90,3 +109,96 @@ def get_user_linked_chars(user: User):
             ]
         )
     }
+
+
+def _link_matrix_key(query_id: str, character_id: int) -> str:
+    return f'charlink:link_matrix:{query_id}:{character_id}'
+
+
+def _get_link_status(login_import: LoginImport, character_ids: List[int]) -> Dict[int, tuple]:
+    status = {}
+
+    for index in range(0, len(character_ids), LINK_MATRIX_CHUNK_SIZE):
+        # always read from the default database: the statuses are cached under the import version,
+        # which is bumped after the primary commits, a lagging replica would cache stale statuses as current
+        rows = (
+            EveCharacter.objects
+            .using(DEFAULT_DB_ALIAS)
+            .filter(character_id__in=character_ids[index:index + LINK_MATRIX_CHUNK_SIZE])
+            .annotate(linked=linked_annotation(login_import))
+            .values_list('character_id', 'pk', 'linked')
+        )
+        status.update({character_id: (pk, bool(linked)) for character_id, pk, linked in rows})
+
+    return status
+
+
+def get_link_matrix(character_ids: Iterable[int], imports: List[LoginImport]) -> Dict[int, Dict[str, bool]]:
+    """
+    Returns whether each character is linked to each import, for at most CHARLINK_LINK_MATRIX_MAX_BATCH characters.
+
+    Link statuses are cached per import and character. Cached statuses are reused until the import version marks the character as changed,
+    the others are fetched from the default database with one query per import and chunk of characters.
+
+    Args:
+        `character_ids`: EVE character ids, unknown characters are reported as not linked.
+        `imports`: The imports to check.
+
+    Returns:
+        A dict {character id: {import query id: linked}}.
+
+    Raises:
+        ValueError: if more than CHARLINK_LINK_MATRIX_MAX_BATCH characters are requested.
+    """
+    character_ids = list(dict.fromkeys(character_ids))
+    if len(character_ids) > CHARLINK_LINK_MATRIX_MAX_BATCH:
+        raise ValueError(f"At most {CHARLINK_LINK_MATRIX_MAX_BATCH} characters can be checked at once")
+
+    matrix = {character_id: {} for character_id in character_ids}
+
+    for import_ in imports:
+        query_id = import_.get_query_id()
+        # read before querying, changes committed in the meantime are marked dirty at a newer version
+        version = get_import_version(import_)
+
+        keys = {_link_matrix_key(query_id, character_id): character_id for character_id in character_ids}
+        # cached as {character id: (version, EveCharacter pk, linked)}, changes are tracked by pk
+        cached = {keys[key]: value for key, value in cache.get_many(list(keys)).items()}
+
+        by_version = {}
+        for character_id, (cached_version, pk, _) in cached.items():
+            by_version.setdefault(cached_version, {})[pk] = character_id
+
+        fresh = {}
+        for cached_version, pks in by_version.items():
+            if cached_version == version:
+                changed = set()
+            else:
+                changed = get_changed_characters(import_, list(pks), cached_version)
+                if changed is None:
+                    continue
+
+            for pk, character_id in pks.items():
+                if pk not in changed:
+                    fresh[character_id] = cached[character_id][1:]
+
+        missing = [character_id for character_id in character_ids if character_id not in fresh]
+
+        if missing:
+            fresh.update(_get_link_status(import_, missing))
+
+        # entries must not outlive the dirty markers, or changes would go unnoticed
+        cache.set_many(
+            {
+                _link_matrix_key(query_id, character_id): (version, pk, linked)
+                for character_id, (pk, linked) in fresh.items()
+                if cached.get(character_id) != (version, pk, linked)
+            },
+            CHARLINK_LINK_STATE_DIRTY_TTL
+        )
+
+        for character_id in character_ids:
+            # unknown characters are not cached, they could be added later
+            matrix[character_id][query_id] = fresh[character_id][1] if character_id in fresh else False
+
+    return matrix
@@ -1,45 +1,124 @@
+import asyncio
 import re
+import time
+import datetime
+from dataclasses import asdict
+from typing import Dict
+
+from asgiref.sync import sync_to_async
 
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
 from django.contrib import messages
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Q, QuerySet
 from django.core.exceptions import PermissionDenied
-from django.http import Http404
+from django.http import Http404, StreamingHttpResponse, JsonResponse
 from django.template.loader import render_to_string
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.urls import reverse
+from django.utils import timezone
+from django.views.decorators.http import condition
 
 from allianceauth.services.hooks import get_extension_logger
-from allianceauth.eveonline.models import EveCharacter, EveCorporationInfo
+from allianceauth.eveonline.models import EveCharacter, EveCorporationInfo, EveAllianceInfo
+from allianceauth.authentication.models import CharacterOwnership, State
 from allianceauth.authentication.decorators import permissions_required
 
 from .forms import LinkForm
-from .app_imports import import_apps
-from .decorators import charlink
-from .app_settings import CHARLINK_IGNORE_APPS
-from .utils import get_user_available_apps, get_user_linked_chars, get_visible_corps, chars_annotate_linked_apps
+from .app_imports import import_apps, get_load_diagnostics
+from .app_imports.utils import LoginImport
+from .decorators import charlink, sample_profile, async_permissions_required, async_condition
+from .app_settings import (
+    CHARLINK_IGNORE_APPS,
+    CHARLINK_READ_DATABASE,
+    CHARLINK_NAVBAR_CACHE_TTL,
+    CHARLINK_LINK_MATRIX_MAX_BATCH,
+    CHARLINK_MISSING_LINKS_PAGE_SIZE,
+)
+from .utils import get_user_available_apps, get_user_linked_chars, get_visible_corps, chars_annotate_linked_apps, get_link_matrix
+from .coverage import get_corp_coverage, get_coverage_trends, can_view_scope
+from .models import CoverageSnapshot, LinkUpdate
+from .link_state import link_state_etag, get_link_state_version, get_permissions_version, get_visibility_signature
+from .stats import record_add_character
+from .updates import get_link_update
+from .tracing import span
+from .exports import EXPORT_FORMATS, filter_imports, get_export_characters, stream_export, gzip_stream
+from .bitmaps import MISSING_LINK_MODES, get_import_bitmap, filter_missing_links
 
 logger = get_extension_logger(__name__)
 
 
 def get_navbar_elements(user: User):
-    is_auditor = user.has_perm('charlink.view_state') or user.has_perm('charlink.view_corp') or user.has_perm('charlink.view_alliance')
+    """
+    Returns the context needed by the navbar, the dropdowns contents are loaded from `navbar_data` when opened.
+
+    The auditor check is cached until the permissions of any user change, so it doesn't need the user permissions on every page.
+    """
+    cache_key = f'charlink:navbar:is_auditor:{user.pk}:{get_permissions_version()}'
+
+    is_auditor = cache.get(cache_key)
+    if is_auditor is None:
+        is_auditor = user.has_perm('charlink.view_state') or user.has_perm('charlink.view_corp') or user.has_perm('charlink.view_alliance')
+        cache.set(cache_key, is_auditor, CHARLINK_NAVBAR_CACHE_TTL)
 
     return {
         'is_auditor': is_auditor,
-        'available_apps': get_user_available_apps(user) if is_auditor else [],
-        'available': get_visible_corps(user) if is_auditor else [],
     }
 
 
+def get_navbar_data(user: User):
+    """
+    Returns the corporations and the apps the user can audit, cached until the link state or the user's visibility changes.
+    """
+    cache_key = f'charlink:navbar:data:{get_visibility_signature(user)}:{get_link_state_version()}'
+
+    data = cache.get(cache_key)
+    if data is None:
+        corps = (
+            get_visible_corps(user, CHARLINK_READ_DATABASE)
+            .order_by('corporation_name')
+            .values_list('corporation_id', 'corporation_name')
+        )
+
+        data = {
+            'corporations': [
+                {
+                    'name': corporation_name,
+                    'url': reverse('charlink:audit_corp', args=[corporation_id]),
+                }
+                for corporation_id, corporation_name in corps
+            ],
+            'apps': [
+                {
+                    'name': app_imports.imports[0].field_label,
+                    'url': reverse('charlink:audit_app', args=[app]),
+                }
+                for app, app_imports in get_user_available_apps(user).items()
+            ],
+        }
+        cache.set(cache_key, data, CHARLINK_NAVBAR_CACHE_TTL)
+
+    return data
+
+
+def _render(request, template_name: str, context: dict):
+    with span('charlink.render', template=template_name):
+        return render(request, template_name, context=context)
+
+
 def dashboard_login(request):
     form = LinkForm(request.user, prefix='charlink')
     context = {
         'form': form,
     }
-    return render_to_string('charlink/dashboard_login.html', context=context, request=request)
+    with span('charlink.render', template='charlink/dashboard_login.html'):
+        return render_to_string('charlink/dashboard_login.html', context=context, request=request)
 
 
+@sample_profile
 @login_required
 def dashboard_post(request):
     if request.method != 'POST':
@@ -77,6 +156,40 @@ def dashboard_post(request):
     return redirect('charlink:login')
 
 
+def _get_pending_link_updates(user: User) -> list:
+    """
+    Returns the pending link updates of the user, polled by the index page until they finish.
+    """
+    updates = list(
+        LinkUpdate.objects
+        .filter(user=user, status=LinkUpdate.Status.PENDING, updated__gte=LinkUpdate.get_expired_before())
+        .order_by('created')
+    )
+    if not updates:
+        return []
+
+    labels = {
+        import_.get_query_id(): import_.field_label
+        for app_imports in import_apps().values()
+        for import_ in app_imports.imports
+    }
+    names = dict(
+        EveCharacter.objects
+        .filter(character_id__in=[update.character_id for update in updates])
+        .values_list('character_id', 'character_name')
+    )
+
+    return [
+        {
+            'url': reverse('charlink:link_update', args=[update.import_id, update.character_id]),
+            'label': labels.get(update.import_id, update.import_id),
+            'character_name': names.get(update.character_id, update.character_id),
+        }
+        for update in updates
+    ]
+
+
+@sample_profile
 @login_required
 def index(request):
     imported_apps = import_apps()
@@ -113,12 +226,25 @@ def index(request):
     context = {
         'form': form,
         'characters_added': get_user_linked_chars(request.user),
+        'link_updates': _get_pending_link_updates(request.user),
         **get_navbar_elements(request.user),
     }
 
-    return render(request, 'charlink/charlink.html', context=context)
+    return _render(request, 'charlink/charlink.html', context)
+
 
+def _record_add_character(login_import: LoginImport, duration: float, success: bool):
+    """
+    Records the add_character call, a failure to write the statistics is logged and doesn't affect the linking.
+    """
+    try:
+        with transaction.atomic():
+            record_add_character(login_import, duration, success)
+    except Exception:
+        logger.exception(f"Failed to record the add character statistics of {login_import.get_query_id()}")
 
+
+@sample_profile
 @login_required
 @charlink
 def login_view(request, token):
@@ -128,27 +254,42 @@ def login_view(request, token):
 
     for app, unique_id in charlink_data['imports']:
         import_ = imported_apps[app].get(unique_id)
-        if app != 'allianceauth.authentication' and app not in CHARLINK_IGNORE_APPS and import_.check_permissions(request.user):
+        if app != 'allianceauth.authentication' and app not in CHARLINK_IGNORE_APPS and import_.has_permissions(request.user):
+            started = timezone.now()
+            start = time.perf_counter()
             try:
-                import_.add_character(request, token)
+                with span('charlink.add_character', login_import=import_):
+                    import_.add_character(request, token)
             except Exception as e:
+                _record_add_character(import_, time.perf_counter() - start, False)
                 logger.exception(e)
                 messages.error(request, f"Failed to add character to {import_.field_label}")
             else:
-                messages.success(request, f"Character successfully added to {import_.field_label}")
+                _record_add_character(import_, time.perf_counter() - start, True)
+
+                # imports updating in the background report the outcome of the update, if it already finished
+                link_update = get_link_update(import_, token.character_id, started)
+                if link_update is None or link_update.status == LinkUpdate.Status.SUCCESS:
+                    messages.success(request, f"Character successfully added to {import_.field_label}")
+                elif link_update.status == LinkUpdate.Status.PENDING:
+                    messages.info(request, f"Character added to {import_.field_label}, the update is queued and its outcome will be shown on this page")
+                else:
+                    messages.error(request, f"Failed to update {import_.field_label}: {link_update.error}")
 
     return redirect('charlink:index')
 
 
+@sample_profile
 @login_required
 @permissions_required([
     'charlink.view_corp',
     'charlink.view_alliance',
     'charlink.view_state',
 ])
+@condition(etag_func=link_state_etag)
 def audit(request, corp_id: int):
-    corp = get_object_or_404(EveCorporationInfo, corporation_id=corp_id)
-    corps = get_visible_corps(request.user)
+    corp = get_object_or_404(EveCorporationInfo.objects.using(CHARLINK_READ_DATABASE), corporation_id=corp_id)
+    corps = get_visible_corps(request.user, CHARLINK_READ_DATABASE)
 
     if not corps.filter(corporation_id=corp_id).exists():
         raise PermissionDenied('You do not have permission to view the selected corporation statistics.')
@@ -158,9 +299,10 @@ def audit(request, corp_id: int):
         **get_navbar_elements(request.user),
     }
 
-    return render(request, 'charlink/audit.html', context=context)
+    return _render(request, 'charlink/audit.html', context)
 
 
+@sample_profile
 @login_required
 @permissions_required([
     'charlink.view_corp',
@@ -172,10 +314,11 @@ def search(request):
     if not search_string:
         return redirect('charlink:index')
 
-    corps = get_visible_corps(request.user)
+    corps = get_visible_corps(request.user, CHARLINK_READ_DATABASE)
 
     characters = (
         EveCharacter.objects
+        .using(CHARLINK_READ_DATABASE)
         .filter(
             character_name__icontains=search_string,
             corporation_id__in=corps.values('corporation_id'),
@@ -190,24 +333,18 @@ def search(request):
         **get_navbar_elements(request.user),
     }
 
-    return render(request, 'charlink/search.html', context=context)
+    return _render(request, 'charlink/search.html', context)
 
 
-@login_required
-@permissions_required([
-    'charlink.view_corp',
-    'charlink.view_alliance',
-    'charlink.view_state',
-])
-def audit_user(request, user_id):
-    user = get_object_or_404(User, pk=user_id)
+def _get_audit_user(request_user: User, user_id: int) -> User:
+    user = get_object_or_404(User.objects.using(CHARLINK_READ_DATABASE), pk=user_id)
 
-    corps = get_visible_corps(request.user)
+    corps = get_visible_corps(request_user, CHARLINK_READ_DATABASE)
 
     if (
-        not request.user.is_superuser
+        not request_user.is_superuser
         and
-        user != request.user
+        user != request_user
         and
         not corps
         .filter(
@@ -217,21 +354,10 @@ def audit_user(request, user_id):
     ):
         raise PermissionDenied('You do not have permission to view the selected user statistics.')
 
-    context = {
-        'characters_added': get_user_linked_chars(user),
-        **get_navbar_elements(request.user),
-    }
-
-    return render(request, 'charlink/user_audit.html', context=context)
+    return user
 
 
-@login_required
-@permissions_required([
-    'charlink.view_corp',
-    'charlink.view_alliance',
-    'charlink.view_state',
-])
-def audit_app(request, app):
+def _get_audit_app_querysets(request_user: User, app: str) -> Dict[LoginImport, QuerySet]:
     imported_apps = import_apps()
 
     if app not in imported_apps:
@@ -239,17 +365,17 @@ def audit_app(request, app):
 
     app_imports = imported_apps[app]
 
-    if not app_imports.has_any_perms(request.user):
+    if not app_imports.has_any_perms(request_user):
         raise PermissionDenied('You do not have permission to view the selected application statistics.')
 
-    app_imports = app_imports.get_imports_with_perms(request.user)
+    app_imports = app_imports.get_imports_with_perms(request_user)
 
-    corp_ids = get_visible_corps(request.user).values('corporation_id')
+    corp_ids = get_visible_corps(request_user, CHARLINK_READ_DATABASE).values('corporation_id')
 
     logins = {}
 
     for import_ in app_imports.imports:
-        visible_characters = EveCharacter.objects.filter(
+        visible_characters = EveCharacter.objects.using(CHARLINK_READ_DATABASE).filter(
             (
                 Q(corporation_id__in=corp_ids) |
                 Q(character_ownership__user__profile__main_character__corporation_id__in=corp_ids)
@@ -257,12 +383,64 @@ def audit_app(request, app):
             Q(character_ownership__user__in=import_.get_users_with_perms()),
         ).select_related('character_ownership__user__profile__main_character')
 
-        visible_characters = chars_annotate_linked_apps(
+        logins[import_] = chars_annotate_linked_apps(
             visible_characters,
             [import_]
         ).order_by(import_.get_query_id(), 'character_name')
 
-        logins[import_] = visible_characters
+    return logins
+
+
+async def _aevaluate(queryset: QuerySet, **span_kwargs) -> list:
+    with span('charlink.audit_queryset', **span_kwargs):
+        return [obj async for obj in queryset.aiterator()]
+
+
+@sample_profile
+@login_required
+@permissions_required([
+    'charlink.view_corp',
+    'charlink.view_alliance',
+    'charlink.view_state',
+])
+@condition(etag_func=link_state_etag)
+def audit_user(request, user_id):
+    user = _get_audit_user(request.user, user_id)
+    characters_added = get_user_linked_chars(user, CHARLINK_READ_DATABASE)
+
+    imports = [
+        import_
+        for app_imports in characters_added['apps'].values()
+        for import_ in app_imports.imports
+    ]
+
+    with span('charlink.audit_queryset', imports=imports):
+        # evaluated here to trace the query, the template reuses the cached results
+        len(characters_added['characters'])
+
+    context = {
+        'characters_added': characters_added,
+        **get_navbar_elements(request.user),
+    }
+
+    return _render(request, 'charlink/user_audit.html', context)
+
+
+@sample_profile
+@login_required
+@permissions_required([
+    'charlink.view_corp',
+    'charlink.view_alliance',
+    'charlink.view_state',
+])
+@condition(etag_func=link_state_etag)
+def audit_app(request, app):
+    logins = _get_audit_app_querysets(request.user, app)
+
+    for import_, visible_characters in logins.items():
+        with span('charlink.audit_queryset', login_import=import_):
+            # evaluated here to trace the query, the template reuses the cached results
+            len(visible_characters)
 
     context = {
         'logins': logins,
@@ -270,4 +448,400 @@ def audit_app(request, app):
         **get_navbar_elements(request.user),
     }
 
-    return render(request, 'charlink/app_audit.html', context=context)
+    return _render(request, 'charlink/app_audit.html', context)
+
+
+@async_permissions_required([
+    'charlink.view_corp',
+    'charlink.view_alliance',
+    'charlink.view_state',
+])
+@async_condition(etag_func=link_state_etag)
+async def audit_user_async(request, user_id):
+    """
+    ASGI variant of `audit_user`, the link status of each import is queried concurrently.
+    """
+    user = await sync_to_async(_get_audit_user)(request.user, user_id)
+    available_apps = await sync_to_async(get_user_available_apps)(user)
+
+    imports = [
+        import_
+        for app_imports in available_apps.values()
+        for import_ in app_imports.imports
+    ]
+
+    characters = EveCharacter.objects.using(CHARLINK_READ_DATABASE).filter(character_ownership__user=user)
+
+    chars, *links = await asyncio.gather(
+        _aevaluate(characters),
+        *(
+            # values() rather than values_list(), whose annotated rows are fetched synchronously by aiterator() in Django 4.2
+            _aevaluate(
+                chars_annotate_linked_apps(characters, [import_]).values('pk', import_.get_query_id()),
+                login_import=import_,
+            )
+            for import_ in imports
+        ),
+    )
+
+    for import_, rows in zip(imports, links):
+        query_id = import_.get_query_id()
+        linked = {row['pk']: row[query_id] for row in rows}
+        for char in chars:
+            setattr(char, query_id, linked.get(char.pk, False))
+
+    context = {
+        'characters_added': {
+            'apps': available_apps,
+            'characters': chars,
+        },
+        **await sync_to_async(get_navbar_elements)(request.user),
+    }
+
+    return await sync_to_async(_render)(request, 'charlink/user_audit.html', context)
+
+
+@async_permissions_required([
+    'charlink.view_corp',
+    'charlink.view_alliance',
+    'charlink.view_state',
+])
+@async_condition(etag_func=link_state_etag)
+async def audit_app_async(request, app):
+    """
+    ASGI variant of `audit_app`, the characters of each import are queried concurrently.
+    """
+    logins = await sync_to_async(_get_audit_app_querysets)(request.user, app)
+
+    results = await asyncio.gather(*(
+        _aevaluate(visible_characters, login_import=import_)
+        for import_, visible_characters in logins.items()
+    ))
+
+    context = {
+        'logins': dict(zip(logins, results)),
+        'app': app,
+        **await sync_to_async(get_navbar_elements)(request.user),
+    }
+
+    return await sync_to_async(_render)(request, 'charlink/app_audit.html', context)
+
+
+@sample_profile
+@login_required
+@permissions_required([
+    'charlink.view_corp',
+    'charlink.view_alliance',
+    'charlink.view_state',
+])
+def coverage(request):
+    main_character = request.user.profile.main_character
+    trend_scopes = []
+
+    if main_character and main_character.alliance_id and can_view_scope(request.user, CoverageSnapshot.Scope.ALLIANCE, main_character.alliance_id):
+        trend_scopes.append((CoverageSnapshot.Scope.ALLIANCE, main_character.alliance_id, main_character.alliance_name))
+
+    if can_view_scope(request.user, CoverageSnapshot.Scope.STATE, request.user.profile.state_id):
+        trend_scopes.append((CoverageSnapshot.Scope.STATE, request.user.profile.state_id, request.user.profile.state.name))
+
+    context = {
+        'coverage': get_corp_coverage(request.user, CHARLINK_READ_DATABASE),
+        'trend_scopes': trend_scopes,
+        **get_navbar_elements(request.user),
+    }
+
+    return _render(request, 'charlink/coverage.html', context)
+
+
+@sample_profile
+@login_required
+@permissions_required([
+    'charlink.view_corp',
+    'charlink.view_alliance',
+    'charlink.view_state',
+])
+def trends(request, scope: str, scope_id: int):
+    if scope == CoverageSnapshot.Scope.CORPORATION:
+        selected = get_object_or_404(EveCorporationInfo, corporation_id=scope_id)
+    elif scope == CoverageSnapshot.Scope.ALLIANCE:
+        selected = get_object_or_404(EveAllianceInfo, alliance_id=scope_id)
+    elif scope == CoverageSnapshot.Scope.STATE:
+        selected = get_object_or_404(State, pk=scope_id)
+    else:
+        raise Http404()
+
+    if not can_view_scope(request.user, scope, scope_id):
+        raise PermissionDenied('You do not have permission to view the selected coverage trends.')
+
+    try:
+        days = int(request.GET.get('days', 90))
+    except ValueError:
+        days = 90
+
+    days = min(max(days, 1), 3650)
+
+    imports = [
+        import_
+        for app_imports in get_user_available_apps(request.user).values()
+        for import_ in app_imports.imports
+    ]
+
+    context = {
+        'selected': selected,
+        'scope': scope,
+        'days': days,
+        'trends': get_coverage_trends(scope, scope_id, imports, timezone.now().date() - datetime.timedelta(days=days)),
+        **get_navbar_elements(request.user),
+    }
+
+    return _render(request, 'charlink/trends.html', context)
+
+
+@sample_profile
+@login_required
+@permissions_required([
+    'charlink.view_corp',
+    'charlink.view_alliance',
+    'charlink.view_state',
+])
+def export(request):
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        raise Http404()
+
+    use_gzip = request.GET.get('gzip', '') in ('1', 'true', 'on')
+
+    try:
+        corporations = [int(corp_id) for corp_id in request.GET.getlist('corp')]
+        alliances = [int(alliance_id) for alliance_id in request.GET.getlist('alliance')]
+    except ValueError:
+        raise Http404()
+
+    imports = filter_imports(
+        [
+            import_
+            for app_imports in get_user_available_apps(request.user).values()
+            for import_ in app_imports.imports
+        ],
+        request.GET.getlist('import')
+    )
+
+    characters = get_export_characters(
+        corp_ids=get_visible_corps(request.user, CHARLINK_READ_DATABASE).values('corporation_id'),
+        corporations=corporations,
+        alliances=alliances,
+        using=CHARLINK_READ_DATABASE,
+    )
+
+    stream = stream_export(characters, imports, export_format)
+    filename = f"charlink_export.{export_format}"
+    content_type = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+
+    if use_gzip:
+        stream = gzip_stream(stream)
+        filename += '.gz'
+        content_type = 'application/gzip'
+
+    response = StreamingHttpResponse(stream, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+
+    return response
+
+
+@sample_profile
+@login_required
+@permissions_required([
+    'charlink.view_corp',
+    'charlink.view_alliance',
+    'charlink.view_state',
+])
+def missing_links(request):
+    mode = request.GET.get('mode', 'any')
+    if mode not in MISSING_LINK_MODES:
+        raise Http404()
+
+    try:
+        corp_id = int(request.GET['corp']) if request.GET.get('corp') else None
+    except ValueError:
+        raise Http404()
+
+    available_imports = [
+        import_
+        for app_imports in get_user_available_apps(request.user).values()
+        for import_ in app_imports.imports
+    ]
+    selected_ids = request.GET.getlist('import')
+    imports = filter_imports(available_imports, selected_ids) if selected_ids else []
+
+    visible_corps = get_visible_corps(request.user, CHARLINK_READ_DATABASE)
+
+    page_obj = None
+    characters = []
+    if imports:
+        visible_characters = get_export_characters(
+            corp_ids=visible_corps.values('corporation_id'),
+            corporations=[corp_id] if corp_id is not None else None,
+            using=CHARLINK_READ_DATABASE,
+        )
+        owners = visible_characters.order_by().values('character_ownership__user_id')
+
+        # only the ids are loaded, the full characters are loaded for the current page
+        rows = list(visible_characters.order_by('character_name', 'pk').values_list('pk', 'character_ownership__user_id'))
+
+        # like the app audit pages, characters are checked only against the imports their owner can use
+        allowed_users = [
+            set(import_.get_users_with_perms().using(CHARLINK_READ_DATABASE).filter(pk__in=owners).values_list('pk', flat=True))
+            for import_ in imports
+        ]
+
+        owned_characters = None
+        if mode == 'user':
+            # linked characters of the owners outside the filtered characters count too
+            owned_characters = list(
+                CharacterOwnership.objects
+                .using(CHARLINK_READ_DATABASE)
+                .filter(user_id__in=owners)
+                .values_list('character_id', 'user_id')
+            )
+
+        bitmaps = {import_: get_import_bitmap(import_) for import_ in imports}
+
+        with span('charlink.missing_links', imports=imports, mode=mode, characters=len(rows)):
+            matching = filter_missing_links(rows, list(bitmaps.values()), mode, allowed_users, owned_characters)
+
+        page_obj = Paginator(matching, CHARLINK_MISSING_LINKS_PAGE_SIZE).get_page(request.GET.get('page'))
+
+        page_chars = (
+            EveCharacter.objects
+            .using(CHARLINK_READ_DATABASE)
+            .filter(pk__in=page_obj.object_list)
+            .select_related('character_ownership__user__profile__main_character')
+            .in_bulk()
+        )
+        characters = [page_chars[pk] for pk in page_obj.object_list if pk in page_chars]
+
+        owner_ids = dict(rows)
+        for character in characters:
+            # None for the imports the owner can't use
+            character.links = [
+                bool(bitmap >> character.pk & 1) if owner_ids.get(character.pk) in users else None
+                for bitmap, users in zip(bitmaps.values(), allowed_users)
+            ]
+
+    querystring = request.GET.copy()
+    querystring.pop('page', None)
+
+    context = {
+        'available_imports': available_imports,
+        'imports': imports,
+        'selected_ids': [import_.get_query_id() for import_ in imports],
+        'modes': MISSING_LINK_MODES,
+        'mode': mode,
+        'corporations': visible_corps.order_by('corporation_name'),
+        'corp_id': corp_id,
+        'page_obj': page_obj,
+        'characters': characters,
+        'querystring': querystring.urlencode(),
+        **get_navbar_elements(request.user),
+    }
+
+    return _render(request, 'charlink/missing_links.html', context)
+
+
+@sample_profile
+@login_required
+@permissions_required([
+    'charlink.view_corp',
+    'charlink.view_alliance',
+    'charlink.view_state',
+])
+def navbar_data(request):
+    return JsonResponse(get_navbar_data(request.user))
+
+
+@sample_profile
+@login_required
+@permissions_required([
+    'charlink.view_corp',
+    'charlink.view_alliance',
+    'charlink.view_state',
+])
+def link_matrix(request):
+    try:
+        character_ids = list(dict.fromkeys(int(character_id) for character_id in request.GET.getlist('character')))
+    except ValueError:
+        return JsonResponse({'error': "Invalid character id"}, status=400)
+
+    if len(character_ids) > CHARLINK_LINK_MATRIX_MAX_BATCH:
+        return JsonResponse({'error': f"At most {CHARLINK_LINK_MATRIX_MAX_BATCH} characters can be checked at once"}, status=400)
+
+    imports = filter_imports(
+        [
+            import_
+            for app_imports in get_user_available_apps(request.user).values()
+            for import_ in app_imports.imports
+        ],
+        request.GET.getlist('import')
+    )
+
+    visible_ids = set(
+        get_export_characters(
+            corp_ids=get_visible_corps(request.user, CHARLINK_READ_DATABASE).values('corporation_id'),
+            using=CHARLINK_READ_DATABASE,
+        )
+        .filter(character_id__in=character_ids)
+        .values_list('character_id', flat=True)
+    )
+
+    matrix = get_link_matrix(
+        [character_id for character_id in character_ids if character_id in visible_ids],
+        imports,
+    )
+
+    return JsonResponse({
+        'imports': [import_.get_query_id() for import_ in imports],
+        'characters': {str(character_id): links for character_id, links in matrix.items()},
+        'not_found': [character_id for character_id in character_ids if character_id not in visible_ids],
+    })
+
+
+@sample_profile
+@login_required
+def hooks_status(request):
+    if not request.user.is_superuser:
+        raise PermissionDenied('Only superusers can view the import hooks status.')
+
+    context = {
+        'diagnostics': [
+            {
+                **asdict(diagnostic),
+                'import_ms': diagnostic.import_time * 1000,
+                'validate_ms': diagnostic.validate_time * 1000,
+            }
+            for diagnostic in get_load_diagnostics()
+        ],
+        **get_navbar_elements(request.user),
+    }
+
+    return _render(request, 'charlink/hooks.html', context)
+
+
+@sample_profile
+@login_required
+def link_update(request, import_id: str, character_id: int):
+    update = get_object_or_404(LinkUpdate, import_id=import_id, character_id=character_id, user=request.user)
+
+    # the task of an expired update was lost, it won't finish
+    if update.is_expired():
+        status, error = LinkUpdate.Status.FAILURE, LinkUpdate.EXPIRED_ERROR
+    else:
+        status, error = update.status, update.error
+
+    return JsonResponse({
+        'import_id': update.import_id,
+        'character_id': update.character_id,
+        'status': status,
+        'error': error,
+        'created': update.created.isoformat(),
+        'updated': update.updated.isoformat(),
+    })
@@ -187,12 +187,25 @@ if os.environ.get('USE_MYSQL', True) is True:
             },
         },
     }
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "TEST": {
+            "CHARSET": "utf8mb4",
+            "NAME": f"test_{os.environ.get('AA_DB_NAME')}_replica",
+            "MIGRATE": False,
+        },
+    }
 else:
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
             "NAME": str(os.path.join(BASE_DIR, "alliance_auth.sqlite3")),
         },
+        "replica": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": str(os.path.join(BASE_DIR, "alliance_auth_replica.sqlite3")),
+            "TEST": {"MIGRATE": False},
+        },
     }
 
 SITE_NAME = "Alliance Auth"